@@ -0,0 +1,49 @@
+"""Per-CFTS coverage dashboard endpoints."""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..db.database import get_db
+from ..models.cfts_coverage import CFTSCoverage, CFTSCoverageDB
+
+router = APIRouter(prefix="/coverage", tags=["coverage"])
+
+
+def _ratio(part: int, whole: int) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+def _to_response(record: CFTSCoverageDB) -> CFTSCoverage:
+    """Convert a rollup row to the API model with coverage ratios."""
+    return CFTSCoverage(
+        cfts_id=record.cfts_id,
+        cfts_name=record.cfts_name or "",
+        requirement_count=record.requirement_count or 0,
+        melco_id_count=record.melco_id_count or 0,
+        melco_with_sys2_count=record.melco_with_sys2_count or 0,
+        melco_with_tests_count=record.melco_with_tests_count or 0,
+        test_case_count=record.test_case_count or 0,
+        test_results=record.test_results or {},
+        sys2_coverage=_ratio(record.melco_with_sys2_count or 0, record.melco_id_count or 0),
+        test_coverage=_ratio(record.melco_with_tests_count or 0, record.melco_id_count or 0),
+        refreshed_at=record.refreshed_at,
+    )
+
+
+@router.get("", response_model=List[CFTSCoverage], summary="所有 CFTS 的覆蓋率統計")
+def get_coverage(db: Session = Depends(get_db)) -> List[CFTSCoverage]:
+    """Return the whole coverage dashboard from the precomputed rollup table."""
+    records = db.query(CFTSCoverageDB).order_by(CFTSCoverageDB.cfts_id).all()
+    return [_to_response(record) for record in records]
+
+
+@router.get("/{cfts_id}", response_model=CFTSCoverage, summary="指定 CFTS 的覆蓋率統計")
+def get_cfts_coverage(cfts_id: str, db: Session = Depends(get_db)) -> CFTSCoverage:
+    """Return coverage counts for one CFTS."""
+    record = db.query(CFTSCoverageDB).filter(CFTSCoverageDB.cfts_id == cfts_id).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="Coverage not found")
+
+    return _to_response(record)
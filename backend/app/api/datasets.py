@@ -0,0 +1,63 @@
+"""Dataset generation history and diff endpoints."""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..db.database import get_db
+from ..db.generations import diff_generations
+from ..models.dataset_generation import DatasetDiff, DatasetGeneration, DatasetGenerationDB
+
+router = APIRouter(prefix="/datasets", tags=["datasets"])
+
+DATASET_ENTITIES = ("cfts", "sys2", "testcase")
+
+
+@router.get("/generations", response_model=List[DatasetGeneration], summary="匯入世代列表")
+def list_generations(
+    entity: str = Query(None, description="cfts, sys2 或 testcase"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> List[DatasetGeneration]:
+    """Return the most recent dataset generations, newest first."""
+    query = db.query(DatasetGenerationDB)
+    if entity:
+        query = query.filter(DatasetGenerationDB.entity == entity)
+    return query.order_by(DatasetGenerationDB.generation.desc()).limit(limit).all()
+
+
+@router.get("/diff", response_model=DatasetDiff, summary="比較兩個匯入世代的差異")
+def get_dataset_diff(
+    entity: str = Query(..., description="cfts, sys2 或 testcase"),
+    from_generation: int = Query(..., ge=0, description="起始世代（0 表示空資料集）"),
+    to_generation: int = Query(None, ge=0, description="結束世代，預設為最新世代"),
+    db: Session = Depends(get_db),
+) -> DatasetDiff:
+    """
+    List rows added, removed or changed between two generations.
+
+    Keys are Req.IDs for CFTS, Melco IDs for SYS.2 and
+    "feature_id|source|title|section" for test cases.
+    """
+    if entity not in DATASET_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"entity must be one of {', '.join(DATASET_ENTITIES)}")
+
+    if to_generation is None:
+        latest = (
+            db.query(DatasetGenerationDB.generation)
+            .order_by(DatasetGenerationDB.generation.desc())
+            .first()
+        )
+        to_generation = latest[0] if latest else 0
+    if from_generation > to_generation:
+        raise HTTPException(status_code=400, detail="from_generation must not exceed to_generation")
+
+    added, removed, changed = diff_generations(db, entity, from_generation, to_generation)
+    return DatasetDiff(
+        entity=entity,
+        from_generation=from_generation,
+        to_generation=to_generation,
+        added=added,
+        removed=removed,
+        changed=changed,
+    )
@@ -0,0 +1,161 @@
+"""Hierarchical Melco ID subtree endpoints (e.g. everything under PSCFTS016-1)."""
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import String, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from ..db.database import get_db
+from ..models.sys2_requirement import SYS2Requirement, SYS2RequirementDB
+from ..models.testcase import TestCaseDB, TestCaseResponse
+from ..utils.melco import HIERARCHY_SEPARATOR, melco_path
+from ..utils.search import LIKE_ESCAPE, prefix_pattern
+from .sys2_requirements import _build_cfts_lookup, _to_pydantic
+from .testcases import _db_to_response
+
+router = APIRouter(prefix="/hierarchy", tags=["hierarchy"])
+
+
+class HierarchyChild(BaseModel):
+    """Counts for one direct child node of the subtree root."""
+    melco_id: str
+    requirement_count: int
+    testcase_count: int
+
+
+class HierarchySummary(BaseModel):
+    """Aggregated counts for a Melco ID subtree."""
+    root: str
+    requirement_count: int
+    testcase_count: int
+    test_results: Dict[str, int]
+    children: List[HierarchyChild]
+
+
+class HierarchySubtree(BaseModel):
+    """Descendant requirements and test cases of a Melco ID, with counts."""
+    summary: HierarchySummary
+    requirements: List[SYS2Requirement]
+    testcases: List[TestCaseResponse]
+    truncated: bool
+
+
+def _subtree_filter(model, root_path: str):
+    return model.melco_path.like(prefix_pattern(root_path), escape=LIKE_ESCAPE)
+
+
+def _child_key(path_column, root_depth: int):
+    """SQL expression for the ancestor one level below the root (or the root itself)."""
+    segments = func.string_to_array(
+        func.rtrim(path_column, HIERARCHY_SEPARATOR), HIERARCHY_SEPARATOR, type_=ARRAY(String)
+    )
+    return func.array_to_string(segments[1:root_depth + 1], HIERARCHY_SEPARATOR)
+
+
+def _summarize(db: Session, root: str, root_path: str) -> HierarchySummary:
+    """Aggregate counts for the subtree with one query over both path indexes."""
+    root_depth = root.count(HIERARCHY_SEPARATOR) + 1
+
+    requirements = select(
+        _child_key(SYS2RequirementDB.melco_path, root_depth).label("child"),
+        literal("sys2").label("kind"),
+        literal("").label("test_result"),
+    ).where(_subtree_filter(SYS2RequirementDB, root_path))
+    testcases = select(
+        _child_key(TestCaseDB.melco_path, root_depth).label("child"),
+        literal("testcase").label("kind"),
+        func.coalesce(TestCaseDB.test_result, "").label("test_result"),
+    ).where(_subtree_filter(TestCaseDB, root_path))
+    items = union_all(requirements, testcases).subquery("items")
+
+    rows = db.execute(
+        select(items.c.child, items.c.kind, items.c.test_result, func.count())
+        .group_by(items.c.child, items.c.kind, items.c.test_result)
+    ).all()
+
+    children: Dict[str, Counter] = defaultdict(Counter)
+    test_results: Counter = Counter()
+    for child, kind, test_result, count in rows:
+        children[child][kind] += count
+        if kind == "testcase":
+            test_results[test_result or "(blank)"] += count
+
+    return HierarchySummary(
+        root=root,
+        requirement_count=sum(counts["sys2"] for counts in children.values()),
+        testcase_count=sum(counts["testcase"] for counts in children.values()),
+        test_results=dict(test_results),
+        children=[
+            HierarchyChild(
+                melco_id=child,
+                requirement_count=counts["sys2"],
+                testcase_count=counts["testcase"],
+            )
+            for child, counts in sorted(children.items())
+            if child != root
+        ],
+    )
+
+
+@router.get(
+    "/{melco_id}/summary",
+    response_model=HierarchySummary,
+    summary="Melco ID 子樹的統計（SYS.2 / TestCase 數量與測試結果）",
+)
+def get_subtree_summary(melco_id: str, db: Session = Depends(get_db)) -> HierarchySummary:
+    """Return aggregated counts for every node under a Melco ID."""
+    root_path = melco_path(melco_id)
+    if not root_path:
+        raise HTTPException(status_code=404, detail="Melco ID not found")
+
+    return _summarize(db, root_path[:-len(HIERARCHY_SEPARATOR)], root_path)
+
+
+@router.get(
+    "/{melco_id}",
+    response_model=HierarchySubtree,
+    summary="取得 Melco ID 子樹下的所有 SYS.2 要件與 TestCase",
+)
+def get_subtree(
+    melco_id: str,
+    limit: int = Query(default=1000, ge=1, le=10000, description="每種資料的回傳筆數上限"),
+    db: Session = Depends(get_db),
+) -> HierarchySubtree:
+    """Return descendant SYS.2 requirements and test cases of a Melco ID."""
+    root_path = melco_path(melco_id)
+    if not root_path:
+        raise HTTPException(status_code=404, detail="Melco ID not found")
+    root = root_path[:-len(HIERARCHY_SEPARATOR)]
+
+    requirements = (
+        db.query(SYS2RequirementDB)
+        .filter(_subtree_filter(SYS2RequirementDB, root_path))
+        .order_by(SYS2RequirementDB.melco_path)
+        .limit(limit + 1)
+        .all()
+    )
+    testcases = (
+        db.query(TestCaseDB)
+        .filter(_subtree_filter(TestCaseDB, root_path))
+        .order_by(TestCaseDB.melco_path, TestCaseDB.id)
+        .limit(limit + 1)
+        .all()
+    )
+
+    truncated = len(requirements) > limit or len(testcases) > limit
+    requirements = requirements[:limit]
+    testcases = testcases[:limit]
+
+    cfts_lookup = _build_cfts_lookup(
+        db, list({record.cfts_id for record in requirements if record.cfts_id})
+    )
+
+    return HierarchySubtree(
+        summary=_summarize(db, root, root_path),
+        requirements=[_to_pydantic(record, cfts_lookup) for record in requirements],
+        testcases=[_db_to_response(record) for record in testcases],
+        truncated=truncated,
+    )
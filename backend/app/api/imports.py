@@ -0,0 +1,116 @@
+"""Excel upload import jobs with progress streaming (SSE)."""
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from ..models.import_job import ImportJob
+from ..utils.import_jobs import (
+    FINAL_STATES,
+    IMPORT_KINDS,
+    detect_import_kind,
+    list_job_statuses,
+    read_job_status,
+    submit_import_job,
+    validate_upload_names,
+)
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+EVENT_POLL_SECONDS = 0.5
+# SSE comment sent while nothing changes so proxies keep the stream open
+EVENT_KEEPALIVE_SECONDS = 15
+
+
+@router.post(
+    "",
+    response_model=List[ImportJob],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="上傳 Excel 並於背景匯入",
+)
+def create_import_jobs(
+    files: List[UploadFile] = File(..., description="CFTS*.xlsx、R1L_SYS.2.xlsx 或 R1L_TestCase.xlsx"),
+    kind: Optional[str] = Form(default=None, description="cfts, sys2 或 testcase；未指定時依檔名判斷"),
+) -> List[ImportJob]:
+    """
+    Queue one background import job per workbook type.
+
+    All CFTS workbooks of an upload are imported together; SYS.2 and test
+    case uploads take exactly one workbook.
+    """
+    if kind is not None and kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(IMPORT_KINDS)}")
+
+    grouped: Dict[str, List[UploadFile]] = {}
+    for upload in files:
+        file_kind = kind or detect_import_kind(upload.filename or "")
+        if file_kind is None:
+            raise HTTPException(status_code=400, detail=f"Cannot determine import type of {upload.filename}")
+        grouped.setdefault(file_kind, []).append(upload)
+
+    for file_kind, uploads in grouped.items():
+        if file_kind != "cfts" and len(uploads) > 1:
+            raise HTTPException(status_code=400, detail=f"Only one {file_kind} workbook per upload")
+        # Validate every group before queueing any job
+        try:
+            validate_upload_names(file_kind, [upload.filename for upload in uploads])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return [
+        ImportJob(**submit_import_job(
+            file_kind, [(upload.filename, upload.file) for upload in uploads]
+        ))
+        for file_kind, uploads in grouped.items()
+    ]
+
+
+@router.get("", response_model=List[ImportJob], summary="最近的匯入工作")
+def list_import_jobs(limit: int = Query(default=50, ge=1, le=500)) -> List[ImportJob]:
+    return [ImportJob(**job) for job in list_job_statuses(limit)]
+
+
+@router.get("/{job_id}", response_model=ImportJob, summary="匯入工作狀態與結果")
+def get_import_job(job_id: str) -> ImportJob:
+    job = read_job_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return ImportJob(**job)
+
+
+@router.get("/{job_id}/events", summary="以 SSE 串流匯入進度")
+async def stream_import_job(job_id: str) -> StreamingResponse:
+    """
+    Server-sent events: ``progress`` whenever the job status changes and a
+    final ``done`` event carrying the importer report.
+    """
+    if not read_job_status(job_id):
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    async def events():
+        last = None
+        idle = 0.0
+        while True:
+            job = read_job_status(job_id)
+            if job is None:
+                return
+            if job["state"] in FINAL_STATES:
+                yield f"event: done\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                return
+            if job != last:
+                last = job
+                idle = 0.0
+                yield f"event: progress\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            elif idle >= EVENT_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+            idle += EVENT_POLL_SECONDS
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
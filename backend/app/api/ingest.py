@@ -0,0 +1,150 @@
+"""Streaming NDJSON / CSV bulk ingest (non-Excel fast path)."""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..db.database import SessionLocal
+from ..db.ingest import INGEST_WRITERS, finish_ingest, related_ids, snapshot_entry
+from ..models.ingest import IngestError, IngestReport
+from ..models.requirement import CFTSRequirement
+from ..models.sys2_requirement import SYS2Requirement
+from ..models.testcase import TestCase
+from ..utils.streaming import iter_csv, iter_ndjson
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 100
+
+INGEST_MODELS = {
+    "cfts": CFTSRequirement,
+    "sys2": SYS2Requirement,
+    "testcases": TestCase,
+}
+_ADAPTERS = {table: TypeAdapter(List[model]) for table, model in INGEST_MODELS.items()}
+# Row key per table; blank keys are rejected rather than silently skipped
+_KEY_FIELDS = {"cfts": "req_id", "sys2": "melco_id", "testcases": "feature_id"}
+# Derived or server-side fields a client cannot set
+_EXCLUDED_FIELDS = {"created_at", "updated_at", "description_changed", "description_diff"}
+
+
+def _detect_format(requested: Optional[str], content_type: str) -> str:
+    if requested:
+        if requested not in ("ndjson", "csv"):
+            raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+        return requested
+    if content_type.split(";")[0].strip().lower() in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _validate(table: str, batch: List[Tuple[int, Dict]]) -> Tuple[List[Dict], List[IngestError]]:
+    """Validate a batch in one pass; only on failure fall back to row-by-row to locate errors."""
+    model = INGEST_MODELS[table]
+    key_field = _KEY_FIELDS[table]
+    try:
+        validated = _ADAPTERS[table].validate_python([record for _, record in batch])
+        if all(getattr(item, key_field).strip() for item in validated):
+            return [item.model_dump(exclude=_EXCLUDED_FIELDS) for item in validated], []
+    except ValidationError:
+        pass
+
+    records, errors = [], []
+    for line, record in batch:
+        try:
+            item = model.model_validate(record)
+        except ValidationError as e:
+            first = e.errors()[0]
+            field = ".".join(str(part) for part in first["loc"])
+            errors.append(IngestError(line=line, error=f"{field}: {first['msg']}"))
+            continue
+        if not getattr(item, key_field).strip():
+            errors.append(IngestError(line=line, error=f"{key_field}: must not be blank"))
+            continue
+        records.append(item.model_dump(exclude=_EXCLUDED_FIELDS))
+    return records, errors
+
+
+@router.post("/{table}", response_model=IngestReport, summary="串流批次寫入 (NDJSON/CSV)")
+async def ingest_table(
+    table: str,
+    request: Request,
+    format: Optional[str] = Query(default=None, description="ndjson 或 csv；未指定時依 Content-Type 判斷"),
+) -> IngestReport:
+    """
+    Upsert rows streamed as NDJSON (one object per line) or CSV (header row).
+
+    The body is parsed incrementally and written in batches of
+    ``INGEST_BATCH_SIZE``, so memory stays flat regardless of payload size.
+    CFTS rows are matched by Req.ID and SYS.2 rows by Melco ID; a matched row
+    is replaced as a whole. Test cases have no key and are appended, like the
+    Excel importer. Invalid rows are rejected with their line number while
+    the rest of the batch is written.
+    """
+    if table not in INGEST_MODELS:
+        raise HTTPException(status_code=404, detail=f"table must be one of {', '.join(INGEST_MODELS)}")
+    body_format = _detect_format(format, request.headers.get("content-type", ""))
+    parse = iter_csv if body_format == "csv" else iter_ndjson
+    write = INGEST_WRITERS[table]
+
+    started = time.perf_counter()
+    report = IngestReport(table=table, format=body_format)
+    snapshot_rows: Dict[str, Tuple[str, str]] = {}
+    related: Dict[str, List[str]] = {}
+
+    def reject(error: IngestError) -> None:
+        report.rejected += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(error)
+
+    db = SessionLocal()
+    try:
+        async def flush(batch: List[Tuple[int, Dict]]) -> None:
+            records, errors = _validate(table, batch)
+            for error in errors:
+                reject(error)
+            if not records:
+                return
+            inserted, updated, rows = await asyncio.to_thread(write, db, records)
+            report.inserted += inserted
+            report.updated += updated
+            for row in rows:
+                row_key, entry = snapshot_entry(table, row)
+                snapshot_rows[row_key] = entry
+                if table == "sys2":
+                    related[row["melco_id"]] = related_ids(row)
+
+        batch: List[Tuple[int, Dict]] = []
+        try:
+            async for line, record, error in parse(request.stream()):
+                report.received += 1
+                if error:
+                    reject(IngestError(line=line, error=error))
+                    continue
+                batch.append((line, record))
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+        except SQLAlchemyError as e:
+            # Earlier batches are committed; record them and report the abort
+            report.completed = False
+            report.errors.append(IngestError(error=f"Write failed: {str(e).splitlines()[0]}"))
+
+        if snapshot_rows:
+            report.dataset_version = await asyncio.to_thread(
+                finish_ingest, db, table, snapshot_rows, related, f"ingest:{body_format}"
+            )
+    finally:
+        db.close()
+
+    # Parse errors are reported as they stream in, validation errors per batch
+    report.errors.sort(key=lambda error: (error.line is None, error.line or 0))
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return report
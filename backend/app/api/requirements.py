@@ -1,9 +1,14 @@
 """CFTS Requirements API endpoints."""
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from sqlalchemy.orm import Session
-from typing import List
-from ..models.requirement import CFTSRequirement, CFTSSearchResult
+from typing import List, Optional
+from ..models.requirement import CFTSRequirement, CFTSSearchResult, FuzzyKind, FuzzySuggestion
 from ..db.database import get_db
+from ..utils.autocomplete import autocomplete_index
+from ..utils.prewarm import cfts_access_counter
+from ..utils.read_model import read_model
+from ..utils.search import LIKE_ESCAPE, prefix_pattern
+from ..utils.singleflight import single_flight
 from ..db.crud import (
     get_cfts_requirements_by_cfts_id, 
     get_requirement_by_req_id,
@@ -24,33 +29,58 @@ def db_requirement_to_pydantic(db_req) -> CFTSRequirement:
         description=db_req.description,
         sr24_description=db_req.sr24_description,
         melco_id=db_req.melco_id,
+        description_changed=db_req.description_changed,
+        description_diff=db_req.description_diff,
         created_at=db_req.created_at,
         updated_at=db_req.updated_at
     )
 
 
-@router.get("/search", response_model=CFTSSearchResult)
-async def search_cfts(cfts_id: str = Query(..., description="CFTS ID to search (supports partial matching, e.g., 'CFTS016')"), db: Session = Depends(get_db)):
-    """Search requirements by CFTS ID (supports partial matching)."""
-    import logging
-    logger = logging.getLogger(__name__)
+def _requirements_for(db: Session, cfts_id: str, changed_only: bool = False):
+    """CFTS rows from the in-memory read model when loaded, else from the database."""
+    if read_model.ready:
+        return read_model.cfts_requirements(cfts_id, changed_only=changed_only)
+    return get_cfts_requirements_by_cfts_id(db, cfts_id, changed_only=changed_only)
 
-    db_requirements = get_cfts_requirements_by_cfts_id(db, cfts_id)
 
-    if not db_requirements:
-        raise HTTPException(status_code=404, detail="CFTS not found")
+def _requirement_for(db: Session, req_id: str):
+    """Single CFTS row by Req.ID (read model first)."""
+    if read_model.ready:
+        return read_model.requirement_by_req_id(req_id)
+    return get_requirement_by_req_id(db, req_id)
 
-    # DEBUG: Log first requirement
-    if db_requirements:
-        first_db = db_requirements[0]
-        logger.info(f"DB req_id={first_db.req_id}, melco_id=\"{first_db.melco_id}\", created_at={first_db.created_at}")
 
-    requirements = [db_requirement_to_pydantic(req) for req in db_requirements]
+@router.get("/search", response_model=CFTSSearchResult)
+def search_cfts(
+    cfts_id: str = Query(..., description="CFTS ID to search (supports partial matching, e.g., 'CFTS016')"),
+    changed_only: bool = Query(False, description="Only return requirements whose SR26 description differs from SR24"),
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Search requirements by CFTS ID (supports partial matching).
+
+    Returns the JSON Response that single_flight serialized from
+    _search_cfts's CFTSSearchResult. FastAPI passes a Response through without
+    response_model validation; response_model only documents the schema.
+    """
+    result, response = _search_cfts.shared(cfts_id=cfts_id, changed_only=changed_only, db=db)
+    # Learn the most requested CFTS for prewarming; counted here, outside the
+    # coalesced call, so a burst of identical requests counts every request.
+    # Only the canonical IDs a search returned count (a partial query such as
+    # "CFTS01" counts every CFTS it matched); misses raise 404 before this.
+    for matched_id in dict.fromkeys(requirement.cfts_id for requirement in result.requirements):
+        cfts_access_counter.record(matched_id)
+    return response
+
+
+@single_flight
+def _search_cfts(cfts_id: str, changed_only: bool, db: Session) -> CFTSSearchResult:
+    db_requirements = _requirements_for(db, cfts_id, changed_only=changed_only)
+
+    if not db_requirements and not changed_only:
+        raise HTTPException(status_code=404, detail="CFTS not found")
 
-    # DEBUG: Log converted requirement
-    if requirements:
-        first_pyd = requirements[0]
-        logger.info(f"Pydantic req_id={first_pyd.req_id}, melco_id=\"{first_pyd.melco_id}\", created_at={first_pyd.created_at}")
+    requirements = [db_requirement_to_pydantic(req) for req in db_requirements]
 
     return CFTSSearchResult(
         cfts_id=cfts_id,
@@ -60,16 +90,17 @@ async def search_cfts(cfts_id: str = Query(..., description="CFTS ID to search (
 
 
 @req_router.get("/search", response_model=CFTSSearchResult)
-async def search_req(req_id: str = Query(..., description="Req.ID to search"), db: Session = Depends(get_db)):
+@single_flight
+def search_req(req_id: str = Query(..., description="Req.ID to search"), db: Session = Depends(get_db)) -> CFTSSearchResult:
     """Search requirement by Req.ID and return full CFTS list."""
-    db_requirement = get_requirement_by_req_id(db, req_id)
+    db_requirement = _requirement_for(db, req_id)
 
     if not db_requirement:
         raise HTTPException(status_code=404, detail="Requirement not found")
 
     # Get all requirements from the same CFTS
     cfts_id = db_requirement.cfts_id
-    db_requirements = get_cfts_requirements_by_cfts_id(db, cfts_id)
+    db_requirements = _requirements_for(db, cfts_id)
 
     requirements = [db_requirement_to_pydantic(req) for req in db_requirements]
 
@@ -82,9 +113,10 @@ async def search_req(req_id: str = Query(..., description="Req.ID to search"), d
 
 
 @router.get("/requirement/{req_id}", response_model=CFTSRequirement)
-async def get_requirement_by_id(req_id: str, db: Session = Depends(get_db)):
+@single_flight
+def get_requirement_by_id(req_id: str, db: Session = Depends(get_db)) -> CFTSRequirement:
     """Get specific requirement by Req.ID."""
-    db_requirement = get_requirement_by_req_id(db, req_id)
+    db_requirement = _requirement_for(db, req_id)
     
     if not db_requirement:
         raise HTTPException(status_code=404, detail="Requirement not found")
@@ -93,16 +125,22 @@ async def get_requirement_by_id(req_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[CFTSRequirement])
-async def get_all_requirements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@single_flight
+def get_all_requirements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)) -> List[CFTSRequirement]:
     """Get all CFTS requirements."""
-    db_requirements = get_all_cfts_requirements(db, skip=skip, limit=limit)
+    if read_model.ready:
+        db_requirements = read_model.all_requirements(skip=skip, limit=limit)
+    else:
+        db_requirements = get_all_cfts_requirements(db, skip=skip, limit=limit)
     return [db_requirement_to_pydantic(req) for req in db_requirements]
 
 
 @router.get("/autocomplete/cfts-ids")
 async def autocomplete_cfts_ids(db: Session = Depends(get_db)):
     """Get unique CFTS IDs with names for autocomplete (format: 'CFTS016 Anti-Theft')."""
-    from sqlalchemy import distinct
+    if autocomplete_index.ready:
+        return autocomplete_index.cfts_labels()
+
     from ..models.cfts_db import CFTSRequirementDB
 
     # Get distinct CFTS ID and name pairs
@@ -126,12 +164,44 @@ async def autocomplete_cfts_ids(db: Session = Depends(get_db)):
 @req_router.get("/autocomplete/req-ids")
 async def autocomplete_req_ids(query: str = Query("", min_length=0), db: Session = Depends(get_db)):
     """Get Req IDs for autocomplete (with optional prefix filter)."""
+    if autocomplete_index.ready:
+        return autocomplete_index.search_req_ids(query, limit=100)
+
     from ..models.cfts_db import CFTSRequirementDB
 
     req_query = db.query(CFTSRequirementDB.req_id).order_by(CFTSRequirementDB.req_id)
 
     if query:
-        req_query = req_query.filter(CFTSRequirementDB.req_id.like(f"{query}%"))
+        req_query = req_query.filter(
+            CFTSRequirementDB.req_id.like(prefix_pattern(query), escape=LIKE_ESCAPE)
+        )
 
     req_ids = req_query.limit(100).all()
-    return [req_id[0] for req_id in req_ids if req_id[0]]
\ No newline at end of file
+    return [req_id[0] for req_id in req_ids if req_id[0]]
+
+
+@router.get("/autocomplete/fuzzy", response_model=List[FuzzySuggestion])
+async def autocomplete_fuzzy(
+    query: str = Query(..., min_length=1, max_length=100, description="可能含錯字的 ID 或 CFTS 名稱"),
+    kinds: Optional[List[FuzzyKind]] = Query(
+        default=None, description="限定類型：req_id, cfts_id, cfts_name, melco_id（其他值回傳 422）"
+    ),
+    limit: int = Query(default=10, ge=1, le=50),
+    threshold: float = Query(default=0.3, ge=0.0, le=1.0, description="最低相似度"),
+):
+    """Typo-tolerant suggestions ranked by trigram similarity, served from memory."""
+    if not autocomplete_index.ready:
+        raise HTTPException(status_code=503, detail="Autocomplete index not ready")
+
+    matches = autocomplete_index.fuzzy_search(
+        query, limit=limit, threshold=threshold, kinds=set(kinds) if kinds else None
+    )
+    return [
+        FuzzySuggestion(
+            value=match.entry.value,
+            kind=match.entry.kind,
+            cfts_id=match.entry.cfts_id,
+            score=match.score,
+        )
+        for match in matches
+    ]
@@ -0,0 +1,281 @@
+"""Full-text and Japanese substring search across CFTS, SYS.2 and test case text."""
+import html
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from ..db.database import get_db
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.search import SearchHit, SearchResponse
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from ..utils.cjk import query_ngrams
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+# Must match the text search configuration of the generated search_vector columns
+TS_CONFIG = "english"
+# ts_headline marks matches with private-use sentinels; the text is HTML-escaped
+# before they become <mark> tags, so requirement text cannot inject markup
+MARK_START = "\ue000"
+MARK_STOP = "\ue001"
+HEADLINE_OPTIONS = (
+    f'StartSel="{MARK_START}", StopSel="{MARK_STOP}", MaxWords=35, MinWords=15, MaxFragments=2'
+)
+
+# entity -> (model, key column, title column, headline source columns)
+# Headline columns are the columns of the generated search_vector, so every hit gets a marked snippet
+ENTITIES = {
+    "cfts": (
+        CFTSRequirementDB,
+        CFTSRequirementDB.req_id,
+        CFTSRequirementDB.cfts_name,
+        (CFTSRequirementDB.description, CFTSRequirementDB.sr24_description),
+    ),
+    "sys2": (
+        SYS2RequirementDB,
+        SYS2RequirementDB.melco_id,
+        SYS2RequirementDB.type,
+        (
+            SYS2RequirementDB.requirement_en,
+            SYS2RequirementDB.verification_criteria,
+            SYS2RequirementDB.reason_en,
+            SYS2RequirementDB.supplement_en,
+        ),
+    ),
+    "testcase": (
+        TestCaseDB,
+        TestCaseDB.feature_id,
+        TestCaseDB.title,
+        (TestCaseDB.test_item_en, TestCaseDB.title),
+    ),
+}
+
+
+# entity -> (model, key column, title column, Japanese text columns covered by cjk_ngrams)
+CJK_ENTITIES = {
+    "sys2": (
+        SYS2RequirementDB,
+        SYS2RequirementDB.melco_id,
+        SYS2RequirementDB.type,
+        (
+            SYS2RequirementDB.requirement_en,
+            SYS2RequirementDB.reason_en,
+            SYS2RequirementDB.supplement_en,
+            SYS2RequirementDB.verification_criteria,
+        ),
+    ),
+    "testcase": (
+        TestCaseDB,
+        TestCaseDB.feature_id,
+        TestCaseDB.title,
+        (TestCaseDB.precondition_procedure_jp, TestCaseDB.criteria_jp),
+    ),
+}
+SNIPPET_CONTEXT_CHARS = 40
+
+
+def _ranked_hits(ts_query, entities: List[str]):
+    """UNION ALL of (entity, id, rank) for every matching row, served by the GIN indexes."""
+    selects = []
+    for entity in entities:
+        model = ENTITIES[entity][0]
+        selects.append(
+            select(
+                literal(entity).label("entity"),
+                model.id.label("id"),
+                func.ts_rank_cd(model.search_vector, ts_query).label("rank"),
+            ).where(model.search_vector.bool_op("@@")(ts_query))
+        )
+    return union_all(*selects).subquery("hits")
+
+
+def _load_page_rows(
+    db: Session, entity: str, ids: List[int], ts_query
+) -> Dict[int, tuple]:
+    """Fetch display fields and highlighted snippets for one entity's page rows."""
+    model, key_column, title_column, text_columns = ENTITIES[entity]
+    document = func.concat_ws(" ", *text_columns)
+    rows = db.execute(
+        select(
+            model.id,
+            key_column,
+            model.cfts_id if hasattr(model, "cfts_id") else literal(None),
+            title_column,
+            func.ts_headline(TS_CONFIG, document, ts_query, HEADLINE_OPTIONS),
+        ).where(model.id.in_(ids))
+    ).all()
+    return {row[0]: row[1:] for row in rows}
+
+
+@router.get("", response_model=SearchResponse, summary="全文檢索需求與測試案例")
+def full_text_search(
+    q: str = Query(..., min_length=1, max_length=200, description="搜尋字串（支援 \"片語\"、OR、-排除）"),
+    types: Optional[List[str]] = Query(
+        default=None, description="限定類型：cfts, sys2, testcase"
+    ),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+) -> SearchResponse:
+    """Ranked full-text search over requirement and test case text."""
+    entities = [entity for entity in ENTITIES if not types or entity in types]
+    if not entities:
+        return SearchResponse(query=q, total=0, limit=limit, offset=offset, hits=[])
+
+    ts_query = func.websearch_to_tsquery(TS_CONFIG, q)
+    hits = _ranked_hits(ts_query, entities)
+
+    page = db.execute(
+        select(hits.c.entity, hits.c.id, hits.c.rank, func.count().over().label("total"))
+        .order_by(hits.c.rank.desc(), hits.c.entity, hits.c.id)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+
+    if not page:
+        total = 0
+        if offset:
+            total = db.execute(select(func.count()).select_from(hits)).scalar()
+        return SearchResponse(query=q, total=total, limit=limit, offset=offset, hits=[])
+
+    # Headlines are expensive, so only build them for the rows on this page
+    ids_by_entity: Dict[str, List[int]] = {}
+    for entity, row_id, _, _ in page:
+        ids_by_entity.setdefault(entity, []).append(row_id)
+    details = {
+        entity: _load_page_rows(db, entity, ids, ts_query)
+        for entity, ids in ids_by_entity.items()
+    }
+
+    result = []
+    for entity, row_id, rank, _ in page:
+        key, cfts_id, title, snippet = details[entity][row_id]
+        result.append(
+            SearchHit(
+                entity=entity,
+                id=row_id,
+                key=key or "",
+                cfts_id=cfts_id,
+                title=title or "",
+                snippet=_highlight(snippet or ""),
+                rank=rank,
+            )
+        )
+
+    return SearchResponse(query=q, total=page[0].total, limit=limit, offset=offset, hits=result)
+
+
+def _highlight(headline: str) -> str:
+    """HTML-escape a ts_headline result and turn its sentinels into <mark> tags."""
+    return html.escape(headline).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+def _occurrences(column, term: str):
+    """SQL expression counting non-overlapping occurrences of ``term`` in ``column``."""
+    text_value = func.coalesce(column, "")
+    removed = func.length(text_value) - func.length(func.replace(text_value, term, ""))
+    return removed // len(term)
+
+
+def _substring_snippet(texts, term: str) -> str:
+    """Excerpt (HTML-escaped) around the first occurrence of ``term`` with the match highlighted."""
+    for value in texts:
+        position = (value or "").find(term)
+        if position < 0:
+            continue
+        start = max(0, position - SNIPPET_CONTEXT_CHARS)
+        end = position + len(term) + SNIPPET_CONTEXT_CHARS
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(value) else ""
+        return (
+            f"{prefix}{html.escape(value[start:position])}<mark>{html.escape(term)}</mark>"
+            f"{html.escape(value[position + len(term):end])}{suffix}"
+        )
+    return ""
+
+
+@router.get("/japanese", response_model=SearchResponse, summary="日文子字串檢索（CJK n-gram 索引）")
+def japanese_substring_search(
+    q: str = Query(..., min_length=1, max_length=100, description="日文搜尋字串（子字串比對）"),
+    types: Optional[List[str]] = Query(default=None, description="限定類型：sys2, testcase"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+) -> SearchResponse:
+    """Substring search over Japanese text, narrowed by the GIN-indexed cjk_ngrams arrays."""
+    term = q.strip()
+    grams = query_ngrams(term)
+    if not grams:
+        raise HTTPException(status_code=400, detail="Query must contain Japanese (CJK) characters")
+
+    entities = [entity for entity in CJK_ENTITIES if not types or entity in types]
+    if not entities:
+        return SearchResponse(query=q, total=0, limit=limit, offset=offset, hits=[])
+
+    selects = []
+    for entity in entities:
+        model, _, _, text_columns = CJK_ENTITIES[entity]
+        occurrences = sum(_occurrences(column, term) for column in text_columns)
+        selects.append(
+            select(
+                literal(entity).label("entity"),
+                model.id.label("id"),
+                occurrences.label("rank"),
+            ).where(
+                # Index filter first, then recheck the real substring
+                model.cjk_ngrams.contains(grams),
+                or_(*[func.strpos(column, term) > 0 for column in text_columns]),
+            )
+        )
+    hits = union_all(*selects).subquery("hits")
+
+    page = db.execute(
+        select(hits.c.entity, hits.c.id, hits.c.rank, func.count().over().label("total"))
+        .order_by(hits.c.rank.desc(), hits.c.entity, hits.c.id)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+
+    if not page:
+        total = 0
+        if offset:
+            total = db.execute(select(func.count()).select_from(hits)).scalar()
+        return SearchResponse(query=q, total=total, limit=limit, offset=offset, hits=[])
+
+    ids_by_entity: Dict[str, List[int]] = {}
+    for entity, row_id, _, _ in page:
+        ids_by_entity.setdefault(entity, []).append(row_id)
+
+    details: Dict[str, Dict[int, tuple]] = {}
+    for entity, ids in ids_by_entity.items():
+        model, key_column, title_column, text_columns = CJK_ENTITIES[entity]
+        rows = db.execute(
+            select(
+                model.id,
+                key_column,
+                model.cfts_id if hasattr(model, "cfts_id") else literal(None),
+                title_column,
+                *text_columns,
+            ).where(model.id.in_(ids))
+        ).all()
+        details[entity] = {row[0]: row[1:] for row in rows}
+
+    result = []
+    for entity, row_id, rank, _ in page:
+        key, cfts_id, title, *texts = details[entity][row_id]
+        result.append(
+            SearchHit(
+                entity=entity,
+                id=row_id,
+                key=key or "",
+                cfts_id=cfts_id,
+                title=title or "",
+                snippet=_substring_snippet(texts, term),
+                rank=rank,
+            )
+        )
+
+    return SearchResponse(query=q, total=page[0].total, limit=limit, offset=offset, hits=result)
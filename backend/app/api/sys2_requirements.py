@@ -3,13 +3,24 @@ from typing import Dict, Iterable, List, Optional, Sequence, Set
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 from ..db.database import get_db
+from ..db.graph import get_neighborhood
 from ..models.cfts_db import CFTSRequirementDB
-from ..models.sys2_requirement import SYS2RequirementDB, SYS2Requirement
-from ..utils.melco import generate_melco_variants, normalize_melco_id
+from ..models.sys2_requirement import (
+    SYS2GraphEdge,
+    SYS2GraphNode,
+    SYS2GraphResponse,
+    SYS2RequirementDB,
+    SYS2Requirement,
+)
+from ..utils.autocomplete import autocomplete_index
+from ..utils.read_model import read_model
+from ..utils.melco import melco_variant_pool, normalize_melco_id, normalize_melco_ids
+from ..utils.search import LIKE_ESCAPE, prefix_pattern
+from ..utils.singleflight import single_flight
 
 router = APIRouter(prefix="/sys2", tags=["sys2"])
 
@@ -28,11 +39,30 @@ class SYS2AvailabilityRequest(BaseModel):
     )
 
 
+class SYS2BatchRequest(BaseModel):
+    """Request body for batch SYS.2 detail lookups."""
+    ids: Sequence[str] = Field(
+        default_factory=list,
+        description="Melco ID 列表",
+        min_length=1,
+        max_length=1000,
+    )
+
+
+class SYS2BatchResponse(BaseModel):
+    """SYS.2 requirements grouped by canonical Melco ID."""
+    results: Dict[str, List[SYS2Requirement]]
+    missing_ids: List[str]
+
+
 def _build_cfts_lookup(db: Session, cfts_ids: List[str]) -> Dict[str, str]:
     """Fetch distinct CFTS names for the provided IDs."""
     if not cfts_ids:
         return {}
 
+    if read_model.ready:
+        return read_model.cfts_names(cfts_ids)
+
     rows = (
         db.query(CFTSRequirementDB.cfts_id, CFTSRequirementDB.cfts_name)
         .filter(CFTSRequirementDB.cfts_id.in_(cfts_ids))
@@ -42,6 +72,18 @@ def _build_cfts_lookup(db: Session, cfts_ids: List[str]) -> Dict[str, str]:
     return {cfts_id: cfts_name or "" for cfts_id, cfts_name in rows}
 
 
+def _records_for_variants(db: Session, variants: Set[str]) -> list:
+    """SYS.2 rows whose stored Melco ID is one of ``variants``, by primary key."""
+    if read_model.ready:
+        return read_model.sys2_by_melco_ids(variants)
+    return (
+        db.query(SYS2RequirementDB)
+        .filter(SYS2RequirementDB.melco_id.in_(variants))
+        .order_by(SYS2RequirementDB.id.asc())
+        .all()
+    )
+
+
 def _to_pydantic(record: SYS2RequirementDB, cfts_lookup: Dict[str, str]) -> SYS2Requirement:
     """Convert DB model to Pydantic model, enriching CFTS name when missing."""
     requirement = SYS2Requirement.model_validate(record, from_attributes=True)
@@ -54,14 +96,16 @@ def _to_pydantic(record: SYS2RequirementDB, cfts_lookup: Dict[str, str]) -> SYS2
 
 def _availability_lookup(ids: Iterable[str], db: Session) -> SYS2AvailabilityResponse:
     """Core availability lookup that accepts any iterable of Melco IDs."""
-    unique_ids = [item for item in dict.fromkeys(normalize_melco_id(value) for value in ids if value)]
+    unique_ids = normalize_melco_ids(ids)
 
     if not unique_ids:
         return SYS2AvailabilityResponse(available_ids=[])
 
-    variant_pool: Set[str] = set()
-    for melco_id in unique_ids:
-        variant_pool.update(generate_melco_variants(melco_id))
+    # Served from the prewarmed in-memory set when available
+    if autocomplete_index.ready:
+        return SYS2AvailabilityResponse(available_ids=autocomplete_index.sys2_available(unique_ids))
+
+    variant_pool = melco_variant_pool(unique_ids)
 
     if not variant_pool:
         return SYS2AvailabilityResponse(available_ids=[])
@@ -73,17 +117,11 @@ def _availability_lookup(ids: Iterable[str], db: Session) -> SYS2AvailabilityRes
         .all()
     )
 
-    available_normalized = {
-        normalize_melco_id(row_melco_id) for (row_melco_id,) in rows if row_melco_id
-    }
+    available_normalized = set(normalize_melco_ids(row_melco_id for (row_melco_id,) in rows))
 
-    available = [
-        melco_id
-        for melco_id in unique_ids
-        if melco_id and melco_id in available_normalized
-    ]
+    available = [melco_id for melco_id in unique_ids if melco_id in available_normalized]
 
-    return SYS2AvailabilityResponse(available_ids=list(dict.fromkeys(available)))
+    return SYS2AvailabilityResponse(available_ids=available)
 
 
 @router.get(
@@ -91,21 +129,15 @@ def _availability_lookup(ids: Iterable[str], db: Session) -> SYS2AvailabilityRes
     response_model=List[SYS2Requirement],
     summary="取得指定 Melco ID 的 SYS.2 要件資料",
 )
+@single_flight
 def get_sys2_by_melco_id(melco_id: str, db: Session = Depends(get_db)) -> List[SYS2Requirement]:
     """Return SYS.2 requirements associated with a specific Melco ID."""
-    normalized_id = normalize_melco_id(melco_id)
-    variants: Set[str] = generate_melco_variants(melco_id)
-    variants.update(generate_melco_variants(normalized_id))
+    variants = melco_variant_pool([melco_id, normalize_melco_id(melco_id)])
 
     if not variants:
         raise HTTPException(status_code=404, detail="SYS.2 requirement not found")
 
-    records = (
-        db.query(SYS2RequirementDB)
-        .filter(SYS2RequirementDB.melco_id.in_(variants))
-        .order_by(SYS2RequirementDB.id.asc())
-        .all()
-    )
+    records = _records_for_variants(db, variants)
 
     if not records:
         raise HTTPException(status_code=404, detail="SYS.2 requirement not found")
@@ -117,11 +149,78 @@ def get_sys2_by_melco_id(melco_id: str, db: Session = Depends(get_db)) -> List[S
     return [_to_pydantic(record, cfts_lookup) for record in records]
 
 
+@router.post(
+    "/requirements/batch",
+    response_model=SYS2BatchResponse,
+    summary="批次取得多個 Melco ID 的 SYS.2 要件資料",
+)
+def get_sys2_batch(
+    payload: SYS2BatchRequest,
+    db: Session = Depends(get_db),
+) -> SYS2BatchResponse:
+    """Return SYS.2 requirements for many Melco IDs using a single query."""
+    unique_ids = normalize_melco_ids(payload.ids)
+
+    variant_pool = melco_variant_pool(unique_ids)
+
+    if not variant_pool:
+        return SYS2BatchResponse(results={}, missing_ids=[])
+
+    records = _records_for_variants(db, variant_pool)
+
+    cfts_lookup = _build_cfts_lookup(
+        db, list({record.cfts_id for record in records if record.cfts_id})
+    )
+
+    grouped: Dict[str, List[SYS2Requirement]] = {}
+    for record in records:
+        key = normalize_melco_id(record.melco_id)
+        grouped.setdefault(key, []).append(_to_pydantic(record, cfts_lookup))
+
+    results = {melco_id: grouped[melco_id] for melco_id in unique_ids if melco_id in grouped}
+    missing = [melco_id for melco_id in unique_ids if melco_id not in grouped]
+
+    return SYS2BatchResponse(results=results, missing_ids=missing)
+
+
+@router.get(
+    "/graph/{melco_id}",
+    response_model=SYS2GraphResponse,
+    summary="取得 Melco ID 的關聯要件網路",
+)
+@single_flight
+def get_sys2_graph(
+    melco_id: str,
+    depth: int = Query(default=2, ge=1, le=6, description="最大展開層數"),
+    limit: int = Query(default=200, ge=1, le=2000, description="節點數上限"),
+    direction: str = Query(default="both", pattern="^(both|out|in)$", description="out=關連到、in=被關連、both=雙向"),
+    db: Session = Depends(get_db),
+) -> SYS2GraphResponse:
+    """Return the related requirement neighborhood of a Melco ID."""
+    root = normalize_melco_id(melco_id)
+    if not root:
+        raise HTTPException(status_code=404, detail="SYS.2 requirement not found")
+
+    nodes, edges, truncated = get_neighborhood(db, root, depth=depth, limit=limit, direction=direction)
+
+    return SYS2GraphResponse(
+        root=root,
+        depth=depth,
+        nodes=[
+            SYS2GraphNode(melco_id=node_id, depth=node_depth, cfts_id=cfts_id, in_sys2=in_sys2)
+            for node_id, node_depth, cfts_id, in_sys2 in nodes
+        ],
+        edges=[SYS2GraphEdge(source=source, target=target) for source, target in edges],
+        truncated=truncated,
+    )
+
+
 @router.get(
     "/search",
     response_model=List[SYS2Requirement],
     summary="依條件搜尋 SYS.2 要件",
 )
+@single_flight
 def search_sys2_requirements(
     cfts_id: Optional[str] = Query(default=None, description="CFTS 編號，可模糊搜尋"),
     melco_id: Optional[str] = Query(default=None, description="Melco ID，可模糊搜尋"),
@@ -129,25 +228,36 @@ def search_sys2_requirements(
     db: Session = Depends(get_db),
 ) -> List[SYS2Requirement]:
     """Search SYS.2 requirements by CFTS ID or Melco ID."""
-    query = db.query(SYS2RequirementDB)
-
-    if cfts_id:
-        query = query.filter(SYS2RequirementDB.cfts_id.ilike(f"{cfts_id}%"))
-
+    prefixes: List[str] = []
     if melco_id:
         normalized_id = normalize_melco_id(melco_id)
-        conditions = [SYS2RequirementDB.melco_id.ilike(f"{melco_id}%")]
+        prefixes = [melco_id]
         if normalized_id and normalized_id != melco_id:
-            conditions.extend(
-                [
-                    SYS2RequirementDB.melco_id.ilike(f"{normalized_id}%"),
-                    SYS2RequirementDB.melco_id.ilike(f"#{normalized_id}%"),
-                    SYS2RequirementDB.melco_id.ilike(f"##{normalized_id}%"),
-                ]
+            prefixes.extend([normalized_id, f"#{normalized_id}", f"##{normalized_id}"])
+
+    if read_model.ready:
+        records = read_model.search_sys2(cfts_id, prefixes, limit)
+    else:
+        query = db.query(SYS2RequirementDB)
+
+        # upper(column) LIKE 'PREFIX%' matches the upper() text_pattern_ops indexes,
+        # unlike ILIKE which always falls back to a sequential scan.
+        if cfts_id:
+            query = query.filter(
+                func.upper(SYS2RequirementDB.cfts_id).like(
+                    prefix_pattern(cfts_id, upper=True), escape=LIKE_ESCAPE
+                )
             )
-        query = query.filter(or_(*conditions))
 
-    records = query.order_by(SYS2RequirementDB.melco_id.asc()).limit(limit).all()
+        if prefixes:
+            melco_upper = func.upper(SYS2RequirementDB.melco_id)
+            conditions = [
+                melco_upper.like(prefix_pattern(prefix, upper=True), escape=LIKE_ESCAPE)
+                for prefix in prefixes
+            ]
+            query = query.filter(or_(*conditions))
+
+        records = query.order_by(SYS2RequirementDB.melco_id.asc()).limit(limit).all()
 
     if not records:
         return []
@@ -164,6 +274,7 @@ def search_sys2_requirements(
     response_model=SYS2AvailabilityResponse,
     summary="檢查多個 Melco ID 是否存在 SYS.2 資料",
 )
+@single_flight
 def check_sys2_availability(
     ids: str = Query(
         ...,
@@ -1,14 +1,38 @@
 """Test case API endpoints."""
-from typing import List
+from typing import Dict, List, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..db.database import get_db
 from ..models.testcase import TestCaseDB, TestCaseResponse
+from ..models.testcase_rollup import ROLLUP_DIMENSIONS, TestCaseRollupDB, TestCaseStatsResponse
+from ..utils.read_model import read_model
+from ..utils.search import LIKE_ESCAPE, prefix_pattern
+from ..utils.singleflight import single_flight
 
 router = APIRouter(prefix="/testcases", tags=["testcases"])
 
+STATS_GROUP_BY = ("cfts_id", "feature_id") + ROLLUP_DIMENSIONS
+
+
+class TestCaseBatchRequest(BaseModel):
+    """Request body for batch test case lookups."""
+    ids: Sequence[str] = Field(
+        default_factory=list,
+        description="Feature ID (Melco ID) 列表",
+        min_length=1,
+        max_length=1000,
+    )
+
+
+class TestCaseBatchResponse(BaseModel):
+    """Test cases grouped by feature ID."""
+    results: Dict[str, List[TestCaseResponse]]
+    missing_ids: List[str]
+
 
 def _db_to_response(record: TestCaseDB) -> TestCaseResponse:
     """Convert SQLAlchemy model to API response model."""
@@ -23,21 +47,101 @@ def _db_to_response(record: TestCaseDB) -> TestCaseResponse:
     )
 
 
+def _records_for_features(db: Session, feature_ids: List[str]) -> list:
+    """Test case rows for the feature IDs (read model first), by primary key."""
+    if read_model.ready:
+        return read_model.testcases_by_feature_ids(feature_ids)
+    return (
+        db.query(TestCaseDB)
+        .filter(TestCaseDB.feature_id.in_(feature_ids))
+        .order_by(TestCaseDB.id.asc())
+        .all()
+    )
+
+
 @router.get(
     "/by-feature-id/{feature_id}",
     response_model=List[TestCaseResponse],
     summary="依 Feature ID 取得對應測試案例",
 )
+@single_flight
 def get_testcases_by_feature_id(feature_id: str, db: Session = Depends(get_db)) -> List[TestCaseResponse]:
     """Return all test cases that match the specified feature (Melco) ID."""
-    records = (
-        db.query(TestCaseDB)
-        .filter(TestCaseDB.feature_id == feature_id)
-        .order_by(TestCaseDB.id.asc())
-        .all()
-    )
+    records = _records_for_features(db, [feature_id])
 
     if not records:
         raise HTTPException(status_code=404, detail="Test cases not found")
 
     return [_db_to_response(record) for record in records]
+
+
+@router.post(
+    "/batch",
+    response_model=TestCaseBatchResponse,
+    summary="批次取得多個 Feature ID 的測試案例",
+)
+def get_testcases_batch(
+    payload: TestCaseBatchRequest,
+    db: Session = Depends(get_db),
+) -> TestCaseBatchResponse:
+    """Return test cases for many feature IDs using a single query."""
+    unique_ids = [item for item in dict.fromkeys(value.strip() for value in payload.ids if value) if item]
+
+    if not unique_ids:
+        return TestCaseBatchResponse(results={}, missing_ids=[])
+
+    records = _records_for_features(db, unique_ids)
+
+    grouped: Dict[str, List[TestCaseResponse]] = {}
+    for record in records:
+        grouped.setdefault(record.feature_id, []).append(_db_to_response(record))
+
+    results = {feature_id: grouped[feature_id] for feature_id in unique_ids if feature_id in grouped}
+    missing = [feature_id for feature_id in unique_ids if feature_id not in grouped]
+
+    return TestCaseBatchResponse(results=results, missing_ids=missing)
+
+
+@router.get(
+    "/stats",
+    response_model=TestCaseStatsResponse,
+    summary="依結果、測試者、優先度、版本等維度統計測試案例",
+)
+@single_flight
+def get_testcase_stats(
+    group_by: List[str] = Query(
+        default=["test_result"],
+        description=f"分組維度：{', '.join(STATS_GROUP_BY)}",
+    ),
+    cfts_id: Optional[str] = Query(default=None, description="限定 CFTS，例如 'CFTS016'"),
+    feature_prefix: Optional[str] = Query(default=None, description="Feature ID 前綴，例如 'PSCFTS016-1'"),
+    db: Session = Depends(get_db),
+) -> TestCaseStatsResponse:
+    """Group-by counts answered from the rollup table, never from testcases."""
+    invalid = [dimension for dimension in group_by if dimension not in STATS_GROUP_BY]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unsupported group_by: {', '.join(invalid)}")
+
+    dimensions = list(dict.fromkeys(group_by))
+    columns = [getattr(TestCaseRollupDB, dimension) for dimension in dimensions]
+    count = func.sum(TestCaseRollupDB.test_count).label("count")
+
+    query = db.query(*columns, count)
+    if cfts_id:
+        query = query.filter(TestCaseRollupDB.cfts_id == cfts_id)
+    if feature_prefix:
+        query = query.filter(
+            TestCaseRollupDB.feature_id.like(prefix_pattern(feature_prefix), escape=LIKE_ESCAPE)
+        )
+
+    rows = query.group_by(*columns).order_by(count.desc(), *columns).all()
+
+    groups = [
+        {**dict(zip(dimensions, row[:-1])), "count": int(row[-1])}
+        for row in rows
+    ]
+    return TestCaseStatsResponse(
+        group_by=dimensions,
+        total=sum(group["count"] for group in groups),
+        groups=groups,
+    )
@@ -1,8 +1,14 @@
-"""CRUD operations for CFTS requirements."""
+"""CRUD operations for CFTS requirements and dataset bookkeeping."""
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models.cfts_db import CFTSRequirementDB
+from ..models.dataset_version import DatasetVersionDB
 from ..models.requirement import CFTSRequirement
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from ..utils.cjk import cjk_ngrams
+from ..utils.search import LIKE_ESCAPE, prefix_pattern
+from ..utils.text_diff import description_diff_fields
 
 
 def create_cfts_requirement(db: Session, requirement: CFTSRequirement) -> CFTSRequirementDB:
@@ -15,6 +21,7 @@ def create_cfts_requirement(db: Session, requirement: CFTSRequirement) -> CFTSRe
         description=requirement.description,
         sr24_description=requirement.sr24_description,
         melco_id=requirement.melco_id,
+        **description_diff_fields(requirement.sr24_description, requirement.description),
     )
     db.add(db_requirement)
     db.commit()
@@ -22,16 +29,23 @@ def create_cfts_requirement(db: Session, requirement: CFTSRequirement) -> CFTSRe
     return db_requirement
 
 
-def get_cfts_requirements_by_cfts_id(db: Session, cfts_id: str) -> List[CFTSRequirementDB]:
+def get_cfts_requirements_by_cfts_id(
+    db: Session, cfts_id: str, changed_only: bool = False
+) -> List[CFTSRequirementDB]:
     """Get all requirements for a specific CFTS ID (supports partial matching)."""
+    query = db.query(CFTSRequirementDB)
+    if changed_only:
+        # Bare boolean predicate so the partial index on changed rows applies
+        query = query.filter(CFTSRequirementDB.description_changed)
+
     # If user inputs just "CFTS016", search for all CFTS IDs that start with it
     if not cfts_id.endswith('-'):
-        return db.query(CFTSRequirementDB).filter(
-            CFTSRequirementDB.cfts_id.like(f"{cfts_id}%")
+        return query.filter(
+            CFTSRequirementDB.cfts_id.like(prefix_pattern(cfts_id), escape=LIKE_ESCAPE)
         ).all()
     else:
         # Exact match for full CFTS ID
-        return db.query(CFTSRequirementDB).filter(CFTSRequirementDB.cfts_id == cfts_id).all()
+        return query.filter(CFTSRequirementDB.cfts_id == cfts_id).all()
 
 
 def get_requirement_by_req_id(db: Session, req_id: str) -> Optional[CFTSRequirementDB]:
@@ -61,6 +75,7 @@ def bulk_create_cfts_requirements(db: Session, requirements: List[CFTSRequiremen
                 description=req.description,
                 sr24_description=req.sr24_description,
                 melco_id=req.melco_id,
+                **description_diff_fields(req.sr24_description, req.description),
             )
             db.add(db_requirement)
             inserted_count += 1
@@ -71,6 +86,88 @@ def bulk_create_cfts_requirements(db: Session, requirements: List[CFTSRequiremen
             existing.description = req.description
             existing.sr24_description = req.sr24_description
             existing.melco_id = req.melco_id
+            for key, value in description_diff_fields(req.sr24_description, req.description).items():
+                setattr(existing, key, value)
 
     db.commit()
     return inserted_count
+
+
+def backfill_description_diffs(db: Session, chunk_size: int = 1000) -> int:
+    """Compute SR24/SR26 diffs for rows imported before the columns existed."""
+    updated = 0
+    while True:
+        rows = db.query(
+            CFTSRequirementDB.id, CFTSRequirementDB.sr24_description, CFTSRequirementDB.description
+        ).filter(CFTSRequirementDB.description_changed.is_(None)).limit(chunk_size).all()
+        if not rows:
+            return updated
+
+        db.bulk_update_mappings(CFTSRequirementDB, [
+            {"id": row_id, **description_diff_fields(sr24_description, description)}
+            for row_id, sr24_description, description in rows
+        ])
+        db.commit()
+        updated += len(rows)
+
+
+# Text columns that feed cjk_ngrams (same as the importers and the ingest writers)
+CJK_NGRAM_SOURCES = {
+    SYS2RequirementDB: ("requirement_en", "reason_en", "supplement_en", "verification_criteria"),
+    TestCaseDB: ("precondition_procedure_jp", "criteria_jp"),
+}
+
+
+def backfill_cjk_ngrams(db: Session, chunk_size: int = 1000) -> int:
+    """Compute Japanese search n-grams for rows imported before the column existed."""
+    updated = 0
+    for model, columns in CJK_NGRAM_SOURCES.items():
+        while True:
+            rows = db.query(
+                model.id, *(getattr(model, column) for column in columns)
+            ).filter(model.cjk_ngrams.is_(None)).limit(chunk_size).all()
+            if not rows:
+                break
+
+            # Rows without Japanese text get [] and are not selected again
+            db.bulk_update_mappings(model, [
+                {"id": row_id, "cjk_ngrams": cjk_ngrams(*texts)}
+                for row_id, *texts in rows
+            ])
+            db.commit()
+            updated += len(rows)
+    return updated
+
+
+DATASET_VERSION_ROW_ID = 1
+
+
+def get_dataset_version(db: Session) -> int:
+    """Return the current dataset version (0 before the first import)."""
+    version = db.query(DatasetVersionDB.version).filter(
+        DatasetVersionDB.id == DATASET_VERSION_ROW_ID
+    ).scalar()
+    return version or 0
+
+
+def bump_dataset_version(db: Session, commit: bool = True) -> int:
+    """
+    Increment the dataset version so in-process caches know to reload.
+
+    Pass ``commit=False`` to commit it together with the generation that
+    record_generation writes, so workers never see a version without history.
+    """
+    record = db.query(DatasetVersionDB).filter(
+        DatasetVersionDB.id == DATASET_VERSION_ROW_ID
+    ).with_for_update().first()
+
+    if record is None:
+        record = DatasetVersionDB(id=DATASET_VERSION_ROW_ID, version=0)
+        db.add(record)
+
+    record.version = (record.version or 0) + 1
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return record.version
@@ -0,0 +1,164 @@
+"""Dataset generations: per-row validity ranges recorded by the importers."""
+import hashlib
+import json
+from typing import Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.dataset_generation import DatasetGenerationDB, DatasetRowVersionDB
+
+# Derived columns that do not represent source content
+_NON_CONTENT_FIELDS = {"cjk_ngrams", "description_changed", "description_diff"}
+CHUNK_SIZE = 1000
+
+
+def content_hash(record: Mapping) -> str:
+    """Stable hash over a record's source fields."""
+    payload = {key: value for key, value in record.items() if key not in _NON_CONTENT_FIELDS}
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def testcase_row_key(record: Mapping) -> str:
+    """Test cases have no unique ID; identify them by feature, source, title and section."""
+    return "|".join(
+        record.get(field) or "" for field in ("feature_id", "source", "title", "section")
+    )
+
+
+def record_generation(
+    db: Session,
+    generation: int,
+    entity: str,
+    rows: Dict[str, Tuple[str, str]],
+    source: str = "",
+    scopes: Optional[Set[str]] = None,
+    partial: bool = False,
+) -> DatasetGenerationDB:
+    """
+    Record the imported rows of ``entity`` as ``generation``.
+
+    ``rows`` maps row key -> (scope, content hash). Current rows that are
+    missing from ``rows`` are closed as removed; when ``scopes`` is given only
+    current rows within those scopes are considered (e.g. the CFTS files that
+    were actually imported). A row whose scope moved counts as changed.
+    ``partial`` imports (upserts of some rows) never remove anything.
+    """
+    current_query = db.query(
+        DatasetRowVersionDB.id, DatasetRowVersionDB.row_key, DatasetRowVersionDB.scope,
+        DatasetRowVersionDB.content_hash,
+    ).filter(DatasetRowVersionDB.entity == entity, DatasetRowVersionDB.valid_to.is_(None))
+    if scopes is not None:
+        current_query = current_query.filter(DatasetRowVersionDB.scope.in_(scopes))
+    if partial:
+        keys = list(rows)
+        current = {}
+        for start in range(0, len(keys), CHUNK_SIZE):
+            chunk_query = current_query.filter(
+                DatasetRowVersionDB.row_key.in_(keys[start:start + CHUNK_SIZE])
+            )
+            current.update({
+                row_key: (row_id, (row_scope, row_hash))
+                for row_id, row_key, row_scope, row_hash in chunk_query
+            })
+    else:
+        current = {
+            row_key: (row_id, (row_scope, row_hash))
+            for row_id, row_key, row_scope, row_hash in current_query
+        }
+
+    closed_ids = []
+    new_rows = []
+    added = changed = 0
+    for row_key, (scope, row_hash) in rows.items():
+        existing = current.get(row_key)
+        if existing and existing[1] == (scope, row_hash):
+            continue
+        if existing:
+            closed_ids.append(existing[0])
+            changed += 1
+        else:
+            added += 1
+        new_rows.append({
+            "entity": entity,
+            "row_key": row_key,
+            "scope": scope,
+            "content_hash": row_hash,
+            "valid_from": generation,
+        })
+    removed_ids = [row_id for row_key, (row_id, _) in current.items() if row_key not in rows]
+    closed_ids.extend(removed_ids)
+
+    record = DatasetGenerationDB(
+        generation=generation,
+        entity=entity,
+        source=source,
+        row_count=len(rows),
+        added_count=added,
+        removed_count=len(removed_ids),
+        changed_count=changed,
+    )
+    try:
+        for start in range(0, len(closed_ids), CHUNK_SIZE):
+            db.query(DatasetRowVersionDB).filter(
+                DatasetRowVersionDB.id.in_(closed_ids[start:start + CHUNK_SIZE])
+            ).update({DatasetRowVersionDB.valid_to: generation}, synchronize_session=False)
+        if new_rows:
+            db.execute(DatasetRowVersionDB.__table__.insert(), new_rows)
+        db.add(record)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return record
+
+
+def _state_at(entity: str, generation: int):
+    """Rows of ``entity`` that were current at ``generation``."""
+    return select(
+        DatasetRowVersionDB.row_key, DatasetRowVersionDB.content_hash
+    ).where(
+        DatasetRowVersionDB.entity == entity,
+        DatasetRowVersionDB.valid_from <= generation,
+        or_(DatasetRowVersionDB.valid_to.is_(None), DatasetRowVersionDB.valid_to > generation),
+    )
+
+
+def diff_generations(
+    db: Session, entity: str, from_generation: int, to_generation: int
+) -> Tuple[list, list, list]:
+    """
+    Return (added, removed, changed) row keys between two generations.
+
+    Only rows whose validity range starts or ends inside (from, to] can
+    differ, so both states are restricted to those keys via the
+    valid_from/valid_to indexes before being compared.
+    """
+    window = (DatasetRowVersionDB.valid_from > from_generation) & (
+        DatasetRowVersionDB.valid_from <= to_generation
+    )
+    closed_window = (DatasetRowVersionDB.valid_to > from_generation) & (
+        DatasetRowVersionDB.valid_to <= to_generation
+    )
+    touched = (
+        select(DatasetRowVersionDB.row_key)
+        .where(DatasetRowVersionDB.entity == entity, or_(window, closed_window))
+        .distinct()
+    )
+
+    before = dict(db.execute(_state_at(entity, from_generation).where(
+        DatasetRowVersionDB.row_key.in_(touched)
+    )).all())
+    after = dict(db.execute(_state_at(entity, to_generation).where(
+        DatasetRowVersionDB.row_key.in_(touched)
+    )).all())
+
+    added = sorted(after.keys() - before.keys())
+    removed = sorted(before.keys() - after.keys())
+    changed = sorted(
+        row_key for row_key in before.keys() & after.keys() if before[row_key] != after[row_key]
+    )
+    return added, removed, changed
@@ -0,0 +1,132 @@
+"""Related requirement graph: edge maintenance and bounded traversal."""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Select, String, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..models.sys2_requirement import SYS2RequirementDB, SYS2RequirementLinkDB
+from ..utils.melco import parse_related_ids
+
+DELETE_CHUNK_SIZE = 1000
+
+
+def replace_requirement_links(db: Session, related: Dict[str, List[str]]) -> int:
+    """
+    Replace the outgoing edges of every source Melco ID in ``related``.
+
+    Returns the number of edges written.
+    """
+    sources = list(related)
+    links = [
+        {"source_melco_id": source, "target_melco_id": target}
+        for source, targets in related.items()
+        for target in targets
+        if target != source
+    ]
+
+    try:
+        for start in range(0, len(sources), DELETE_CHUNK_SIZE):
+            chunk = sources[start:start + DELETE_CHUNK_SIZE]
+            db.query(SYS2RequirementLinkDB).filter(
+                SYS2RequirementLinkDB.source_melco_id.in_(chunk)
+            ).delete(synchronize_session=False)
+        if links:
+            db.execute(SYS2RequirementLinkDB.__table__.insert(), links)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(links)
+
+
+def ensure_requirement_links(db: Session) -> None:
+    """Parse edges once for SYS.2 data imported before the edge table existed."""
+    if db.query(SYS2RequirementLinkDB.id).first():
+        return
+    rows = db.query(
+        SYS2RequirementDB.melco_id, SYS2RequirementDB.related_requirement_ids
+    ).filter(SYS2RequirementDB.related_requirement_ids != "").all()
+    if rows:
+        replace_requirement_links(
+            db, {melco_id: parse_related_ids(related) for melco_id, related in rows}
+        )
+
+
+def _edge_view(direction: str):
+    """(node, neighbor) pairs to follow for the requested direction."""
+    outgoing = select(
+        SYS2RequirementLinkDB.source_melco_id.label("node"),
+        SYS2RequirementLinkDB.target_melco_id.label("neighbor"),
+    )
+    incoming = select(
+        SYS2RequirementLinkDB.target_melco_id.label("node"),
+        SYS2RequirementLinkDB.source_melco_id.label("neighbor"),
+    )
+    if direction == "out":
+        return outgoing.subquery("edges")
+    if direction == "in":
+        return incoming.subquery("edges")
+    return union_all(outgoing, incoming).subquery("edges")
+
+
+def neighborhood_query(root: str, depth: int, limit: int, direction: str = "both") -> Select:
+    """
+    Nodes within ``depth`` hops of ``root``, walked in one recursive CTE.
+
+    The recursive term uses UNION, so each (melco_id, depth) pair is produced
+    once and cycles cannot grow the walk beyond ``depth`` levels. Selects
+    (melco_id, depth, cfts_id, in_sys2), at most ``limit`` rows.
+    """
+    edges = _edge_view(direction)
+
+    walk = select(
+        cast(literal(root), String).label("melco_id"),
+        literal(0).label("depth"),
+    ).cte("walk", recursive=True)
+    walk = walk.union(
+        select(edges.c.neighbor, walk.c.depth + 1)
+        .join_from(walk, edges, edges.c.node == walk.c.melco_id)
+        .where(walk.c.depth < depth)
+    )
+
+    reached = (
+        select(walk.c.melco_id, func.min(walk.c.depth).label("depth"))
+        .group_by(walk.c.melco_id)
+        .subquery("reached")
+    )
+    return (
+        select(
+            reached.c.melco_id,
+            reached.c.depth,
+            SYS2RequirementDB.cfts_id,
+            SYS2RequirementDB.id.isnot(None),
+        )
+        .outerjoin(SYS2RequirementDB, SYS2RequirementDB.melco_id == reached.c.melco_id)
+        .order_by(reached.c.depth, reached.c.melco_id)
+        .limit(limit)
+    )
+
+
+def get_neighborhood(
+    db: Session, root: str, depth: int, limit: int, direction: str = "both"
+) -> Tuple[List[Tuple[str, int, str, bool]], List[Tuple[str, str]], bool]:
+    """
+    Walk the link graph from ``root`` up to ``depth`` hops (see neighborhood_query).
+
+    Returns (nodes, edges, truncated) where nodes are (melco_id, depth, cfts_id, in_sys2).
+    """
+    rows = db.execute(neighborhood_query(root, depth, limit + 1, direction)).all()
+
+    truncated = len(rows) > limit
+    nodes = [tuple(row) for row in rows[:limit]]
+    node_ids = [melco_id for melco_id, _, _, _ in nodes]
+
+    edge_rows = db.query(
+        SYS2RequirementLinkDB.source_melco_id, SYS2RequirementLinkDB.target_melco_id
+    ).filter(
+        SYS2RequirementLinkDB.source_melco_id.in_(node_ids),
+        SYS2RequirementLinkDB.target_melco_id.in_(node_ids),
+    ).distinct().all()
+
+    return nodes, [tuple(edge) for edge in edge_rows], truncated
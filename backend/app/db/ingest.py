@@ -0,0 +1,157 @@
+"""Bulk upserts for the streaming ingest API (non-Excel fast path)."""
+import re
+from typing import Dict, List, Mapping, Tuple
+
+from sqlalchemy import insert, literal_column, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from ..utils.cjk import cjk_ngrams
+from ..utils.melco import normalize_melco_id, parse_related_ids
+from ..utils.text_diff import description_diff_fields
+from .crud import bump_dataset_version
+from .generations import content_hash, record_generation, testcase_row_key
+from .graph import replace_requirement_links
+from .rollups import apply_testcase_rollup_deltas, refresh_cfts_coverage
+
+_CFTS_PATTERN = re.compile(r"CFTS\d+")
+# Columns populated by the database or derived here, never taken from the payload
+_SERVER_FIELDS = {"created_at", "updated_at", "description_changed", "description_diff"}
+
+
+def _content_fields(record: Mapping, model) -> Dict:
+    """Every payload column with None replaced by the column default ("")."""
+    return {
+        name: "" if value is None else value
+        for name, value in record.items()
+        if name not in _SERVER_FIELDS and name in model.__table__.columns
+    }
+
+
+def upsert_cfts(db: Session, records: List[Mapping]) -> Tuple[int, int, List[Dict]]:
+    """Update rows matched by Req.ID and insert the rest. Returns (inserted, updated, rows)."""
+    rows = {}
+    for record in records:
+        row = _content_fields(record, CFTSRequirementDB)
+        row.update(description_diff_fields(row.get("sr24_description", ""), row.get("description", "")))
+        rows[row["req_id"]] = row  # last row wins within a batch
+
+    existing = dict(
+        db.query(CFTSRequirementDB.req_id, CFTSRequirementDB.id)
+        .filter(CFTSRequirementDB.req_id.in_(list(rows)))
+        .all()
+    )
+    updates = [{"id": existing[req_id], **row} for req_id, row in rows.items() if req_id in existing]
+    inserts = [row for req_id, row in rows.items() if req_id not in existing]
+
+    try:
+        if updates:
+            db.execute(update(CFTSRequirementDB), updates)
+        if inserts:
+            db.execute(insert(CFTSRequirementDB), inserts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(inserts), len(updates), list(rows.values())
+
+
+def upsert_sys2(db: Session, records: List[Mapping]) -> Tuple[int, int, List[Dict]]:
+    """INSERT ... ON CONFLICT (melco_id) DO UPDATE. Returns (inserted, updated, rows)."""
+    rows = {}
+    for record in records:
+        row = _content_fields(record, SYS2RequirementDB)
+        row["melco_id"] = normalize_melco_id(row["melco_id"])
+        if not row["melco_id"]:
+            continue
+        if not row.get("cfts_id"):
+            cfts_match = _CFTS_PATTERN.search(row["melco_id"])
+            row["cfts_id"] = cfts_match.group(0) if cfts_match else ""
+        row["cjk_ngrams"] = cjk_ngrams(
+            row.get("requirement_en", ""),
+            row.get("reason_en", ""),
+            row.get("supplement_en", ""),
+            row.get("verification_criteria", ""),
+        )
+        rows[row["melco_id"]] = row
+    if not rows:
+        return 0, 0, []
+
+    # Every row in a batch carries the same keys (model fields), so the SET list is shared
+    columns = next(iter(rows.values())).keys() - {"melco_id"}
+    statement = pg_insert(SYS2RequirementDB)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SYS2RequirementDB.melco_id],
+        set_={column: statement.excluded[column] for column in columns},
+    ).returning(literal_column("xmax = 0"))  # true for inserted rows
+
+    try:
+        inserted_flags = db.execute(statement, list(rows.values())).scalars().all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    inserted = sum(1 for flag in inserted_flags if flag)
+    return inserted, len(rows) - inserted, list(rows.values())
+
+
+def insert_testcases(db: Session, records: List[Mapping]) -> Tuple[int, int, List[Dict]]:
+    """Streamed test cases are appended (import_source ""). Returns (inserted, 0, rows)."""
+    rows = []
+    for record in records:
+        row = _content_fields(record, TestCaseDB)
+        row["feature_id"] = row["feature_id"].strip()
+        if not row["feature_id"]:
+            continue
+        row["cjk_ngrams"] = cjk_ngrams(
+            row.get("precondition_procedure_jp", ""),
+            row.get("criteria_jp", ""),
+        )
+        rows.append(row)
+    if not rows:
+        return 0, 0, []
+
+    try:
+        # Rows and rollup deltas in one transaction, so the counts cannot drift
+        db.execute(insert(TestCaseDB), rows)
+        apply_testcase_rollup_deltas(db, rows, commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows), 0, rows
+
+
+INGEST_WRITERS = {
+    "cfts": upsert_cfts,
+    "sys2": upsert_sys2,
+    "testcases": insert_testcases,
+}
+
+
+def finish_ingest(db: Session, table: str, snapshot_rows: Dict[str, Tuple[str, str]],
+                  related: Dict[str, List[str]], source: str) -> int:
+    """Same post-import steps as the batch importers. Returns the new dataset version."""
+    if related:
+        replace_requirement_links(db, related)
+    refresh_cfts_coverage(db)
+    version = bump_dataset_version(db, commit=False)
+    entity = "testcase" if table == "testcases" else table
+    record_generation(db, version, entity, snapshot_rows, source=source, partial=True)
+    return version
+
+
+def snapshot_entry(table: str, row: Mapping) -> Tuple[str, Tuple[str, str]]:
+    """Generation key and (scope, hash) for a written row."""
+    if table == "cfts":
+        return row["req_id"], (row.get("cfts_id", ""), content_hash(row))
+    if table == "sys2":
+        return row["melco_id"], ("", content_hash(row))
+    return testcase_row_key(row), ("", content_hash(row))
+
+
+def related_ids(row: Mapping) -> List[str]:
+    return parse_related_ids(row.get("related_requirement_ids", ""))
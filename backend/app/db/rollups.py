@@ -0,0 +1,176 @@
+"""Precomputed rollup tables refreshed by the importers."""
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Mapping, Set, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.cfts_coverage import CFTSCoverageDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from ..models.testcase_rollup import ROLLUP_DIMENSIONS, TestCaseRollupDB
+from ..utils.melco import normalize_melco_id, normalize_melco_ids
+
+BLANK_RESULT = "(blank)"
+_CFTS_PATTERN = re.compile(r"CFTS\d+")
+
+
+def refresh_cfts_coverage(db: Session) -> int:
+    """
+    Recompute the per-CFTS coverage table in a single transaction.
+
+    CFTS rows keep Melco IDs as multi-line legacy text, so IDs are split and
+    normalized here rather than in SQL. Returns the number of CFTS rows written.
+    """
+    names: Dict[str, str] = {}
+    requirement_counts: Counter = Counter()
+    melco_ids: Dict[str, Set[str]] = defaultdict(set)
+
+    for cfts_id, cfts_name, melco_text in db.query(
+        CFTSRequirementDB.cfts_id, CFTSRequirementDB.cfts_name, CFTSRequirementDB.melco_id
+    ):
+        if not cfts_id:
+            continue
+        names.setdefault(cfts_id, cfts_name or "")
+        requirement_counts[cfts_id] += 1
+        melco_ids[cfts_id].update(normalize_melco_ids((melco_text or "").splitlines()))
+
+    sys2_ids = set(normalize_melco_ids(
+        melco_id for (melco_id,) in db.query(SYS2RequirementDB.melco_id)
+    ))
+
+    # feature_id -> {test_result: count}
+    results_by_feature: Dict[str, Counter] = defaultdict(Counter)
+    for feature_id, test_result, count in db.query(
+        TestCaseDB.feature_id, TestCaseDB.test_result, func.count(TestCaseDB.id)
+    ).group_by(TestCaseDB.feature_id, TestCaseDB.test_result):
+        melco_id = normalize_melco_id(feature_id)
+        if melco_id:
+            results_by_feature[melco_id][test_result or BLANK_RESULT] += count
+
+    refreshed_at = datetime.now(timezone.utc)
+    rows = []
+    for cfts_id, requirement_count in requirement_counts.items():
+        ids = melco_ids[cfts_id]
+        tested_ids = [melco_id for melco_id in ids if melco_id in results_by_feature]
+        test_results: Counter = Counter()
+        for melco_id in tested_ids:
+            test_results.update(results_by_feature[melco_id])
+
+        rows.append(
+            CFTSCoverageDB(
+                cfts_id=cfts_id,
+                cfts_name=names[cfts_id],
+                requirement_count=requirement_count,
+                melco_id_count=len(ids),
+                melco_with_sys2_count=len(ids & sys2_ids),
+                melco_with_tests_count=len(tested_ids),
+                test_case_count=sum(test_results.values()),
+                test_results=dict(test_results),
+                refreshed_at=refreshed_at,
+            )
+        )
+
+    try:
+        db.query(CFTSCoverageDB).delete()
+        db.add_all(rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(rows)
+
+
+def _testcase_rollup_key(record: Mapping) -> Tuple[str, ...]:
+    """Return (feature_id, *dimensions) for a parsed test case record."""
+    return (record.get("feature_id") or "",) + tuple(
+        record.get(dimension) or "" for dimension in ROLLUP_DIMENSIONS
+    )
+
+
+def apply_testcase_rollup_deltas(db: Session, records: Iterable[Mapping], commit: bool = True) -> int:
+    """
+    Add newly inserted test cases to the rollup table.
+
+    Counts are merged with INSERT ... ON CONFLICT DO UPDATE, so only the
+    affected groups are touched. Pass ``commit=False`` to leave the commit to
+    the caller, so the deltas land in the same transaction as the inserts.
+    Returns the number of groups upserted.
+    """
+    deltas = Counter(_testcase_rollup_key(record) for record in records)
+    if not deltas:
+        return 0
+
+    rows = []
+    for (feature_id, *values), count in deltas.items():
+        cfts_match = _CFTS_PATTERN.search(feature_id)
+        row = {
+            "cfts_id": cfts_match.group(0) if cfts_match else "",
+            "feature_id": feature_id,
+            "test_count": count,
+        }
+        row.update(zip(ROLLUP_DIMENSIONS, values))
+        rows.append(row)
+
+    statement = insert(TestCaseRollupDB)
+    statement = statement.on_conflict_do_update(
+        constraint="uq_testcase_rollups_key",
+        set_={"test_count": TestCaseRollupDB.test_count + statement.excluded.test_count},
+    )
+    if not commit:
+        db.execute(statement, rows)
+        return len(rows)
+    try:
+        db.execute(statement, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(rows)
+
+
+def rebuild_testcase_rollups(db: Session, commit: bool = True) -> int:
+    """
+    Recompute the rollup table from scratch with one GROUP BY over testcases.
+
+    Pass ``commit=False`` to rebuild inside the caller's transaction.
+    """
+    target_columns = ["cfts_id", "feature_id", *ROLLUP_DIMENSIONS]
+    normalized = select(
+        func.coalesce(func.substring(TestCaseDB.feature_id, "CFTS[0-9]+"), literal("")).label("cfts_id"),
+        *[
+            func.coalesce(getattr(TestCaseDB, name), literal("")).label(name)
+            for name in target_columns[1:]
+        ],
+    ).subquery()
+    group_columns = [normalized.c[name] for name in target_columns]
+    source = select(*group_columns, func.count()).group_by(*group_columns)
+    target_columns.append("test_count")
+    if not commit:
+        db.query(TestCaseRollupDB).delete()
+        db.execute(TestCaseRollupDB.__table__.insert().from_select(target_columns, source))
+        return db.query(TestCaseRollupDB).count()
+    try:
+        db.query(TestCaseRollupDB).delete()
+        db.execute(TestCaseRollupDB.__table__.insert().from_select(target_columns, source))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return db.query(TestCaseRollupDB).count()
+
+
+def ensure_rollups(db: Session) -> None:
+    """Build rollup tables for databases imported before they existed, and repair drifted test counts."""
+    if not db.query(CFTSCoverageDB.cfts_id).first():
+        refresh_cfts_coverage(db)
+    rolled_up = db.query(func.coalesce(func.sum(TestCaseRollupDB.test_count), 0)).scalar()
+    if rolled_up != db.query(func.count(TestCaseDB.id)).scalar():
+        rebuild_testcase_rollups(db)
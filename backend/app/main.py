@@ -1,18 +1,109 @@
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from .api import requirements, sys2_requirements, testcases
-from .db.database import create_tables, engine
-# 導入所有模型以便 create_tables 知道它們
-from .models import cfts_db, sys2_requirement, testcase
+from .api import coverage, datasets, hierarchy, imports, ingest, requirements, search, sys2_requirements, testcases
+from .db.crud import backfill_cjk_ngrams, backfill_description_diffs
+from .db.database import (
+    SessionLocal, backfills_pending, database_status, ensure_schema, mark_backfills_done, wait_for_database,
+)
+from .db.graph import ensure_requirement_links
+from .db.rollups import ensure_rollups
+# 導入所有模型以便 ensure_schema 知道它們
+from .models import cfts_coverage, cfts_db, dataset_generation, dataset_version, schema_version, sys2_requirement, testcase, testcase_rollup
+from .utils.autocomplete import autocomplete_refresh_loop, refresh_autocomplete_index
+from .utils.health import HEALTH_POOL_SATURATION, health_probe, health_probe_loop
+from .utils.import_jobs import recover_interrupted_jobs, shutdown_import_jobs
+from .utils.prewarm import PREWARM_ENABLED, prewarm, prewarm_status
+from .utils.read_model import READ_MODEL_ENABLED, refresh_read_model
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Requirement Test Management API")
 
-# 啟動時建立資料庫表
+def refresh_in_memory_indexes() -> bool:
+    """Reload every in-memory index whose dataset version is stale."""
+    refreshed = refresh_autocomplete_index()
+    if READ_MODEL_ENABLED:
+        refreshed = refresh_read_model() or refreshed
+    return refreshed
+
+
+def prepare_database() -> None:
+    """Bring the schema up to date and run the one-off backfills (blocking)."""
+    database_status.update(state="migrating")
+    if ensure_schema():
+        logger.info("Database schema updated")
+
+    # 升級前已匯入的資料庫先建立一次統計表、關聯要件邊、SR24/SR26 差異與日文 n-gram
+    # （僅在結構變更後執行一次，完成後記錄於 schema_versions）
+    db = SessionLocal()
+    try:
+        ensure_rollups(db)
+        if backfills_pending():
+            ensure_requirement_links(db)
+            backfill_description_diffs(db)
+            backfill_cjk_ngrams(db)
+            mark_backfills_done()
+    finally:
+        db.close()
+
+
+async def start_database() -> None:
+    """Wait for the database, prepare it, then start the in-memory caches."""
+    try:
+        await wait_for_database()
+        await asyncio.to_thread(prepare_database)
+    except Exception as e:
+        error = str(e).splitlines()[0]
+        logger.error(f"Database startup failed: {error}")
+        database_status.update(state="failed", error=error, retry_in_seconds=None)
+        return
+    database_status.update(state="ready", error=None, retry_in_seconds=None)
+
+    # 讀取模型在背景載入，載入完成前端點仍查詢資料庫
+    if READ_MODEL_ENABLED:
+        app.state.read_model_task = asyncio.create_task(asyncio.to_thread(refresh_read_model))
+
+    # 建立記憶體內的自動完成索引，並在資料集版本變更時重建
+    if PREWARM_ENABLED:
+        # 背景預熱：自動完成、SYS.2 可用性集合與熱門 CFTS，不阻塞啟動
+        app.state.prewarm_task = asyncio.create_task(asyncio.to_thread(prewarm, "startup"))
+        app.state.autocomplete_refresh_task = asyncio.create_task(
+            autocomplete_refresh_loop(
+                on_refresh=lambda: prewarm("import"), refresh=refresh_in_memory_indexes
+            )
+        )
+    else:
+        try:
+            await asyncio.to_thread(refresh_autocomplete_index)
+        except Exception as e:
+            logger.warning(f"Autocomplete index not built at startup: {e}")
+        app.state.autocomplete_refresh_task = asyncio.create_task(
+            autocomplete_refresh_loop(refresh=refresh_in_memory_indexes)
+        )
+
+
+# 啟動時不等待資料庫：連線、結構檢查與快取在背景進行，/readiness 回報進度
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    # 上次停止時未完成的匯入工作標記為失敗，避免狀態與 SSE 永遠停在 queued / running
+    recover_interrupted_jobs()
+
+    # /health 與 /readiness 只讀取背景探測的結果，不在請求中連線資料庫
+    app.state.health_probe_task = asyncio.create_task(health_probe_loop())
+    app.state.database_task = asyncio.create_task(start_database())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.health_probe_task.cancel()
+    app.state.database_task.cancel()
+    if hasattr(app.state, "autocomplete_refresh_task"):
+        app.state.autocomplete_refresh_task.cancel()
+    shutdown_import_jobs()
 
 # 從環境變數讀取 CORS 設定
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3001")
@@ -30,6 +121,12 @@ app.include_router(requirements.router)
 app.include_router(requirements.req_router)
 app.include_router(sys2_requirements.router)
 app.include_router(testcases.router)
+app.include_router(search.router)
+app.include_router(coverage.router)
+app.include_router(hierarchy.router)
+app.include_router(datasets.router)
+app.include_router(imports.router)
+app.include_router(ingest.router)
 
 @app.get("/")
 async def root():
@@ -38,47 +135,45 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """健康檢查端點 - 檢查 API 和資料庫連接狀態"""
-    from sqlalchemy import text
-    try:
-        # 測試資料庫連接
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "status": "healthy",
-                "database": "connected",
-                "message": "All systems operational"
-            }
-        )
-    except Exception as e:
+    """健康檢查端點 - 回傳背景探測的資料庫連線、連線池使用率與資料集版本"""
+    probe = health_probe.snapshot()
+    if probe["database"] != "connected" or probe["stale"]:
         return JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={
-                "status": "unhealthy",
-                "database": "disconnected",
-                "error": str(e)
-            }
+            content={"status": "unhealthy", **probe}
         )
 
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": "healthy", "message": "All systems operational", **probe}
+    )
+
+
+@app.get("/prewarm", tags=["Health"])
+async def prewarm_check():
+    """快取預熱進度與耗時"""
+    return prewarm_status.snapshot()
+
 
 @app.get("/readiness", tags=["Health"])
 async def readiness_check():
-    """就緒檢查端點 - 檢查服務是否準備好接收請求"""
-    from sqlalchemy import text
-    try:
-        # 測試資料庫連接
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-
+    """就緒檢查端點 - 啟動完成且背景探測結果正常、未過期、連線池未飽和"""
+    startup = database_status.snapshot()
+    if startup["state"] != "ready":
+        # 資料庫連線中、結構更新中或啟動失敗
         return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"status": "ready"}
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "not ready", "startup": startup}
         )
-    except Exception as e:
+    probe = health_probe.snapshot()
+    saturated = probe.get("pool", {}).get("saturation", 0.0) >= HEALTH_POOL_SATURATION
+    if probe["database"] != "connected" or probe["stale"] or saturated:
         return JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={"status": "not ready", "error": str(e)}
-        )
\ No newline at end of file
+            content={"status": "not ready", "pool_saturated": saturated, **probe}
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": "ready", **probe}
+    )
@@ -0,0 +1,38 @@
+"""Per-CFTS coverage rollup models."""
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+
+from ..db.database import Base
+
+
+class CFTSCoverageDB(Base):
+    """Coverage counts per CFTS, recomputed at the end of every import."""
+    __tablename__ = "cfts_coverage"
+
+    cfts_id = Column(String, primary_key=True)
+    cfts_name = Column(String, default="")
+    requirement_count = Column(Integer, default=0)  # CFTS 需求筆數
+    melco_id_count = Column(Integer, default=0)  # 不重複 Melco ID 數
+    melco_with_sys2_count = Column(Integer, default=0)  # 有 SYS.2 要件的 Melco ID 數
+    melco_with_tests_count = Column(Integer, default=0)  # 有 TestCase 的 Melco ID 數
+    test_case_count = Column(Integer, default=0)  # 關聯 TestCase 筆數
+    test_results = Column(JSON, default=dict)  # {Test Result: 筆數}
+    refreshed_at = Column(DateTime(timezone=True))
+
+
+class CFTSCoverage(BaseModel):
+    """Coverage summary for one CFTS."""
+    cfts_id: str
+    cfts_name: str
+    requirement_count: int
+    melco_id_count: int
+    melco_with_sys2_count: int
+    melco_with_tests_count: int
+    test_case_count: int
+    test_results: Dict[str, int]
+    sys2_coverage: float
+    test_coverage: float
+    refreshed_at: Optional[datetime] = None
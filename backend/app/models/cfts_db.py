@@ -1,5 +1,7 @@
 """CFTS Database models."""
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import JSON, Boolean, Column, Computed, String, DateTime, Integer, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from ..db.database import Base
 
@@ -15,5 +17,41 @@ class CFTSRequirementDB(Base):
     description = Column(String, default="")  
     sr24_description = Column(String, default="") 
     melco_id = Column(String, default="") 
+    # SR24 -> SR26 差異（匯入時預先計算）
+    description_changed = Column(Boolean)
+    description_diff = Column(JSON)  # [[op, text], ...]，op 為 "=", "-", "+"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Full-text search document: SR26 description ranks above SR24
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(sr24_description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+
+    __table_args__ = (
+        # Serve `LIKE 'prefix%'` as index range scans under non-C collations
+        Index(
+            "ix_cfts_requirements_cfts_id_pattern",
+            "cfts_id",
+            postgresql_ops={"cfts_id": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_cfts_requirements_req_id_pattern",
+            "req_id",
+            postgresql_ops={"req_id": "text_pattern_ops"},
+        ),
+        Index("ix_cfts_requirements_search_vector", "search_vector", postgresql_using="gin"),
+        # DISTINCT (cfts_id, cfts_name) for the CFTS autocomplete as an index-only scan
+        Index("ix_cfts_requirements_cfts_id_name", "cfts_id", "cfts_name"),
+        # Partial index: reviewers only ever filter for the changed rows
+        Index(
+            "ix_cfts_requirements_cfts_id_changed",
+            "cfts_id",
+            postgresql_ops={"cfts_id": "text_pattern_ops"},
+            postgresql_where=text("description_changed"),
+        ),
+    )
\ No newline at end of file
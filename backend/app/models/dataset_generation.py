@@ -0,0 +1,70 @@
+"""Dataset generation models (one generation per committed import)."""
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from ..db.database import Base
+
+
+class DatasetGenerationDB(Base):
+    """Import that produced a dataset generation (generation = dataset version)."""
+    __tablename__ = "dataset_generations"
+
+    generation = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # cfts, sys2 或 testcase
+    source = Column(String, default="")  # 匯入的檔案或資料夾
+    row_count = Column(Integer, default=0)
+    added_count = Column(Integer, default=0)
+    removed_count = Column(Integer, default=0)
+    changed_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DatasetRowVersionDB(Base):
+    """
+    Content hash of one row, valid for generations [valid_from, valid_to).
+
+    valid_to is NULL while the row is still current.
+    """
+    __tablename__ = "dataset_row_versions"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    row_key = Column(String, nullable=False)  # Req.ID、Melco ID 或 TestCase 組合鍵
+    scope = Column(String, nullable=False, default="")  # CFTS 的 cfts_id，其餘為空
+    content_hash = Column(String(40), nullable=False)
+    valid_from = Column(Integer, nullable=False)
+    valid_to = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_dataset_row_versions_entity_key", "entity", "row_key"),
+        Index("ix_dataset_row_versions_entity_valid_from", "entity", "valid_from"),
+        Index("ix_dataset_row_versions_entity_valid_to", "entity", "valid_to"),
+    )
+
+
+class DatasetGeneration(BaseModel):
+    generation: int
+    entity: str
+    source: str
+    row_count: int
+    added_count: int
+    removed_count: int
+    changed_count: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DatasetDiff(BaseModel):
+    """Rows added, removed or changed between two generations of one entity."""
+    entity: str
+    from_generation: int
+    to_generation: int
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
@@ -0,0 +1,14 @@
+"""Dataset version model."""
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.sql import func
+
+from ..db.database import Base
+
+
+class DatasetVersionDB(Base):
+    """Single-row counter bumped by the importers after every committed import."""
+    __tablename__ = "dataset_versions"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,22 @@
+"""Background import job models."""
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class ImportJob(BaseModel):
+    """Status of an uploaded import running in a background worker process."""
+    job_id: str
+    kind: str  # cfts, sys2 或 testcase
+    files: List[str]
+    state: str  # queued, running, done, failed
+    phase: Optional[str] = None  # parsing, parsed, writing, finalizing
+    current_file: Optional[str] = None
+    rows_parsed: int = 0
+    rows_written: int = 0
+    rows_per_second: float = 0.0
+    elapsed_seconds: float = 0.0
+    created_at: str
+    finished_at: Optional[str] = None
+    report: Optional[Dict[str, Any]] = None  # 匯入器的 self.report
+    error: Optional[str] = None
@@ -0,0 +1,23 @@
+"""Streaming bulk-ingest report models."""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class IngestError(BaseModel):
+    line: Optional[int] = None  # 起始行號（CSV 含標題行）；寫入錯誤時為 None
+    error: str
+
+
+class IngestReport(BaseModel):
+    """Outcome of one POST /ingest/{table} request."""
+    table: str  # cfts, sys2 或 testcases
+    format: str  # ndjson 或 csv
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: List[IngestError] = []  # 最多 MAX_REPORTED_ERRORS 筆
+    completed: bool = True  # 寫入失敗而中止時為 False（已提交的批次仍保留）
+    dataset_version: Optional[int] = None
+    elapsed_seconds: float = 0.0
@@ -1,6 +1,6 @@
 """CFTS Requirement model definition."""
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 
 
@@ -12,6 +12,8 @@ class CFTSRequirement(BaseModel):
     description: Optional[str] = None
     sr24_description: Optional[str] = None
     melco_id: Optional[str] = None
+    description_changed: Optional[bool] = None  # SR24 與 SR26 描述是否不同
+    description_diff: Optional[List[List[str]]] = None  # [[op, text], ...]，op 為 "=", "-", "+"
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -26,4 +28,14 @@ class CFTSSearchResult(BaseModel):
     target_req_id: Optional[str] = None  # For Req.ID search, indicates which row to highlight
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+FuzzyKind = Literal["req_id", "cfts_id", "cfts_name", "melco_id"]
+
+
+class FuzzySuggestion(BaseModel):
+    value: str
+    kind: FuzzyKind
+    cfts_id: str
+    score: float
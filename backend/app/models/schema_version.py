@@ -0,0 +1,18 @@
+"""Schema version model."""
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from ..db.database import Base
+
+SCHEMA_VERSION_ROW_ID = 1
+
+
+class SchemaVersionDB(Base):
+    """Single row holding the model fingerprint the schema was last created from."""
+    __tablename__ = "schema_versions"
+
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # Set once the one-off startup backfills ran against this schema; cleared on every schema change
+    backfilled_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
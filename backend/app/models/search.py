@@ -0,0 +1,24 @@
+"""Full-text search response models."""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    """A single ranked full-text hit."""
+    entity: str  # cfts, sys2 or testcase
+    id: int
+    key: str  # Req.ID, Melco ID or Feature ID
+    cfts_id: Optional[str] = None
+    title: str
+    snippet: str  # HTML: escaped text with <mark> around the matches
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    """Paginated full-text search results across all entity types."""
+    query: str
+    total: int
+    limit: int
+    offset: int
+    hits: List[SearchHit]
@@ -1,9 +1,10 @@
 """SYS.2 Requirement models."""
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
-from sqlalchemy.orm import validates
+from sqlalchemy import Column, Computed, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, validates
 from sqlalchemy.sql import func
 
 from ..db.database import Base
@@ -37,6 +38,41 @@ class SYS2RequirementDB(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 全文檢索向量（要件 > 検証基準 > 理由/補足）
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(requirement_en, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(verification_criteria, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(reason_en, '') || ' ' || coalesce(supplement_en, '')), 'C')",
+            persisted=True,
+        ),
+    ))
+    # 階層路徑 (例: PSCFTS016-1-4-2-)，子樹查詢 = melco_path LIKE 'PSCFTS016-1-%'
+    melco_path = Column(String, Computed("melco_id || '-'", persisted=True))
+    # 日文 n-gram（要件/理由/補足/検証基準），由 SYS2Importer 寫入
+    cjk_ngrams = deferred(Column(ARRAY(String), default=list))
+
+    __table_args__ = (
+        # Case-insensitive prefix search runs on upper(column) LIKE 'PREFIX%'
+        Index(
+            "ix_sys2_requirements_cfts_id_upper_pattern",
+            func.upper(cfts_id).label("cfts_id_upper"),
+            postgresql_ops={"cfts_id_upper": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_sys2_requirements_melco_id_upper_pattern",
+            func.upper(melco_id).label("melco_id_upper"),
+            postgresql_ops={"melco_id_upper": "text_pattern_ops"},
+        ),
+        Index("ix_sys2_requirements_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_sys2_requirements_cjk_ngrams", "cjk_ngrams", postgresql_using="gin"),
+        Index(
+            "ix_sys2_requirements_melco_path_pattern",
+            "melco_path",
+            postgresql_ops={"melco_path": "text_pattern_ops"},
+        ),
+    )
 
     @validates("melco_id")
     def _normalize_melco_id(self, _key, value):
@@ -44,6 +80,15 @@ class SYS2RequirementDB(Base):
         return normalize_melco_id(value)
 
 
+class SYS2RequirementLinkDB(Base):
+    """Directed edge parsed from SYS2RequirementDB.related_requirement_ids."""
+    __tablename__ = "sys2_requirement_links"
+
+    id = Column(Integer, primary_key=True)
+    source_melco_id = Column(String, nullable=False, index=True)
+    target_melco_id = Column(String, nullable=False, index=True)
+
+
 class SYS2Requirement(BaseModel):
     """SYS.2 Requirement Pydantic model."""
     melco_id: str
@@ -82,3 +127,25 @@ class SYS2RequirementDetail(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SYS2GraphNode(BaseModel):
+    """Requirement reached while walking related requirement links."""
+    melco_id: str
+    depth: int
+    cfts_id: Optional[str] = None
+    in_sys2: bool
+
+
+class SYS2GraphEdge(BaseModel):
+    source: str
+    target: str
+
+
+class SYS2GraphResponse(BaseModel):
+    """Neighborhood of a Melco ID in the related requirement graph."""
+    root: str
+    depth: int
+    nodes: List[SYS2GraphNode]
+    edges: List[SYS2GraphEdge]
+    truncated: bool
@@ -1,5 +1,7 @@
 """TestCase models."""
-from sqlalchemy import Column, String, DateTime, Integer, Text
+from sqlalchemy import Column, Computed, String, DateTime, Index, Integer, Text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from ..db.database import Base
 from pydantic import BaseModel
@@ -36,8 +38,38 @@ class TestCaseDB(Base):
     issue_id = Column(String, default="")  # R欄: Issue ID
     note = Column(Text, default="")  # S欄: Note
 
+    # 匯入來源活頁簿檔名（重新匯入時整批取代）；串流寫入為 ""，欄位新增前的資料為 NULL
+    import_source = Column(String, default="", index=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 全文檢索向量（TestItem > Title）
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(test_item_en, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+
+    # 階層路徑（正規化的 Feature-ID + '-'），與 sys2_requirements.melco_path 相同格式
+    melco_path = Column(
+        String,
+        Computed("btrim(feature_id, E' \\t\\r\\n#') || '-'", persisted=True),
+    )
+    # 日文 n-gram（Precondition/Procedure(JP)、Criteria(JP)），由 TestCaseImporter 寫入
+    cjk_ngrams = deferred(Column(ARRAY(String), default=list))
+
+    __table_args__ = (
+        Index("ix_testcases_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_testcases_cjk_ngrams", "cjk_ngrams", postgresql_using="gin"),
+        Index(
+            "ix_testcases_melco_path_pattern",
+            "melco_path",
+            postgresql_ops={"melco_path": "text_pattern_ops"},
+        ),
+    )
 
 
 class TestCase(BaseModel):
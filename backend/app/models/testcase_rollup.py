@@ -0,0 +1,55 @@
+"""Test execution rollup model."""
+from typing import Dict, List
+
+from pydantic import BaseModel
+from sqlalchemy import Column, Index, Integer, String, UniqueConstraint
+
+from ..db.database import Base
+
+# Dimensions a status report can group by, besides cfts_id and feature_id
+ROLLUP_DIMENSIONS = (
+    "test_result",
+    "tester",
+    "priority",
+    "test_version",
+    "mp",
+    "ds",
+    "dt",
+    "hdcc",
+    "ru",
+)
+
+
+class TestCaseRollupDB(Base):
+    """Test case counts per feature ID and execution attributes, maintained by the importers."""
+    __tablename__ = "testcase_rollups"
+
+    id = Column(Integer, primary_key=True)
+    cfts_id = Column(String, nullable=False, default="", index=True)  # 從 Feature-ID 推得
+    feature_id = Column(String, nullable=False, default="")
+    test_result = Column(String, nullable=False, default="")
+    tester = Column(String, nullable=False, default="")
+    priority = Column(String, nullable=False, default="")
+    test_version = Column(String, nullable=False, default="")
+    mp = Column(String, nullable=False, default="")
+    ds = Column(String, nullable=False, default="")
+    dt = Column(String, nullable=False, default="")
+    hdcc = Column(String, nullable=False, default="")
+    ru = Column(String, nullable=False, default="")
+    test_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("feature_id", *ROLLUP_DIMENSIONS, name="uq_testcase_rollups_key"),
+        Index(
+            "ix_testcase_rollups_feature_id_pattern",
+            "feature_id",
+            postgresql_ops={"feature_id": "text_pattern_ops"},
+        ),
+    )
+
+
+class TestCaseStatsResponse(BaseModel):
+    """Grouped test case counts."""
+    group_by: List[str]
+    total: int
+    groups: List[Dict[str, object]]
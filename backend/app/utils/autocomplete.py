@@ -0,0 +1,182 @@
+"""In-process autocomplete index for Req.IDs, CFTS IDs and Melco IDs (plus SYS.2 availability)."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from ..db.crud import get_dataset_version
+from ..db.database import SessionLocal
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from .fuzzy import FuzzyEntry, FuzzyMatch, TrigramIndex
+from .melco import normalize_melco_id, normalize_melco_ids
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "30"))
+
+
+class PrefixIndex:
+    """Sorted string array answering prefix queries with bisect."""
+
+    __slots__ = ("_keys",)
+
+    def __init__(self, keys: Iterable[str]):
+        self._keys: List[str] = sorted(set(keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """Return up to ``limit`` keys starting with ``prefix`` in sorted order."""
+        if not prefix:
+            return self._keys[:limit]
+
+        start = bisect_left(self._keys, prefix)
+        result = []
+        for key in self._keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            result.append(key)
+        return result
+
+
+class _Snapshot(NamedTuple):
+    req_ids: PrefixIndex
+    cfts_labels: List[str]
+    fuzzy: TrigramIndex
+    sys2_melco_ids: FrozenSet[str]
+
+
+class AutocompleteIndex:
+    """
+    Snapshot of autocomplete data built from the database.
+
+    Readers only touch the current snapshot, which is replaced as a whole on
+    refresh, so lookups never block on a rebuild.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._refresh_lock = threading.Lock()
+        self.version: Optional[int] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def build(self, db: Session, version: int) -> None:
+        """Load Req.IDs, CFTS labels and Melco IDs and swap in the new snapshot."""
+        cfts_rows = db.query(
+            CFTSRequirementDB.req_id,
+            CFTSRequirementDB.cfts_id,
+            CFTSRequirementDB.cfts_name,
+            CFTSRequirementDB.melco_id,
+        ).all()
+        sys2_rows = db.query(SYS2RequirementDB.melco_id, SYS2RequirementDB.cfts_id).all()
+
+        req_ids = PrefixIndex(req_id for req_id, _, _, _ in cfts_rows if req_id)
+
+        cfts_pairs = sorted(
+            {(cfts_id, cfts_name or "") for _, cfts_id, cfts_name, _ in cfts_rows if cfts_id}
+        )
+        # Format as "CFTS016 Anti-Theft"
+        cfts_labels = [
+            f"{cfts_id} {cfts_name}" if cfts_name else cfts_id
+            for cfts_id, cfts_name in cfts_pairs
+        ]
+
+        fuzzy_entries = [
+            FuzzyEntry(req_id, "req_id", cfts_id or "")
+            for req_id, cfts_id, _, _ in cfts_rows
+            if req_id
+        ]
+        for cfts_id, cfts_name in cfts_pairs:
+            fuzzy_entries.append(FuzzyEntry(cfts_id, "cfts_id", cfts_id))
+            if cfts_name:
+                fuzzy_entries.append(FuzzyEntry(cfts_name, "cfts_name", cfts_id))
+        # CFTS rows keep Melco IDs as multi-line legacy text; index canonical forms
+        for _, cfts_id, _, melco_text in cfts_rows:
+            for line in (melco_text or "").splitlines():
+                melco_id = normalize_melco_id(line)
+                if melco_id:
+                    fuzzy_entries.append(FuzzyEntry(melco_id, "melco_id", cfts_id or ""))
+        for melco_id, cfts_id in sys2_rows:
+            if melco_id:
+                fuzzy_entries.append(FuzzyEntry(melco_id, "melco_id", cfts_id or ""))
+
+        # Canonical Melco IDs that have SYS.2 data (availability checks)
+        sys2_melco_ids = frozenset(normalize_melco_ids(melco_id for melco_id, _ in sys2_rows))
+
+        snapshot = _Snapshot(req_ids, cfts_labels, TrigramIndex(fuzzy_entries), sys2_melco_ids)
+        self._snapshot = snapshot
+        self.version = version
+        logger.info(
+            f"Autocomplete index built: {len(req_ids)} Req.IDs, "
+            f"{len(cfts_labels)} CFTS entries, {len(snapshot.fuzzy)} fuzzy entries, "
+            f"{len(sys2_melco_ids)} SYS.2 Melco IDs "
+            f"(dataset version {version})"
+        )
+
+    def refresh_if_stale(self, db: Session) -> bool:
+        """Rebuild the snapshot when the dataset version has changed."""
+        with self._refresh_lock:
+            version = get_dataset_version(db)
+            if self.ready and version == self.version:
+                return False
+            self.build(db, version)
+            return True
+
+    def search_req_ids(self, prefix: str, limit: int = 100) -> List[str]:
+        return self._snapshot.req_ids.search(prefix, limit)
+
+    def cfts_labels(self) -> List[str]:
+        return self._snapshot.cfts_labels
+
+    def sys2_available(self, melco_ids: Iterable[str]) -> List[str]:
+        """Return the canonical Melco IDs that have SYS.2 requirements."""
+        available = self._snapshot.sys2_melco_ids
+        return [melco_id for melco_id in melco_ids if melco_id in available]
+
+    def fuzzy_search(
+        self,
+        query: str,
+        limit: int = 10,
+        threshold: float = 0.3,
+        kinds: Optional[Set[str]] = None,
+    ) -> List[FuzzyMatch]:
+        return self._snapshot.fuzzy.search(query, limit=limit, threshold=threshold, kinds=kinds)
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def refresh_autocomplete_index() -> bool:
+    """Refresh the shared index with a short-lived session."""
+    db = SessionLocal()
+    try:
+        return autocomplete_index.refresh_if_stale(db)
+    finally:
+        db.close()
+
+
+async def autocomplete_refresh_loop(
+    interval: float = AUTOCOMPLETE_REFRESH_SECONDS,
+    on_refresh: Optional[Callable[[], object]] = None,
+    refresh: Callable[[], bool] = refresh_autocomplete_index,
+) -> None:
+    """Poll the dataset version and rebuild the index after imports."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            refreshed = await asyncio.to_thread(refresh)
+            if refreshed and on_refresh is not None:
+                await asyncio.to_thread(on_refresh)
+        except Exception as e:
+            logger.warning(f"Autocomplete index refresh failed: {e}")
@@ -0,0 +1,51 @@
+"""N-gram helpers for substring search over Japanese (CJK) text."""
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+# Hiragana, Katakana, CJK ideographs (incl. Ext. A / compatibility) and
+# half/full-width forms. Text without word boundaries is indexed by n-grams.
+_CJK_CHAR = re.compile(
+    "[\u3040-\u309f\u30a0-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff01-\uff9f]"
+)
+
+
+def is_cjk(char: str) -> bool:
+    return bool(_CJK_CHAR.match(char))
+
+
+def cjk_ngrams(*texts: Optional[str]) -> List[str]:
+    """
+    Return the sorted, distinct CJK unigrams and bigrams found in ``texts``.
+
+    Only runs of CJK characters contribute, so English text adds nothing to
+    the index. A substring query matches a row only if the row contains all
+    of the query's n-grams; callers recheck the real substring afterwards.
+    """
+    grams = set()
+    for value in texts:
+        if not value:
+            continue
+        previous_cjk = ""
+        for char in value:
+            if is_cjk(char):
+                grams.add(char)
+                if previous_cjk:
+                    grams.add(previous_cjk + char)
+                previous_cjk = char
+            else:
+                previous_cjk = ""
+    return sorted(grams)
+
+
+def query_ngrams(query: str) -> List[str]:
+    """
+    Return the n-grams a row must contain to possibly match ``query``.
+
+    Bigrams are used when the query has them; a lone CJK character falls back
+    to its unigram.
+    """
+    grams = cjk_ngrams(query)
+    bigrams = [gram for gram in grams if len(gram) == 2]
+    return bigrams or grams
@@ -0,0 +1,127 @@
+"""Character-trigram index for typo-tolerant ID and name suggestions."""
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Separators and punctuation; Unicode letters and digits (e.g. Japanese names) are kept
+_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+# Upper bound on posting entries scanned per query; rare trigrams are scanned
+# first so the budget is spent on the most selective ones.
+MAX_POSTINGS_SCANNED = 20000
+# Entries re-scored exactly after the approximate counting pass
+CANDIDATE_POOL = 200
+
+
+class FuzzyEntry(NamedTuple):
+    """A suggestion target: the displayed value, its kind and owning CFTS."""
+    value: str
+    kind: str
+    cfts_id: str
+
+
+class FuzzyMatch(NamedTuple):
+    entry: FuzzyEntry
+    score: float
+
+
+def fold_for_matching(value: str) -> str:
+    """
+    Case-fold and drop separators so 'Anti Theft' matches 'anti-theft'.
+
+    NFKC first maps full-width letters and digits ('ＣＦＴＳ') to ASCII.
+    """
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", value).casefold())
+
+
+def trigrams(value: str) -> Set[str]:
+    """Return padded character trigrams of the folded value (pg_trgm style)."""
+    folded = fold_for_matching(value)
+    if not folded:
+        return set()
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to entry positions, ranked by Dice similarity.
+
+    Postings are kept per entry kind, so a ``kinds`` filter only ever counts
+    entries of the requested kinds and the candidate pool is not crowded out
+    by other kinds sharing the same trigrams.
+    """
+
+    __slots__ = ("_entries", "_entry_trigrams", "_postings")
+
+    def __init__(self, entries: Iterable[FuzzyEntry]):
+        self._entries: List[FuzzyEntry] = []
+        self._entry_trigrams: List[Set[str]] = []
+        postings: Dict[str, Dict[str, List[int]]] = {}
+
+        for entry in dict.fromkeys(entries):
+            grams = trigrams(entry.value)
+            if not grams:
+                continue
+            position = len(self._entries)
+            self._entries.append(entry)
+            self._entry_trigrams.append(grams)
+            for gram in grams:
+                postings.setdefault(entry.kind, {}).setdefault(gram, []).append(position)
+
+        self._postings: Dict[str, Dict[str, Tuple[int, ...]]] = {
+            kind: {gram: tuple(positions) for gram, positions in kind_postings.items()}
+            for kind, kind_postings in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        threshold: float = 0.3,
+        kinds: Optional[Set[str]] = None,
+    ) -> List[FuzzyMatch]:
+        """Return entries similar to ``query``, best first."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        kind_postings = [
+            postings for kind, postings in self._postings.items() if not kinds or kind in kinds
+        ]
+        known = []
+        for gram in query_grams:
+            lists = [postings[gram] for postings in kind_postings if gram in postings]
+            if lists:
+                known.append((sum(len(positions) for positions in lists), lists))
+        known.sort(key=lambda item: item[0])
+
+        counts: Counter = Counter()
+        scanned = 0
+        for size, lists in known:
+            if scanned and scanned + size > MAX_POSTINGS_SCANNED:
+                break
+            for positions in lists:
+                counts.update(positions)
+            scanned += size
+
+        folded_query = fold_for_matching(query)
+        matches = []
+        for position, _ in counts.most_common(CANDIDATE_POOL):
+            entry = self._entries[position]
+            entry_grams = self._entry_trigrams[position]
+            shared = len(query_grams & entry_grams)
+            score = 2 * shared / (len(query_grams) + len(entry_grams))
+            if fold_for_matching(entry.value) == folded_query:
+                score = 1.0
+            if score >= threshold:
+                matches.append(FuzzyMatch(entry, round(score, 4)))
+
+        matches.sort(key=lambda match: (-match.score, len(match.entry.value), match.entry.value))
+        return matches[:limit]
@@ -0,0 +1,124 @@
+"""Background probe behind /health and /readiness: DB connectivity, pool saturation and dataset version."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, QueuePool
+
+from ..db.crud import get_dataset_version
+from ..db.database import DATABASE_URL, DB_MAX_OVERFLOW, engine
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+# 超過此秒數未更新的探測結果視為不健康（探測卡住或資料庫逾時）
+HEALTH_MAX_STALENESS = float(os.getenv("HEALTH_MAX_STALENESS", "15"))
+# 借出連線比例達此值時 /readiness 回傳 503，讓負載平衡暫時避開此 worker
+HEALTH_POOL_SATURATION = float(os.getenv("HEALTH_POOL_SATURATION", "0.9"))
+# 探測連線的連線逾時（秒，整數）與查詢逾時（毫秒）
+HEALTH_CONNECT_TIMEOUT = int(os.getenv("HEALTH_CONNECT_TIMEOUT", "3"))
+HEALTH_STATEMENT_TIMEOUT_MS = int(os.getenv("HEALTH_STATEMENT_TIMEOUT_MS", "3000"))
+
+# The probe opens its own short-lived connection instead of borrowing one from
+# the app pool, so an exhausted pool shows up as saturation, not as a dead database
+probe_engine = create_engine(
+    DATABASE_URL,
+    poolclass=NullPool,
+    connect_args={
+        "connect_timeout": HEALTH_CONNECT_TIMEOUT,
+        "options": f"-c statement_timeout={HEALTH_STATEMENT_TIMEOUT_MS}",
+    },
+)
+
+
+def pool_stats() -> Dict:
+    """Checked-out connections against the pool capacity (QueuePool only)."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    capacity = pool.size() + max(DB_MAX_OVERFLOW, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 2) if capacity else 0.0,
+    }
+
+
+def probe_once() -> Dict:
+    """Run one probe: SELECT 1, dataset version and pool usage (blocking)."""
+    started = time.perf_counter()
+    result: Dict = {"checked_at": datetime.now(timezone.utc).isoformat()}
+    db = Session(probe_engine)
+    try:
+        db.execute(text("SELECT 1"))
+        result["database"] = "connected"
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        result["database"] = "disconnected"
+        result["error"] = str(e).splitlines()[0]
+    else:
+        try:
+            result["dataset_version"] = get_dataset_version(db)
+        except Exception:
+            # Tables not created yet (schema still being prepared)
+            db.rollback()
+            result["dataset_version"] = None
+    finally:
+        db.close()
+    result["pool"] = pool_stats()
+    return result
+
+
+class HealthProbe:
+    """Latest probe result; readers never touch the database."""
+
+    def __init__(self, max_staleness: float = HEALTH_MAX_STALENESS):
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._result: Optional[Dict] = None
+        self._probed_at: Optional[float] = None
+
+    def record(self, result: Dict) -> None:
+        with self._lock:
+            self._result = result
+            self._probed_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        """Cached result plus its age; ``stale`` when older than the staleness budget."""
+        with self._lock:
+            result, probed_at = self._result, self._probed_at
+        if result is None:
+            return {"database": "unknown", "stale": True, "age_seconds": None}
+        age = time.monotonic() - probed_at
+        return {**result, "age_seconds": round(age, 1), "stale": age > self.max_staleness}
+
+    def refresh(self) -> Dict:
+        result = probe_once()
+        self.record(result)
+        return result
+
+
+health_probe = HealthProbe()
+
+
+async def health_probe_loop(interval: float = HEALTH_PROBE_INTERVAL) -> None:
+    """Probe the database every ``interval`` seconds off the event loop."""
+    while True:
+        try:
+            result = await asyncio.to_thread(health_probe.refresh)
+            if result["database"] != "connected":
+                logger.warning(f"Health probe failed: {result.get('error')}")
+        except Exception as e:
+            logger.warning(f"Health probe failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,322 @@
+"""Background Excel import jobs run in a worker process pool.
+
+Each job owns a directory holding the uploaded files and a ``status.json``
+that the worker rewrites as the importer reports progress, so any API
+worker process can serve job status and progress streams.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, IO, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOBS_DIR = Path(os.getenv("IMPORT_JOBS_DIR", os.path.join(tempfile.gettempdir(), "rtm_import_jobs")))
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+
+IMPORT_KINDS = ("cfts", "sys2", "testcase")
+FINAL_STATES = ("done", "failed")
+STATUS_FILE = "status.json"
+# Held (flock) by the API process that queued the job until the job finishes
+LOCK_FILE = ".owner.lock"
+# Minimum seconds between status writes while rows are being written
+STATUS_WRITE_INTERVAL = 0.5
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+_EXCEL_SUFFIXES = (".xlsx", ".xls")
+# File names CFTSImporter.find_excel_files picks up from the job directory
+_CFTS_PREFIXES = ("CFTS", "SYS1_CFTS")
+
+
+def detect_import_kind(filename: str) -> Optional[str]:
+    """Map a workbook name to its importer (same naming rules as the batch scripts)."""
+    name = Path(filename).name
+    # "~$name.xlsx" is the Office lock file, dot files are editor/sync temp files
+    if name.startswith(("~$", ".")) or not name.lower().endswith(_EXCEL_SUFFIXES):
+        return None
+    if name.startswith(_CFTS_PREFIXES):
+        return "cfts"
+    if "SYS.2" in name:
+        return "sys2"
+    if "testcase" in name.lower():
+        return "testcase"
+    return None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _job_dir(job_id: str) -> Path:
+    return IMPORT_JOBS_DIR / job_id
+
+
+def _write_status(job_dir: Path, status: Dict) -> None:
+    """Replace status.json atomically so readers never see a partial file."""
+    tmp_path = job_dir / f".{STATUS_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, job_dir / STATUS_FILE)
+
+
+def read_job_status(job_id: str) -> Optional[Dict]:
+    if not _JOB_ID.match(job_id):
+        return None
+    try:
+        with open(_job_dir(job_id) / STATUS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def list_job_statuses(limit: int = 50) -> List[Dict]:
+    if not IMPORT_JOBS_DIR.exists():
+        return []
+    statuses = [read_job_status(path.name) for path in IMPORT_JOBS_DIR.iterdir() if path.is_dir()]
+    statuses = [status for status in statuses if status]
+    statuses.sort(key=lambda status: status["created_at"], reverse=True)
+    return statuses[:limit]
+
+
+class JobProgress:
+    """Importer progress callback that aggregates phases into status.json."""
+
+    def __init__(self, job_dir: Path, status: Dict):
+        self.job_dir = job_dir
+        self.status = status
+        self._started = time.perf_counter()
+        self._last_write = 0.0
+        self._written_before_file = 0
+        self._current_file_rows = 0
+
+    def __call__(self, phase: str, **fields) -> None:
+        status = self.status
+        phase_changed = phase != status.get("phase")
+
+        if phase == "parsing":
+            # Rows written for the previous file count towards the job total
+            self._written_before_file += self._current_file_rows
+            self._current_file_rows = 0
+            status["current_file"] = fields.get("file")
+        elif phase == "parsed":
+            status["rows_parsed"] += fields.get("rows_parsed", 0)
+        elif phase == "writing":
+            self._current_file_rows = fields.get("rows_written", 0)
+            status["rows_written"] = self._written_before_file + self._current_file_rows
+
+        elapsed = time.perf_counter() - self._started
+        status["phase"] = phase
+        status["elapsed_seconds"] = round(elapsed, 3)
+        status["rows_per_second"] = round(status["rows_written"] / elapsed, 1) if elapsed else 0.0
+
+        now = time.monotonic()
+        if phase_changed or now - self._last_write >= STATUS_WRITE_INTERVAL:
+            self._last_write = now
+            _write_status(self.job_dir, status)
+
+    def finish(self, state: str, report: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        elapsed = time.perf_counter() - self._started
+        self.status.update(
+            state=state,
+            phase=None,
+            report=report,
+            error=error,
+            finished_at=_now(),
+            elapsed_seconds=round(elapsed, 3),
+        )
+        _write_status(self.job_dir, self.status)
+
+
+def run_import_job(job_id: str) -> str:
+    """Worker-process entry point: run the batch importer for one job."""
+    job_dir = _job_dir(job_id)
+    status = read_job_status(job_id)
+    status.update(state="running", started_at=_now())
+    progress = JobProgress(job_dir, status)
+    _write_status(job_dir, status)
+
+    try:
+        # The batch import scripts live next to the app package (backend root)
+        if status["kind"] == "cfts":
+            from batch_import_cfts_new import CFTSImporter
+            report = CFTSImporter(str(job_dir), progress=progress).process_all_files()
+        elif status["kind"] == "sys2":
+            from batch_import_sys2 import SYS2Importer
+            report = SYS2Importer(str(job_dir / status["files"][0]), progress=progress).process_file()
+        else:
+            from batch_import_testcase import TestCaseImporter
+            report = TestCaseImporter(str(job_dir / status["files"][0]), progress=progress).process_file()
+    except Exception as e:
+        progress.finish("failed", error=str(e))
+        return "failed"
+
+    progress.finish("failed" if report_failed(status["kind"], report) else "done", report=report)
+    return status["state"]
+
+
+def report_failed(kind: str, report: Dict) -> bool:
+    """Importers catch file-level errors into the report instead of raising."""
+    if kind == "cfts":
+        return not report.get("success_files")
+    return any("file" in error for error in report.get("errors", []))
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_owner_locks: Dict[str, IO] = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs threads and holds pooled DB connections is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=IMPORT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def validate_upload_names(kind: str, filenames: List[Optional[str]]) -> List[str]:
+    """
+    Job directory names of uploaded workbooks; ValueError names the first bad one.
+
+    Checked for an explicit ``kind`` too: the job directory also holds
+    status.json and the owner lock, and the CFTS importer only picks up
+    CFTS* / SYS1_CFTS* workbooks.
+    """
+    names: List[str] = []
+    for filename in filenames:
+        name = Path(filename or "").name
+        if not name or name in (STATUS_FILE, LOCK_FILE) or name.startswith(("~$", ".")):
+            raise ValueError(f"Reserved or temporary file name: {filename!r}")
+        if not name.lower().endswith(_EXCEL_SUFFIXES):
+            raise ValueError(f"Not an Excel workbook: {name}")
+        if kind == "cfts" and not (name.startswith(_CFTS_PREFIXES) and name.endswith(_EXCEL_SUFFIXES)):
+            raise ValueError(f"CFTS workbooks must be named CFTS*.xlsx or SYS1_CFTS*.xlsx: {name}")
+        if name in names:
+            raise ValueError(f"Duplicate file name: {name}")
+        names.append(name)
+    return names
+
+
+def submit_import_job(kind: str, uploads: List[Tuple[str, BinaryIO]]) -> Dict:
+    """
+    Store the uploaded workbooks in a new job directory and queue the import.
+
+    Raises ValueError for file names rejected by validate_upload_names.
+    """
+    names = validate_upload_names(kind, [filename for filename, _ in uploads])
+    job_id = uuid.uuid4().hex
+    job_dir = _job_dir(job_id)
+    job_dir.mkdir(parents=True)
+    # Taken before status.json exists and held by this process until the job
+    # finishes; a restarted server can then tell orphaned jobs apart
+    lock = open(job_dir / LOCK_FILE, "w")
+    if fcntl is not None:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+    _owner_locks[job_id] = lock
+
+    files = []
+    for name, (_, stream) in zip(names, uploads):
+        with open(job_dir / name, "wb") as f:
+            shutil.copyfileobj(stream, f)
+        files.append(name)
+
+    status = {
+        "job_id": job_id,
+        "kind": kind,
+        "files": files,
+        "state": "queued",
+        "phase": None,
+        "current_file": None,
+        "rows_parsed": 0,
+        "rows_written": 0,
+        "rows_per_second": 0.0,
+        "elapsed_seconds": 0.0,
+        "created_at": _now(),
+        "finished_at": None,
+        "report": None,
+        "error": None,
+    }
+    _write_status(job_dir, status)
+
+    future = _get_executor().submit(run_import_job, job_id)
+    future.add_done_callback(lambda done: _on_job_done(job_id, done))
+    logger.info(f"Import job {job_id} queued: {kind} {files}")
+    return status
+
+
+def _fail_job(job_id: str, error: str) -> None:
+    status = read_job_status(job_id)
+    if status and status["state"] not in FINAL_STATES:
+        status.update(state="failed", phase=None, error=error, finished_at=_now())
+        _write_status(_job_dir(job_id), status)
+
+
+def _on_job_done(job_id: str, future) -> None:
+    """Record jobs cancelled at shutdown and crashes of the worker process (e.g. the OOM killer)."""
+    try:
+        if future.cancelled():
+            logger.warning(f"Import job {job_id} cancelled at shutdown")
+            _fail_job(job_id, "Cancelled: server shut down before the import started")
+            return
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Import job {job_id} crashed: {error}")
+            _fail_job(job_id, str(error))
+    finally:
+        lock = _owner_locks.pop(job_id, None)
+        if lock is not None:
+            lock.close()
+
+
+def recover_interrupted_jobs() -> int:
+    """
+    Fail queued/running jobs whose owning server process is gone (called at startup).
+
+    Jobs queued by another live API worker keep their owner lock and are left alone.
+    """
+    if not IMPORT_JOBS_DIR.exists():
+        return 0
+    recovered = 0
+    for job_dir in IMPORT_JOBS_DIR.iterdir():
+        status = read_job_status(job_dir.name)
+        if not status or status["state"] in FINAL_STATES or job_dir.name in _owner_locks:
+            continue
+        with open(job_dir / LOCK_FILE, "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+            _fail_job(job_dir.name, "Interrupted: server stopped before the import finished")
+            recovered += 1
+    if recovered:
+        logger.warning(f"Marked {recovered} interrupted import jobs as failed")
+    return recovered
+
+
+def shutdown_import_jobs() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
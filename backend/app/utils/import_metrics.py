@@ -0,0 +1,100 @@
+"""Per-file, per-phase wall time, throughput and peak memory for the batch importers."""
+import cProfile
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Phase key for work done once per run rather than per file
+RUN_SCOPE = "(run)"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water mark of the process resident set size in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class ImportMetrics:
+    """
+    Accumulates phase timings for ``report['timings']``.
+
+    Phases: ``read`` (Excel -> DataFrame), ``parse`` (rows -> records),
+    ``write`` (database writes; ``commit`` is the part spent in commits),
+    ``links`` (SYS.2 only) and ``finalize`` (rollups, dataset version and
+    generation).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.current_file = RUN_SCOPE
+        self.files: Dict[str, Dict[str, Dict]] = {}
+
+    def begin_file(self, name: str) -> None:
+        self.current_file = name
+
+    def record(self, phase: str, seconds: float, rows: int = 0, file: Optional[str] = None) -> None:
+        """Add ``seconds`` (and ``rows``) to a phase of the current file."""
+        entry = self.files.setdefault(file or self.current_file, {}).setdefault(
+            phase, {"seconds": 0.0, "rows": 0}
+        )
+        entry["seconds"] = round(entry["seconds"] + seconds, 4)
+        entry["rows"] += rows
+        entry["rows_per_second"] = round(entry["rows"] / entry["seconds"], 1) if entry["rows"] and entry["seconds"] else 0.0
+        entry["peak_rss_mb"] = peak_rss_mb()
+
+    @contextmanager
+    def phase(self, phase: str, file: Optional[str] = None) -> Iterator[Dict]:
+        """Time a block; set ``counter['rows']`` inside it to report throughput."""
+        counter = {"rows": 0}
+        started = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            self.record(phase, time.perf_counter() - started, counter["rows"], file)
+
+    def as_report(self) -> Dict:
+        return {
+            "files": self.files,
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+def print_timings(report: Dict) -> None:
+    """Print the phase table of ``report['timings']`` and the profile path, if any."""
+    timings = report.get("timings")
+    if not timings:
+        return
+    print(f"\nTimings (total {timings['total_seconds']}s, peak RSS {timings['peak_rss_mb']} MiB):")
+    for file_name, phases in timings["files"].items():
+        summary = ", ".join(
+            f"{phase} {entry['seconds']:.2f}s" + (f" ({entry['rows_per_second']:.0f} rows/s)" if entry["rows"] else "")
+            for phase, entry in phases.items()
+        )
+        print(f"  {file_name}: {summary}")
+    if report.get("profile"):
+        print(f"cProfile dump: {report['profile']} (python -m pstats {report['profile']})")
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[Optional[str]]:
+    """Run the block under cProfile and dump stats to ``path`` (no-op when None)."""
+    if not path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield path
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
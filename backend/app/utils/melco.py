@@ -2,20 +2,44 @@
 from __future__ import annotations
 
 import re
-from typing import Set
+from functools import lru_cache
+from typing import Iterable, List, Set, Tuple
 
 
-_EDGE_HASHES = re.compile(r"^#+|#+$")
+_RELATED_ID_SEPARATORS = re.compile(r"[\s,;、，；]+")
+HIERARCHY_SEPARATOR = "-"
+# Distinct IDs whose variants are memoized (availability checks repeat the same IDs)
+VARIANT_CACHE_SIZE = 65536
 
 
 def normalize_melco_id(melco_id: str | None) -> str:
     """Return a canonical Melco ID stripped of whitespace and edge hashes."""
     if not melco_id:
         return ""
-    trimmed = melco_id.strip()
-    if not trimmed:
-        return ""
-    return _EDGE_HASHES.sub("", trimmed)
+    # str.strip("#") removes the same leading/trailing hash runs as ^#+|#+$, without a regex
+    return melco_id.strip().strip("#")
+
+
+def normalize_melco_ids(melco_ids: Iterable[str | None]) -> List[str]:
+    """Canonical IDs for many values, in order, without duplicates or blanks."""
+    return [melco_id for melco_id in dict.fromkeys(map(normalize_melco_id, melco_ids)) if melco_id]
+
+
+def normalize_melco_series(melco_ids):
+    """
+    Column-wise ``normalize_melco_id`` for a pandas Series (importers).
+
+    Missing cells become "", matching the scalar function.
+    """
+    return melco_ids.fillna("").astype(str).str.strip().str.strip("#")
+
+
+@lru_cache(maxsize=VARIANT_CACHE_SIZE)
+def _melco_variants(trimmed: str) -> Tuple[str, ...]:
+    canonical = trimmed.strip("#")
+    if not canonical:
+        return (trimmed,)
+    return (trimmed, canonical, f"#{canonical}", f"##{canonical}")
 
 
 def generate_melco_variants(melco_id: str | None) -> Set[str]:
@@ -34,10 +58,39 @@ def generate_melco_variants(melco_id: str | None) -> Set[str]:
     if not trimmed:
         return set()
 
-    canonical = normalize_melco_id(trimmed)
-    variants = {trimmed}
-    if canonical:
-        variants.add(canonical)
-        variants.add(f"#{canonical}")
-        variants.add(f"##{canonical}")
-    return variants
+    # Callers may extend the returned set, so the memoized tuple is copied
+    return set(_melco_variants(trimmed))
+
+
+def melco_variant_pool(melco_ids: Iterable[str | None]) -> Set[str]:
+    """Union of the variants of many IDs, for a single ``IN (...)`` lookup."""
+    pool: Set[str] = set()
+    for melco_id in melco_ids:
+        trimmed = melco_id.strip() if melco_id else ""
+        if trimmed:
+            pool.update(_melco_variants(trimmed))
+    return pool
+
+
+def parse_related_ids(related_ids: str | None) -> List[str]:
+    """
+    Split a free-text related requirement field into canonical Melco IDs.
+
+    Entries may be separated by newlines, whitespace, commas or semicolons.
+    Tokens without any digit (placeholders such as '-' or 'N/A') are dropped.
+    """
+    if not related_ids:
+        return []
+    ids = (normalize_melco_id(token) for token in _RELATED_ID_SEPARATORS.split(related_ids))
+    return list(dict.fromkeys(melco_id for melco_id in ids if re.search(r"\d", melco_id)))
+
+
+def melco_path(melco_id: str | None) -> str:
+    """
+    Return the materialized hierarchy path of a Melco ID.
+
+    Paths end with the separator, so the subtree of ``PSCFTS016-1`` is every
+    path starting with ``PSCFTS016-1-`` and never ``PSCFTS016-10-...``.
+    """
+    canonical = normalize_melco_id(melco_id)
+    return f"{canonical}{HIERARCHY_SEPARATOR}" if canonical else ""
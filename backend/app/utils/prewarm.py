@@ -0,0 +1,145 @@
+"""Background cache prewarming after startup and after each import."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..db.crud import get_cfts_requirements_by_cfts_id
+from ..db.database import SessionLocal
+from ..models.cfts_coverage import CFTSCoverageDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from .autocomplete import autocomplete_index
+from .melco import melco_path
+from .search import LIKE_ESCAPE, prefix_pattern
+
+logger = logging.getLogger(__name__)
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "true").lower() in ("1", "true", "yes")
+# 逗號分隔的 CFTS 清單；未設定時依近期查詢次數，再以要件數最多的 CFTS 補足
+PREWARM_CFTS_IDS = [item.strip() for item in os.getenv("PREWARM_CFTS_IDS", "").split(",") if item.strip()]
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "10"))
+
+
+class CFTSAccessCounter:
+    """Counts /cfts/search lookups in this process to learn what to prewarm."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def record(self, cfts_id: str) -> None:
+        with self._lock:
+            self._counts[cfts_id] += 1
+
+    def most_common(self, n: int) -> List[str]:
+        with self._lock:
+            return [cfts_id for cfts_id, _ in self._counts.most_common(n)]
+
+
+cfts_access_counter = CFTSAccessCounter()
+
+
+class PrewarmStatus:
+    """Progress of the current or last prewarm run (reported by /prewarm)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict = {"state": "idle"}
+
+    def update(self, **fields) -> None:
+        with self._lock:
+            self._state = {**self._state, **fields}
+
+    def reset(self, **fields) -> None:
+        with self._lock:
+            self._state = dict(fields)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self._state)
+
+
+prewarm_status = PrewarmStatus()
+_prewarm_lock = threading.Lock()
+
+
+def select_cfts_groups(db: Session, top_n: int = PREWARM_TOP_N) -> List[str]:
+    """Configured CFTS first, then the most requested, then the largest groups."""
+    selected = list(dict.fromkeys(PREWARM_CFTS_IDS + cfts_access_counter.most_common(top_n)))
+    if len(selected) < top_n:
+        largest = (
+            db.query(CFTSCoverageDB.cfts_id)
+            .order_by(CFTSCoverageDB.requirement_count.desc(), CFTSCoverageDB.cfts_id)
+            .limit(top_n)
+            .all()
+        )
+        for (cfts_id,) in largest:
+            if len(selected) >= top_n:
+                break
+            if cfts_id not in selected:
+                selected.append(cfts_id)
+    return selected
+
+
+def _warm_cfts_group(db: Session, cfts_id: str) -> int:
+    """Run the queries behind opening a CFTS so its pages and indexes are cached."""
+    requirements = get_cfts_requirements_by_cfts_id(db, cfts_id)
+    db.query(SYS2RequirementDB).filter(SYS2RequirementDB.cfts_id == cfts_id).all()
+    db.query(TestCaseDB.id, TestCaseDB.feature_id).filter(
+        TestCaseDB.melco_path.like(prefix_pattern(melco_path(f"PS{cfts_id}")), escape=LIKE_ESCAPE)
+    ).all()
+    db.expunge_all()
+    return len(requirements)
+
+
+def prewarm(reason: str) -> Optional[Dict]:
+    """
+    Load autocomplete data, availability sets and the top CFTS groups.
+
+    Returns the final status, or None when another prewarm is already running.
+    """
+    if not _prewarm_lock.acquire(blocking=False):
+        return None
+
+    started = time.perf_counter()
+    prewarm_status.reset(
+        state="running",
+        reason=reason,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        step="autocomplete",
+        cfts_done=0,
+        cfts_total=0,
+    )
+    db = SessionLocal()
+    try:
+        # Autocomplete data and SYS.2 availability set (rebuilt only if the version moved)
+        autocomplete_index.refresh_if_stale(db)
+        prewarm_status.update(autocomplete_seconds=round(time.perf_counter() - started, 3))
+
+        cfts_ids = select_cfts_groups(db)
+        prewarm_status.update(step="cfts", cfts_total=len(cfts_ids), cfts_ids=cfts_ids)
+        for index, cfts_id in enumerate(cfts_ids, 1):
+            rows = _warm_cfts_group(db, cfts_id)
+            prewarm_status.update(cfts_done=index)
+            logger.info(f"Prewarm [{index}/{len(cfts_ids)}] {cfts_id}: {rows} requirements")
+
+        elapsed = round(time.perf_counter() - started, 3)
+        prewarm_status.update(state="done", step=None, seconds=elapsed)
+        logger.info(f"Prewarm ({reason}) finished in {elapsed}s: {len(cfts_ids)} CFTS groups")
+    except Exception as e:
+        prewarm_status.update(state="failed", error=str(e),
+                              seconds=round(time.perf_counter() - started, 3))
+        logger.warning(f"Prewarm ({reason}) failed: {e}")
+    finally:
+        db.close()
+        _prewarm_lock.release()
+
+    return prewarm_status.snapshot()
@@ -0,0 +1,240 @@
+"""Optional in-memory read model for CFTS, SYS.2 and test case lookups."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db.crud import get_dataset_version
+from ..db.database import SessionLocal
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from .autocomplete import PrefixIndex
+from .melco import normalize_melco_id
+
+logger = logging.getLogger(__name__)
+
+# 預設關閉；開啟後讀取端點改由記憶體提供，PostgreSQL 仍為資料來源
+READ_MODEL_ENABLED = os.getenv("READ_MODEL_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+class _Record:
+    """Attribute-compatible stand-in for an ORM row (no identity map, no session)."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+
+class CFTSRecord(_Record):
+    __slots__ = (
+        "id", "cfts_id", "cfts_name", "req_id", "source_id", "description",
+        "sr24_description", "melco_id", "description_changed", "description_diff",
+        "created_at", "updated_at",
+    )
+
+
+class SYS2Record(_Record):
+    __slots__ = (
+        "id", "melco_id", "cfts_id", "cfts_name", "requirement_en", "reason_en",
+        "supplement_en", "confirmation_phase", "verification_criteria", "type",
+        "related_requirement_ids", "r1l_sr21cfts", "r1l_sr22cfts", "r1l_sr23cfts",
+        "r1l_sr24cfts", "created_at", "updated_at",
+    )
+
+
+class TestCaseRecord(_Record):
+    __slots__ = (
+        "id", "feature_id", "source", "title", "section", "test_item_en",
+        "precondition_procedure_jp", "criteria_jp",
+    )
+
+
+def _load(db: Session, model, record_type) -> List[_Record]:
+    """Load the record's columns ordered by primary key, without ORM objects."""
+    columns = [getattr(model, name) for name in record_type.__slots__]
+    result = db.execute(select(*columns).order_by(model.id))
+    return [record_type(*row) for row in result]
+
+
+def _group(records: Iterable[_Record], key) -> Dict[str, List[_Record]]:
+    grouped: Dict[str, List[_Record]] = {}
+    for record in records:
+        grouped.setdefault(key(record), []).append(record)
+    return grouped
+
+
+class _Snapshot(NamedTuple):
+    cfts: List[CFTSRecord]
+    cfts_by_cfts_id: Dict[str, List[CFTSRecord]]
+    cfts_ids: PrefixIndex
+    cfts_by_req_id: Dict[str, List[CFTSRecord]]
+    cfts_names: Dict[str, str]
+    sys2_by_melco_id: Dict[str, List[SYS2Record]]
+    sys2_by_upper_melco_id: Dict[str, List[SYS2Record]]
+    sys2_upper_melco_ids: PrefixIndex
+    sys2_by_upper_cfts_id: Dict[str, List[SYS2Record]]
+    sys2_upper_cfts_ids: PrefixIndex
+    testcases_by_feature_id: Dict[str, List[TestCaseRecord]]
+
+
+class ReadModel:
+    """
+    All three tables held as slotted records with dict and sorted-array indexes.
+
+    Every lookup mirrors the SQL query it replaces (same filters, same
+    ordering by primary key). A reload builds a complete new snapshot and
+    swaps it in, so readers never see a half-loaded dataset.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._refresh_lock = threading.Lock()
+        self.version: Optional[int] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def build(self, db: Session, version: int) -> None:
+        cfts = _load(db, CFTSRequirementDB, CFTSRecord)
+        sys2 = _load(db, SYS2RequirementDB, SYS2Record)
+        testcases = _load(db, TestCaseDB, TestCaseRecord)
+
+        cfts_by_cfts_id = _group(cfts, lambda record: record.cfts_id or "")
+        cfts_names: Dict[str, str] = {}
+        for record in cfts:
+            if record.cfts_id and record.cfts_id not in cfts_names:
+                cfts_names[record.cfts_id] = record.cfts_name or ""
+        sys2_by_upper_melco_id = _group(sys2, lambda record: (record.melco_id or "").upper())
+        sys2_by_upper_cfts_id = _group(sys2, lambda record: (record.cfts_id or "").upper())
+
+        self._snapshot = _Snapshot(
+            cfts=cfts,
+            cfts_by_cfts_id=cfts_by_cfts_id,
+            cfts_ids=PrefixIndex(cfts_by_cfts_id),
+            cfts_by_req_id=_group(cfts, lambda record: record.req_id),
+            cfts_names=cfts_names,
+            sys2_by_melco_id=_group(sys2, lambda record: record.melco_id),
+            sys2_by_upper_melco_id=sys2_by_upper_melco_id,
+            sys2_upper_melco_ids=PrefixIndex(sys2_by_upper_melco_id),
+            sys2_by_upper_cfts_id=sys2_by_upper_cfts_id,
+            sys2_upper_cfts_ids=PrefixIndex(sys2_by_upper_cfts_id),
+            testcases_by_feature_id=_group(testcases, lambda record: record.feature_id),
+        )
+        self.version = version
+        logger.info(
+            f"Read model loaded: {len(cfts)} CFTS, {len(sys2)} SYS.2, "
+            f"{len(testcases)} test cases (dataset version {version})"
+        )
+
+    def refresh_if_stale(self, db: Session) -> bool:
+        """Reload when the dataset version has changed."""
+        with self._refresh_lock:
+            version = get_dataset_version(db)
+            if self.ready and version == self.version:
+                return False
+            self.build(db, version)
+            return True
+
+    # CFTS -----------------------------------------------------------------
+
+    def cfts_requirements(self, cfts_id: str, changed_only: bool = False) -> List[CFTSRecord]:
+        """Same semantics as crud.get_cfts_requirements_by_cfts_id."""
+        snapshot = self._snapshot
+        if cfts_id.endswith("-"):
+            records = list(snapshot.cfts_by_cfts_id.get(cfts_id, []))
+        else:
+            keys = snapshot.cfts_ids.search(cfts_id, len(snapshot.cfts_ids))
+            records = [record for key in keys for record in snapshot.cfts_by_cfts_id[key]]
+            if len(keys) > 1:
+                records.sort(key=lambda record: record.id)
+        if changed_only:
+            records = [record for record in records if record.description_changed]
+        return records
+
+    def requirement_by_req_id(self, req_id: str) -> Optional[CFTSRecord]:
+        records = self._snapshot.cfts_by_req_id.get(req_id)
+        return records[0] if records else None
+
+    def all_requirements(self, skip: int = 0, limit: int = 1000) -> List[CFTSRecord]:
+        return self._snapshot.cfts[skip:skip + limit]
+
+    def cfts_names(self, cfts_ids: Iterable[str]) -> Dict[str, str]:
+        names = self._snapshot.cfts_names
+        return {cfts_id: names[cfts_id] for cfts_id in cfts_ids if cfts_id in names}
+
+    # SYS.2 ----------------------------------------------------------------
+
+    def sys2_by_melco_ids(self, melco_ids: Iterable[str]) -> List[SYS2Record]:
+        """Rows whose stored Melco ID is one of ``melco_ids``, by primary key."""
+        by_melco_id = self._snapshot.sys2_by_melco_id
+        records = {
+            record.id: record
+            for melco_id in melco_ids
+            for record in by_melco_id.get(melco_id, [])
+        }
+        return [records[record_id] for record_id in sorted(records)]
+
+    def search_sys2(
+        self, cfts_prefix: Optional[str], melco_prefixes: List[str], limit: int
+    ) -> List[SYS2Record]:
+        """Case-insensitive prefix search, ordered by Melco ID."""
+        snapshot = self._snapshot
+
+        def prefixed(index: PrefixIndex, grouped: Dict[str, List[SYS2Record]], prefix: str):
+            return [
+                record
+                for key in index.search(prefix.upper(), len(index))
+                for record in grouped[key]
+            ]
+
+        if melco_prefixes:
+            candidates = {
+                record.id: record
+                for prefix in melco_prefixes
+                for record in prefixed(snapshot.sys2_upper_melco_ids, snapshot.sys2_by_upper_melco_id, prefix)
+            }.values()
+            if cfts_prefix:
+                upper_cfts = cfts_prefix.upper()
+                candidates = [
+                    record for record in candidates
+                    if (record.cfts_id or "").upper().startswith(upper_cfts)
+                ]
+        elif cfts_prefix:
+            candidates = prefixed(snapshot.sys2_upper_cfts_ids, snapshot.sys2_by_upper_cfts_id, cfts_prefix)
+        else:
+            candidates = [record for records in snapshot.sys2_by_melco_id.values() for record in records]
+
+        return sorted(candidates, key=lambda record: record.melco_id or "")[:limit]
+
+    # Test cases -----------------------------------------------------------
+
+    def testcases_by_feature_ids(self, feature_ids: Iterable[str]) -> List[TestCaseRecord]:
+        by_feature_id = self._snapshot.testcases_by_feature_id
+        records = [
+            record
+            for feature_id in dict.fromkeys(feature_ids)
+            for record in by_feature_id.get(feature_id, [])
+        ]
+        records.sort(key=lambda record: record.id)
+        return records
+
+
+read_model = ReadModel()
+
+
+def refresh_read_model() -> bool:
+    """Refresh the shared read model with a short-lived session."""
+    db = SessionLocal()
+    try:
+        return read_model.refresh_if_stale(db)
+    finally:
+        db.close()
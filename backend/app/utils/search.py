@@ -0,0 +1,25 @@
+"""Helpers for building index-friendly search filters."""
+from __future__ import annotations
+
+LIKE_ESCAPE = "\\"
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", f"{LIKE_ESCAPE}%")
+        .replace("_", f"{LIKE_ESCAPE}_")
+    )
+
+
+def prefix_pattern(value: str, *, upper: bool = False) -> str:
+    """
+    Return a LIKE pattern that matches values starting with ``value``.
+
+    Prefix patterns without leading wildcards can be served by the
+    ``text_pattern_ops`` indexes as a B-tree range scan. Pass ``upper=True``
+    when comparing against an ``upper(column)`` expression index.
+    """
+    prefix = value.upper() if upper else value
+    return f"{escape_like(prefix)}%"
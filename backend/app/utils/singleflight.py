@@ -0,0 +1,102 @@
+"""Single-flight coalescing of identical concurrent read requests."""
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import typing
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers with the same
+    key wait for and share the leader's result (or exception).
+
+    Nothing is cached: once the leader finishes the key is released, so the
+    next request always sees fresh data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+read_flight = SingleFlight()
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn query parameter values (lists, dicts) into a hashable key part."""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def single_flight(endpoint: Callable) -> Callable:
+    """
+    Coalesce identical concurrent calls of a sync read endpoint.
+
+    The key is the endpoint plus its arguments (the DB session excluded). The
+    leader's result is serialized once with the endpoint's return annotation
+    and every waiter gets the same JSON bytes, so N identical requests cost
+    one query and one serialization. Place it below the router decorator.
+
+    ``wrapper.shared(*args, **kwargs)`` returns ``(result, response)`` for
+    callers that also need the (shared, read-only) result object.
+    """
+    adapter = TypeAdapter(typing.get_type_hints(endpoint)["return"])
+    name = f"{endpoint.__module__}.{endpoint.__qualname__}"
+
+    def run(*args, **kwargs) -> Tuple[Any, bytes]:
+        result = endpoint(*args, **kwargs)
+        return result, adapter.dump_json(result)
+
+    def shared(*args, **kwargs) -> Tuple[Any, Response]:
+        key: Tuple = (name, _freeze(args), _freeze({
+            param: value for param, value in kwargs.items() if not isinstance(value, Session)
+        }))
+        result, body = read_flight.do(key, lambda: run(*args, **kwargs))
+        return result, Response(content=body, media_type="application/json")
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs) -> Response:
+        return shared(*args, **kwargs)[1]
+
+    wrapper.shared = shared
+    return wrapper
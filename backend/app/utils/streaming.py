@@ -0,0 +1,79 @@
+"""Incremental NDJSON / CSV parsing of streamed request bodies."""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# (line number, parsed record or None, error message or None)
+ParsedRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode UTF-8 chunks and yield complete lines, keeping the partial tail."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        text = tail + decoder.decode(chunk)
+        lines = text.split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """One JSON object per line; blank lines are ignored."""
+    line_number = 0
+    async for line in _iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, record, None
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    CSV with a header row of field names.
+
+    Quoted fields may span lines: physical lines are joined until the quote
+    count is balanced before a record is handed to the csv module.
+    """
+    header: List[str] = []
+    pending: List[str] = []
+    quotes = 0
+    start_line = line_number = 0
+
+    async for line in _iter_lines(chunks):
+        line_number += 1
+        if not pending:
+            start_line = line_number
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        text = "\n".join(pending)
+        pending, quotes = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if not header:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start_line, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start_line, dict(zip(header, values)), None
+
+    if pending:
+        yield start_line, None, "Unterminated quoted field"
@@ -0,0 +1,66 @@
+"""Word-level diff between SR24 and SR26 requirement descriptions."""
+import re
+from difflib import SequenceMatcher
+from typing import List, Tuple
+
+# Words and the whitespace that follows them stay together so joining the
+# segments reproduces the original text.
+_WORD = re.compile(r"\S+\s*")
+
+EQUAL = "="
+DELETE = "-"
+INSERT = "+"
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text or "")
+
+
+def _normalized(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def description_changed(old: str, new: str) -> bool:
+    """True when the descriptions differ beyond whitespace."""
+    return _normalized(old) != _normalized(new)
+
+
+def word_diff(old: str, new: str) -> List[List[str]]:
+    """
+    Return a compact word-level diff as ``[op, text]`` segments.
+
+    ``op`` is "=" (unchanged), "-" (only in ``old``) or "+" (only in
+    ``new``); adjacent words with the same op are merged into one segment.
+    """
+    old_words = _words(old.strip() if old else "")
+    new_words = _words(new.strip() if new else "")
+    matcher = SequenceMatcher(None, old_words, new_words, autojunk=False)
+
+    segments: List[Tuple[str, str]] = []
+
+    def append(op: str, words: List[str]) -> None:
+        if not words:
+            return
+        text = "".join(words)
+        if segments and segments[-1][0] == op:
+            segments[-1] = (op, segments[-1][1] + text)
+        else:
+            segments.append((op, text))
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            append(EQUAL, new_words[j1:j2])
+        else:
+            append(DELETE, old_words[i1:i2])
+            append(INSERT, new_words[j1:j2])
+
+    return [[op, text] for op, text in segments]
+
+
+def description_diff_fields(sr24_description: str, description: str) -> dict:
+    """Derived columns stored with each CFTS row (SR24 -> SR26)."""
+    changed = description_changed(sr24_description, description)
+    return {
+        "description_changed": changed,
+        "description_diff": word_diff(sr24_description, description) if changed else [],
+    }
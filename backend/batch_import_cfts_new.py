@@ -5,24 +5,34 @@ import json
 import sys
 import os
 import re
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Callable, Optional
 
-from app.db.database import engine, SessionLocal, Base
+from app.db.crud import bump_dataset_version
+from app.db.database import SessionLocal, ensure_schema
+from app.db.generations import content_hash, record_generation
+from app.db.rollups import refresh_cfts_coverage
 from app.models.requirement import CFTSRequirement
 from app.models.cfts_db import CFTSRequirementDB
+from app.utils.import_metrics import RUN_SCOPE, ImportMetrics, print_timings, profiled
+from app.utils.text_diff import description_diff_fields
+
+# Rows between progress callbacks while writing
+PROGRESS_INTERVAL = 200
 
 
 class CFTSImporter:
     """Import CFTS Excel files from data/CFTS folder."""
 
-    def __init__(self, excel_folder: str):
+    def __init__(self, excel_folder: str, progress: Optional[Callable[..., None]] = None):
         """
         Initialize CFTS importer.
 
         Args:
             excel_folder: Path to folder containing CFTS Excel files
+            progress: Optional callback receiving phase updates (background import jobs)
         """
         self.excel_folder = Path(excel_folder)
         self.report = {
@@ -34,6 +44,15 @@ class CFTSImporter:
             'skipped_records': 0,
             'errors': []
         }
+        self.progress = progress
+        # Req.ID -> (cfts_id, content hash) of every successfully imported row
+        self.snapshot_rows: Dict[str, Tuple[str, str]] = {}
+        self.metrics = ImportMetrics()
+
+    def report_progress(self, phase: str, **fields):
+        """Forward import progress to the optional callback."""
+        if self.progress:
+            self.progress(phase=phase, **fields)
 
     def find_excel_files(self) -> List[Path]:
         """Find all CFTS Excel files in the folder."""
@@ -79,10 +98,13 @@ class CFTSImporter:
                 raise Exception(f"Could not extract CFTS number from filename: {file_path.name}")
 
             # Read Excel file
-            df = pd.read_excel(file_path)
+            with self.metrics.phase('read') as timing:
+                df = pd.read_excel(file_path)
+                timing['rows'] = len(df)
             total_count = len(df)
 
             # Convert to list of dicts
+            started = time.perf_counter()
             data = []
             for _, row in df.iterrows():
                 # Get ReqIF.ForeignID as req_id
@@ -115,10 +137,13 @@ class CFTSImporter:
                     'source_id': source_id,
                     'description': description,
                     'sr24_description': sr24_description,
-                    'melco_id': melco_id
+                    'melco_id': melco_id,
+                    # Precompute the SR24 -> SR26 change so reviews need no per-request diffing
+                    **description_diff_fields(sr24_description, description),
                 }
                 data.append(record)
 
+            self.metrics.record('parse', time.perf_counter() - started, len(data))
             return data, total_count
 
         except Exception as e:
@@ -136,44 +161,55 @@ class CFTSImporter:
 
         db = SessionLocal()
         inserted_count = 0
+        started = time.perf_counter()
+        commit_seconds = 0.0
 
         try:
-            for item in data:
+            for index, item in enumerate(data, 1):
                 try:
-                    # Check if record already exists by req_id
-                    existing = db.query(CFTSRequirementDB).filter(
-                        CFTSRequirementDB.req_id == item['req_id']
-                    ).first()
-
-                    if existing:
-                        # Update existing record
-                        for key, value in item.items():
-                            setattr(existing, key, value)
-                    else:
-                        # Insert new record
-                        db_record = CFTSRequirementDB(**item)
-                        db.add(db_record)
+                    # Savepoint per row: a bad row is skipped without losing the batch
+                    with db.begin_nested():
+                        # Check if record already exists by req_id
+                        existing = db.query(CFTSRequirementDB).filter(
+                            CFTSRequirementDB.req_id == item['req_id']
+                        ).first()
+
+                        if existing:
+                            # Update existing record
+                            for key, value in item.items():
+                                setattr(existing, key, value)
+                        else:
+                            # Insert new record
+                            db.add(CFTSRequirementDB(**item))
+                    if not existing:
                         inserted_count += 1
 
-                    db.commit()
-
                 except Exception as e:
-                    db.rollback()
                     print(f"  Error inserting record: {str(e)}")
-                    continue
+
+                # One commit per batch instead of per row
+                if index % PROGRESS_INTERVAL == 0 or index == len(data):
+                    commit_started = time.perf_counter()
+                    db.commit()
+                    commit_seconds += time.perf_counter() - commit_started
+                    self.report_progress('writing', rows_written=index, rows_total=len(data))
 
             return inserted_count
 
         finally:
             db.close()
+            self.metrics.record('write', time.perf_counter() - started, len(data))
+            self.metrics.record('commit', commit_seconds, len(data))
 
     def process_all_files(self) -> Dict:
         """Process all CFTS Excel files in the folder."""
-        # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
+        return self.process_files(self.find_excel_files())
+
+    def process_files(self, excel_files: List[Path]) -> Dict:
+        """Process the given CFTS Excel files (e.g. a single changed workbook)."""
+        # Ensure database tables, columns and indexes exist (no-op when the schema is current)
+        ensure_schema()
 
-        # Find all Excel files
-        excel_files = self.find_excel_files()
         self.report['total_files'] = len(excel_files)
 
         if not excel_files:
@@ -188,15 +224,20 @@ class CFTSImporter:
             cfts_id, cfts_name = self.extract_cfts_from_filename(file_path.name)
             print(f"\n[{idx}/{len(excel_files)}] Processing: {file_path.name}")
             print(f"  CFTS: {cfts_id} - {cfts_name}")
+            self.metrics.begin_file(file_path.name)
 
             try:
+                self.report_progress('parsing', file=file_path.name)
                 # Parse Excel file
                 data, total_count = self.parse_excel_file(file_path)
                 print(f"  Total records: {total_count}")
                 print(f"  Valid records: {len(data)}")
 
+                self.report_progress('parsed', file=file_path.name, rows_parsed=len(data))
+
                 # Import to database
                 inserted_count = self.import_to_database(data)
+                self.report_progress('writing', rows_written=len(data), rows_total=len(data))
                 print(f"  Inserted: {inserted_count}")
 
                 # Update report
@@ -204,6 +245,8 @@ class CFTSImporter:
                 self.report['total_records'] += total_count
                 self.report['inserted_records'] += inserted_count
                 self.report['skipped_records'] += (len(data) - inserted_count)
+                for item in data:
+                    self.snapshot_rows[item['req_id']] = (item['cfts_id'], content_hash(item))
 
             except Exception as e:
                 error_msg = str(e)
@@ -214,6 +257,33 @@ class CFTSImporter:
                     'error': error_msg
                 })
 
+        if self.report['success_files']:
+            self.report_progress('finalizing')
+            # Refresh rollups and signal running API workers to reload their in-memory indexes
+            db = SessionLocal()
+            try:
+                with self.metrics.phase('finalize', file=RUN_SCOPE):
+                    refresh_cfts_coverage(db)
+                    # Same transaction as the generation record
+                    self.report['dataset_version'] = bump_dataset_version(db, commit=False)
+                    # Only CFTS files imported in this run can have removed rows
+                    generation = record_generation(
+                        db,
+                        self.report['dataset_version'],
+                        'cfts',
+                        self.snapshot_rows,
+                        source=str(self.excel_folder),
+                        scopes={cfts_id for cfts_id, _ in self.snapshot_rows.values()},
+                    )
+                self.report['changes'] = {
+                    'added': generation.added_count,
+                    'removed': generation.removed_count,
+                    'changed': generation.changed_count,
+                }
+            finally:
+                db.close()
+
+        self.report['timings'] = self.metrics.as_report()
         return self.report
 
     def print_summary(self):
@@ -227,6 +297,11 @@ class CFTSImporter:
         print(f"\nTotal records read: {self.report['total_records']}")
         print(f"Successfully inserted: {self.report['inserted_records']}")
         print(f"Skipped (duplicates/updates): {self.report['skipped_records']}")
+        if 'changes' in self.report:
+            changes = self.report['changes']
+            print(f"Changes in generation {self.report['dataset_version']}: "
+                  f"+{changes['added']} added, -{changes['removed']} removed, ~{changes['changed']} changed")
+        print_timings(self.report)
 
         # Verify database
         db = SessionLocal()
@@ -268,12 +343,14 @@ class CFTSImporter:
 
 def main():
     """Main function."""
-    if len(sys.argv) < 2:
-        print("Usage: python batch_import_cfts_new.py <cfts_excel_folder>")
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if not args:
+        print("Usage: python batch_import_cfts_new.py <cfts_excel_folder> [--profile]")
         print("\nExample: python batch_import_cfts_new.py ../data/CFTS")
+        print("  --profile  Also write a cProfile dump (cfts_import_profile_*.prof)")
         sys.exit(1)
 
-    excel_folder = sys.argv[1]
+    excel_folder = args[0]
 
     if not os.path.isdir(excel_folder):
         print(f"Error: {excel_folder} is not a valid directory")
@@ -281,7 +358,13 @@ def main():
 
     # Create importer and process files
     importer = CFTSImporter(excel_folder)
-    importer.process_all_files()
+    profile_file = None
+    if '--profile' in sys.argv:
+        profile_file = f"cfts_import_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+    with profiled(profile_file):
+        importer.process_all_files()
+    if profile_file:
+        importer.report['profile'] = profile_file
     importer.print_summary()
 
 
@@ -4,25 +4,35 @@ import pandas as pd
 import json
 import sys
 import os
-import re
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Callable, Optional
 
-from app.db.database import engine, SessionLocal, Base
+from app.db.crud import bump_dataset_version
+from app.db.database import SessionLocal, ensure_schema
+from app.db.generations import content_hash, record_generation
+from app.db.graph import replace_requirement_links
+from app.db.rollups import refresh_cfts_coverage
 from app.models.sys2_requirement import SYS2RequirementDB, SYS2Requirement
-from app.utils.melco import normalize_melco_id
+from app.utils.cjk import cjk_ngrams
+from app.utils.import_metrics import ImportMetrics, print_timings, profiled
+from app.utils.melco import normalize_melco_series, parse_related_ids
+
+# Rows between progress callbacks while writing
+PROGRESS_INTERVAL = 200
 
 
 class SYS2Importer:
     """Import SYS.2 Excel file."""
 
-    def __init__(self, excel_file: str):
+    def __init__(self, excel_file: str, progress: Optional[Callable[..., None]] = None):
         """
         Initialize SYS.2 importer.
 
         Args:
             excel_file: Path to R1L_SYS.2.xlsx file
+            progress: Optional callback receiving phase updates (background import jobs)
         """
         self.excel_file = Path(excel_file)
         self.report = {
@@ -31,6 +41,14 @@ class SYS2Importer:
             'skipped_records': 0,
             'errors': []
         }
+        self.progress = progress
+        self.metrics = ImportMetrics()
+        self.metrics.begin_file(self.excel_file.name)
+
+    def report_progress(self, phase: str, **fields):
+        """Forward import progress to the optional callback."""
+        if self.progress:
+            self.progress(phase=phase, **fields)
 
     def parse_excel_file(self) -> List[Dict]:
         """
@@ -41,23 +59,27 @@ class SYS2Importer:
         """
         try:
             # Read Excel file
-            df = pd.read_excel(self.excel_file)
+            with self.metrics.phase('read') as timing:
+                df = pd.read_excel(self.excel_file)
+                timing['rows'] = len(df)
             self.report['total_records'] = len(df)
 
             # Convert to list of dicts
+            started = time.perf_counter()
+            # Melco IDs (English or Japanese column) are normalized column-wise, not per row
+            melco_column = next((name for name in ('Melco Id', '要件ID') if name in df.columns), None)
+            if melco_column:
+                melco_ids = normalize_melco_series(df[melco_column])
+            else:
+                melco_ids = pd.Series('', index=df.index)
+            # Extract CFTS ID from Melco ID (e.g., PSCFTS069-1-2-1 -> CFTS069)
+            cfts_ids = melco_ids.str.extract(r'(CFTS\d+)', expand=False).fillna('')
+
             data = []
-            for _, row in df.iterrows():
-                # Get Melco ID - support both English and Japanese column names
-                melco_id = row.get('Melco Id', row.get('要件ID', ''))
-                melco_id = str(melco_id).strip() if pd.notna(melco_id) else ''
-                melco_id = normalize_melco_id(melco_id)
+            for (_, row), melco_id, cfts_id in zip(df.iterrows(), melco_ids, cfts_ids):
                 if not melco_id or melco_id.lower() == 'nan':
                     continue  # Skip rows without Melco ID
 
-                # Extract CFTS ID from Melco ID (e.g., PSCFTS069-1-2-1 -> CFTS069)
-                cfts_match = re.search(r'CFTS\d+', melco_id)
-                cfts_id = cfts_match.group(0) if cfts_match else ''
-
                 # Extract all fields - support both English and Japanese column names
                 record = {
                     'melco_id': melco_id,
@@ -75,9 +97,17 @@ class SYS2Importer:
                     'r1l_sr23cfts': str(row.get('(R1L_SR23CFTS)', '')).strip() if pd.notna(row.get('(R1L_SR23CFTS)')) else '',
                     'r1l_sr24cfts': str(row.get('(R1L_SR24CFTS)', '')).strip() if pd.notna(row.get('(R1L_SR24CFTS)')) else '',
                 }
+                # 日文子字串檢索用 n-gram
+                record['cjk_ngrams'] = cjk_ngrams(
+                    record['requirement_en'],
+                    record['reason_en'],
+                    record['supplement_en'],
+                    record['verification_criteria'],
+                )
 
                 data.append(record)
 
+            self.metrics.record('parse', time.perf_counter() - started, len(data))
             return data
 
         except Exception as e:
@@ -95,59 +125,109 @@ class SYS2Importer:
 
         db = SessionLocal()
         inserted_count = 0
+        started = time.perf_counter()
+        commit_seconds = 0.0
 
         try:
-            for item in data:
+            for index, item in enumerate(data, 1):
                 try:
-                    # Check if record already exists
-                    existing = db.query(SYS2RequirementDB).filter(
-                        SYS2RequirementDB.melco_id == item['melco_id']
-                    ).first()
-
-                    if existing:
-                        # Update existing record
-                        for key, value in item.items():
-                            setattr(existing, key, value)
-                    else:
-                        # Insert new record
-                        db_record = SYS2RequirementDB(**item)
-                        db.add(db_record)
+                    # Savepoint per row: a bad row is skipped without losing the batch
+                    with db.begin_nested():
+                        # Check if record already exists
+                        existing = db.query(SYS2RequirementDB).filter(
+                            SYS2RequirementDB.melco_id == item['melco_id']
+                        ).first()
+
+                        if existing:
+                            # Update existing record
+                            for key, value in item.items():
+                                setattr(existing, key, value)
+                        else:
+                            # Insert new record
+                            db.add(SYS2RequirementDB(**item))
+                    if not existing:
                         inserted_count += 1
 
-                    db.commit()
-
                 except Exception as e:
-                    db.rollback()
                     print(f"  Error inserting {item.get('melco_id', 'unknown')}: {str(e)}")
-                    continue
+
+                # One commit per batch instead of per row
+                if index % PROGRESS_INTERVAL == 0 or index == len(data):
+                    commit_started = time.perf_counter()
+                    db.commit()
+                    commit_seconds += time.perf_counter() - commit_started
+                    self.report_progress('writing', rows_written=index, rows_total=len(data))
 
             return inserted_count
 
         finally:
             db.close()
+            self.metrics.record('write', time.perf_counter() - started, len(data))
+            self.metrics.record('commit', commit_seconds, len(data))
 
     def process_file(self) -> Dict:
         """Process R1L_SYS.2.xlsx file."""
-        # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
+        # Ensure database tables, columns and indexes exist (no-op when the schema is current)
+        ensure_schema()
 
         print(f"Processing: {self.excel_file.name}")
         print("-" * 80)
 
         try:
+            self.report_progress('parsing', file=self.excel_file.name)
             # Parse Excel file
             data = self.parse_excel_file()
             print(f"  Total records: {self.report['total_records']}")
             print(f"  Valid records: {len(data)}")
 
+            self.report_progress('parsed', file=self.excel_file.name, rows_parsed=len(data))
+
             # Import to database
             inserted_count = self.import_to_database(data)
+            self.report_progress('writing', rows_written=len(data), rows_total=len(data))
             print(f"  Inserted: {inserted_count}")
 
+            # Parse related requirement IDs into the indexed edge table
+            db = SessionLocal()
+            try:
+                with self.metrics.phase('links') as timing:
+                    timing['rows'] = len(data)
+                    link_count = replace_requirement_links(db, {
+                        item['melco_id']: parse_related_ids(item['related_requirement_ids'])
+                        for item in data
+                    })
+            finally:
+                db.close()
+            print(f"  Related links: {link_count}")
+            self.report['related_links'] = link_count
+
             # Update report
             self.report['inserted_records'] = inserted_count
             self.report['skipped_records'] = len(data) - inserted_count
 
+            self.report_progress('finalizing')
+            # Refresh rollups and signal running API workers to reload their in-memory indexes
+            db = SessionLocal()
+            try:
+                with self.metrics.phase('finalize'):
+                    refresh_cfts_coverage(db)
+                    # Same transaction as the generation record
+                    self.report['dataset_version'] = bump_dataset_version(db, commit=False)
+                    generation = record_generation(
+                        db,
+                        self.report['dataset_version'],
+                        'sys2',
+                        {item['melco_id']: ('', content_hash(item)) for item in data},
+                        source=self.excel_file.name,
+                    )
+                self.report['changes'] = {
+                    'added': generation.added_count,
+                    'removed': generation.removed_count,
+                    'changed': generation.changed_count,
+                }
+            finally:
+                db.close()
+
         except Exception as e:
             error_msg = str(e)
             print(f"  ERROR: {error_msg}")
@@ -156,6 +236,7 @@ class SYS2Importer:
                 'error': error_msg
             })
 
+        self.report['timings'] = self.metrics.as_report()
         return self.report
 
     def print_summary(self):
@@ -166,6 +247,11 @@ class SYS2Importer:
         print(f"Total records read: {self.report['total_records']}")
         print(f"Successfully inserted: {self.report['inserted_records']}")
         print(f"Skipped (duplicates/updates): {self.report['skipped_records']}")
+        if 'changes' in self.report:
+            changes = self.report['changes']
+            print(f"Changes in generation {self.report['dataset_version']}: "
+                  f"+{changes['added']} added, -{changes['removed']} removed, ~{changes['changed']} changed")
+        print_timings(self.report)
 
         # Verify database
         db = SessionLocal()
@@ -199,12 +285,14 @@ class SYS2Importer:
 
 def main():
     """Main function."""
-    if len(sys.argv) < 2:
-        print("Usage: python batch_import_sys2.py <sys2_excel_file>")
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if not args:
+        print("Usage: python batch_import_sys2.py <sys2_excel_file> [--profile]")
         print("\nExample: python batch_import_sys2.py ../data/R1L_SYS.2.xlsx")
+        print("  --profile  Also write a cProfile dump (sys2_import_profile_*.prof)")
         sys.exit(1)
 
-    excel_file = sys.argv[1]
+    excel_file = args[0]
 
     if not os.path.isfile(excel_file):
         print(f"Error: {excel_file} is not a valid file")
@@ -212,7 +300,13 @@ def main():
 
     # Create importer and process file
     importer = SYS2Importer(excel_file)
-    importer.process_file()
+    profile_file = None
+    if '--profile' in sys.argv:
+        profile_file = f"sys2_import_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+    with profiled(profile_file):
+        importer.process_file()
+    if profile_file:
+        importer.report['profile'] = profile_file
     importer.print_summary()
 
 
@@ -4,31 +4,51 @@ import pandas as pd
 import json
 import sys
 import os
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Callable, Optional
 
-from app.db.database import engine, SessionLocal, Base
+from app.db.crud import bump_dataset_version
+from app.db.database import SessionLocal, ensure_schema
+from app.db.generations import content_hash, record_generation, testcase_row_key
+from app.db.rollups import rebuild_testcase_rollups, refresh_cfts_coverage
 from app.models.testcase import TestCaseDB, TestCase
+from app.utils.cjk import cjk_ngrams
+from app.utils.import_metrics import ImportMetrics, print_timings, profiled
+
+# Rows between progress callbacks while writing
+PROGRESS_INTERVAL = 200
 
 
 class TestCaseImporter:
     """Import TestCase from R1L_TestCase.xlsx."""
 
-    def __init__(self, excel_file: str):
+    def __init__(self, excel_file: str, progress: Optional[Callable[..., None]] = None):
         """
         Initialize TestCase importer.
 
         Args:
             excel_file: Path to R1L_TestCase.xlsx file
+            progress: Optional callback receiving phase updates (background import jobs)
         """
         self.excel_file = Path(excel_file)
         self.report = {
             'total_records': 0,
             'inserted_records': 0,
             'skipped_records': 0,
+            'replaced_records': 0,
             'errors': []
         }
+        self.legacy_replaced = 0
+        self.progress = progress
+        self.metrics = ImportMetrics()
+        self.metrics.begin_file(self.excel_file.name)
+
+    def report_progress(self, phase: str, **fields):
+        """Forward import progress to the optional callback."""
+        if self.progress:
+            self.progress(phase=phase, **fields)
 
     def parse_excel_file(self) -> List[Dict]:
         """
@@ -39,10 +59,13 @@ class TestCaseImporter:
         """
         try:
             # Read Excel file
-            df = pd.read_excel(self.excel_file)
+            with self.metrics.phase('read') as timing:
+                df = pd.read_excel(self.excel_file)
+                timing['rows'] = len(df)
             self.report['total_records'] = len(df)
 
             # Convert to list of dicts
+            started = time.perf_counter()
             data = []
             for idx, row in df.iterrows():
                 # Get Feature ID (G欄) - 對應Melco ID
@@ -76,9 +99,15 @@ class TestCaseImporter:
                     'issue_id': str(row.get('Issue ID', '')).strip() if pd.notna(row.get('Issue ID')) else '',
                     'note': str(row.get('Note', '')).strip() if pd.notna(row.get('Note')) else '',
                 }
+                # 日文子字串檢索用 n-gram
+                record['cjk_ngrams'] = cjk_ngrams(
+                    record['precondition_procedure_jp'],
+                    record['criteria_jp'],
+                )
 
                 data.append(record)
 
+            self.metrics.record('parse', time.perf_counter() - started, len(data))
             return data
 
         except Exception as e:
@@ -86,7 +115,12 @@ class TestCaseImporter:
 
     def import_to_database(self, data: List[Dict]) -> int:
         """
-        Import data to database.
+        Replace the test cases previously imported from this workbook.
+
+        Test cases have no unique key, so the workbook's old rows are deleted
+        and the new ones inserted in one transaction, together with the rollup
+        rebuild: re-importing an edited workbook never duplicates rows, and
+        readers never see it half-replaced.
 
         Returns:
             Number of records successfully inserted
@@ -94,53 +128,107 @@ class TestCaseImporter:
         if not data:
             return 0
 
+        source = self.excel_file.name
         db = SessionLocal()
         inserted_count = 0
+        started = time.perf_counter()
+        commit_seconds = 0.0
 
         try:
-            for item in data:
+            self.report['replaced_records'] = db.query(TestCaseDB).filter(
+                TestCaseDB.import_source == source
+            ).delete(synchronize_session=False)
+            # Rows imported before import_source existed belong to this workbook too
+            self.legacy_replaced = db.query(TestCaseDB).filter(
+                TestCaseDB.import_source.is_(None)
+            ).delete(synchronize_session=False)
+            self.report['replaced_records'] += self.legacy_replaced
+
+            for index, item in enumerate(data, 1):
                 try:
-                    # Insert new record (allow duplicates for same feature_id)
-                    db_record = TestCaseDB(**item)
-                    db.add(db_record)
+                    # Savepoint per row: a bad row is skipped without losing the import
+                    with db.begin_nested():
+                        # Insert new record (allow duplicates for same feature_id)
+                        db.add(TestCaseDB(**item, import_source=source))
                     inserted_count += 1
-                    db.commit()
 
                 except Exception as e:
-                    db.rollback()
                     print(f"  Error inserting TestCase {item.get('title', 'unknown')}: {str(e)}")
                     self.report['errors'].append({
                         'title': item.get('title', 'unknown'),
                         'error': str(e)
                     })
-                    continue
 
+                if index % PROGRESS_INTERVAL == 0:
+                    self.report_progress('writing', rows_written=index, rows_total=len(data))
+
+            rebuild_testcase_rollups(db, commit=False)
+            commit_started = time.perf_counter()
+            db.commit()
+            commit_seconds += time.perf_counter() - commit_started
             return inserted_count
 
+        except Exception:
+            db.rollback()
+            raise
+
         finally:
             db.close()
+            self.metrics.record('write', time.perf_counter() - started, len(data))
+            self.metrics.record('commit', commit_seconds, len(data))
 
     def process_file(self) -> Dict:
         """Process R1L_TestCase.xlsx file."""
-        # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
+        # Ensure database tables, columns and indexes exist (no-op when the schema is current)
+        ensure_schema()
 
         print(f"Processing: {self.excel_file.name}")
         print("-" * 80)
 
         try:
+            self.report_progress('parsing', file=self.excel_file.name)
             # Parse Excel file
             data = self.parse_excel_file()
             print(f"Total records: {self.report['total_records']}")
             print(f"Valid records with Feature ID: {len(data)}")
 
+            self.report_progress('parsed', file=self.excel_file.name, rows_parsed=len(data))
+
             # Import to database
             inserted_count = self.import_to_database(data)
+            self.report_progress('writing', rows_written=len(data), rows_total=len(data))
             print(f"Inserted: {inserted_count}")
 
             self.report['inserted_records'] = inserted_count
             self.report['skipped_records'] = len(data) - inserted_count
 
+            self.report_progress('finalizing')
+            # Refresh rollups and signal running API workers to reload their in-memory indexes
+            source = self.excel_file.name
+            db = SessionLocal()
+            try:
+                with self.metrics.phase('finalize'):
+                    refresh_cfts_coverage(db)
+                    # Same transaction as the generation record
+                    self.report['dataset_version'] = bump_dataset_version(db, commit=False)
+                    generation = record_generation(
+                        db,
+                        self.report['dataset_version'],
+                        'testcase',
+                        {testcase_row_key(item): (source, content_hash(item)) for item in data},
+                        source=source,
+                        # Only this workbook's rows can be removed (plus the unscoped
+                        # history of rows imported before import_source existed)
+                        scopes={source, ''} if self.legacy_replaced else {source},
+                    )
+                self.report['changes'] = {
+                    'added': generation.added_count,
+                    'removed': generation.removed_count,
+                    'changed': generation.changed_count,
+                }
+            finally:
+                db.close()
+
         except Exception as e:
             error_msg = str(e)
             print(f"ERROR: {error_msg}")
@@ -149,6 +237,7 @@ class TestCaseImporter:
                 'error': error_msg
             })
 
+        self.report['timings'] = self.metrics.as_report()
         return self.report
 
     def print_summary(self):
@@ -159,6 +248,12 @@ class TestCaseImporter:
         print(f"Total records read: {self.report['total_records']}")
         print(f"Successfully inserted: {self.report['inserted_records']}")
         print(f"Skipped/Errors: {self.report['skipped_records']}")
+        print(f"Replaced (previous rows of this workbook): {self.report['replaced_records']}")
+        if 'changes' in self.report:
+            changes = self.report['changes']
+            print(f"Changes in generation {self.report['dataset_version']}: "
+                  f"+{changes['added']} added, -{changes['removed']} removed, ~{changes['changed']} changed")
+        print_timings(self.report)
 
         # Verify database
         db = SessionLocal()
@@ -194,12 +289,14 @@ class TestCaseImporter:
 
 def main():
     """Main function."""
-    if len(sys.argv) < 2:
-        print("Usage: python batch_import_testcase.py <testcase_excel_file>")
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if not args:
+        print("Usage: python batch_import_testcase.py <testcase_excel_file> [--profile]")
         print("\nExample: python batch_import_testcase.py ../data/R1L_TestCase.xlsx")
+        print("  --profile  Also write a cProfile dump (testcase_import_profile_*.prof)")
         sys.exit(1)
 
-    excel_file = sys.argv[1]
+    excel_file = args[0]
 
     if not os.path.isfile(excel_file):
         print(f"Error: {excel_file} is not a valid file")
@@ -207,7 +304,13 @@ def main():
 
     # Create importer and process file
     importer = TestCaseImporter(excel_file)
-    importer.process_file()
+    profile_file = None
+    if '--profile' in sys.argv:
+        profile_file = f"testcase_import_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+    with profiled(profile_file):
+        importer.process_file()
+    if profile_file:
+        importer.report['profile'] = profile_file
     importer.print_summary()
 
 
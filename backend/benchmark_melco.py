@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Melco ID helpers in app/utils/melco.py.
+
+Compares the original regex/per-call implementations with the current
+scalar, memoized, list and pandas Series forms on a synthetic ID corpus,
+and checks that every form returns the same result before timing it.
+
+Usage:
+    python benchmark_melco.py                # 100k IDs
+    python benchmark_melco.py --ids 1000000 --repeat 3
+"""
+import argparse
+import random
+import re
+import timeit
+from typing import Callable, List, Set
+
+import pandas as pd
+
+from app.utils.melco import (
+    generate_melco_variants,
+    melco_variant_pool,
+    normalize_melco_id,
+    normalize_melco_ids,
+    normalize_melco_series,
+)
+
+_EDGE_HASHES = re.compile(r"^#+|#+$")
+
+
+def reference_normalize(melco_id):
+    """The original regex implementation, kept as the correctness reference."""
+    if not melco_id:
+        return ""
+    trimmed = melco_id.strip()
+    if not trimmed:
+        return ""
+    return _EDGE_HASHES.sub("", trimmed)
+
+
+def reference_variants(melco_id) -> Set[str]:
+    if melco_id is None:
+        return set()
+    trimmed = melco_id.strip()
+    if not trimmed:
+        return set()
+    canonical = reference_normalize(trimmed)
+    variants = {trimmed}
+    if canonical:
+        variants.update({canonical, f"#{canonical}", f"##{canonical}"})
+    return variants
+
+
+def make_corpus(count: int, distinct: int, seed: int) -> List:
+    """Melco IDs as found in workbooks and requests: hashes, padding, blanks and repeats."""
+    rng = random.Random(seed)
+    pool = [
+        f"PSCFTS{rng.randint(1, 200):03d}-{rng.randint(1, 9)}-{rng.randint(1, 40)}-{rng.randint(1, 20)}"
+        for _ in range(distinct)
+    ]
+    corpus = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.02:
+            corpus.append(rng.choice([None, "", "   ", "#", "##"]))
+            continue
+        melco_id = rng.choice(pool)
+        if roll < 0.3:
+            melco_id = "#" + melco_id
+        elif roll < 0.35:
+            melco_id = "##" + melco_id + "#"
+        if rng.random() < 0.1:
+            melco_id = f" {melco_id}\t"
+        corpus.append(melco_id)
+    return corpus
+
+
+def check_equivalence(corpus: List) -> None:
+    series = pd.Series(corpus, dtype=object)
+    expected = [reference_normalize(value) for value in corpus]
+    assert [normalize_melco_id(value) for value in corpus] == expected, "normalize_melco_id differs"
+    assert normalize_melco_series(series).tolist() == expected, "normalize_melco_series differs"
+    assert normalize_melco_ids(corpus) == [v for v in dict.fromkeys(expected) if v], "normalize_melco_ids differs"
+    for value in corpus:
+        assert generate_melco_variants(value) == reference_variants(value), f"variants differ for {value!r}"
+    expected_pool: Set[str] = set()
+    for value in corpus:
+        expected_pool.update(reference_variants(value))
+    assert melco_variant_pool(corpus) == expected_pool, "melco_variant_pool differs"
+
+
+def bench(name: str, function: Callable[[], object], count: int, repeat: int, baseline: float = 0.0) -> float:
+    best = min(timeit.repeat(function, number=1, repeat=repeat))
+    speedup = f"  x{baseline / best:.1f}" if baseline else ""
+    print(f"  {name:<44}{best * 1000:>10.1f} ms{count / best / 1e6:>10.2f} M ids/s{speedup}")
+    return best
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark the Melco ID helpers")
+    parser.add_argument("--ids", type=int, default=100_000, help="IDs per run")
+    parser.add_argument("--distinct", type=int, default=5_000, help="Distinct IDs in the corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.ids, args.distinct, args.seed)
+    check_equivalence(corpus)
+    series = pd.Series(corpus, dtype=object)
+    count = len(corpus)
+    print(f"{count} IDs ({args.distinct} distinct), best of {args.repeat}; all forms return identical results\n")
+
+    print("normalize:")
+    base = bench("regex, per call (original)", lambda: [reference_normalize(v) for v in corpus], count, args.repeat)
+    bench("normalize_melco_id, per call", lambda: [normalize_melco_id(v) for v in corpus], count, args.repeat, base)
+    bench("normalize_melco_ids (list, dedup)", lambda: normalize_melco_ids(corpus), count, args.repeat, base)
+    bench("normalize_melco_series (pandas column)", lambda: normalize_melco_series(series), count, args.repeat, base)
+
+    print("\nSYS.2 importer Melco ID + CFTS ID columns:")
+    def reference_rows():
+        result = []
+        for value in series:
+            melco_id = reference_normalize(str(value).strip() if pd.notna(value) else "")
+            cfts_match = re.search(r"CFTS\d+", melco_id)
+            result.append((melco_id, cfts_match.group(0) if cfts_match else ""))
+        return result
+    def series_rows():
+        melco_ids = normalize_melco_series(series)
+        return list(zip(melco_ids, melco_ids.str.extract(r"(CFTS\d+)", expand=False).fillna("")))
+    assert reference_rows() == series_rows(), "importer column path differs"
+    base = bench("per row: str/notna + regex (original)", reference_rows, count, args.repeat)
+    bench("normalize_melco_series + str.extract", series_rows, count, args.repeat, base)
+
+    print("\nvariants (availability / batch lookup path):")
+    def reference_pool():
+        pool = set()
+        for value in corpus:
+            pool.update(reference_variants(value))
+        return pool
+    def per_call_pool():
+        pool = set()
+        for value in corpus:
+            pool.update(generate_melco_variants(value))
+        return pool
+    base = bench("regex variants, per call (original)", reference_pool, count, args.repeat)
+    bench("generate_melco_variants, memoized", per_call_pool, count, args.repeat, base)
+    bench("melco_variant_pool (batch)", lambda: melco_variant_pool(corpus), count, args.repeat, base)
+
+
+if __name__ == "__main__":
+    main()
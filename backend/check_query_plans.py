@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Query plan regression checks for the queries issued by app/db and the routers (PostgreSQL only).
+
+Every check EXPLAINs one query and fails when its plan contains a Seq Scan,
+misses the expected index, or (with --baseline) costs noticeably more than
+the saved baseline.
+
+    python check_query_plans.py                       # forced-index mode on the current data
+    python check_query_plans.py --seed-rows 100000 --planner-defaults --save-baseline
+    python check_query_plans.py --planner-defaults --baseline query_plan_baseline.json
+
+--seed-rows adds synthetic CFTS / SYS.2 / TestCase rows and runs VACUUM
+ANALYZE; use a dedicated database for it.
+"""
+import argparse
+import json
+import random
+import sys
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import Select, func, or_, text
+from sqlalchemy.orm import Query, Session
+
+from app.db.database import engine, SessionLocal, create_tables
+from app.db.graph import neighborhood_query
+from app.db.ingest import INGEST_WRITERS, finish_ingest, related_ids, snapshot_entry
+from app.models.cfts_coverage import CFTSCoverageDB
+from app.models.cfts_db import CFTSRequirementDB
+from app.models.dataset_generation import DatasetGenerationDB, DatasetRowVersionDB
+from app.models.sys2_requirement import SYS2RequirementDB, SYS2RequirementLinkDB
+from app.models.testcase import TestCaseDB
+from app.models.testcase_rollup import TestCaseRollupDB
+from app.utils.cjk import query_ngrams
+from app.utils.melco import melco_path, melco_variant_pool
+from app.utils.search import LIKE_ESCAPE, prefix_pattern
+
+DEFAULT_BASELINE = "query_plan_baseline.json"
+SEED_BATCH_ROWS = 5000
+# With planner defaults a Seq Scan over a table this small is the right plan
+SMALL_TABLE_ROWS = 1000
+
+
+def _cfts_prefix(db: Session) -> Query:
+    return db.query(CFTSRequirementDB).filter(
+        CFTSRequirementDB.cfts_id.like(prefix_pattern("CFTS016"), escape=LIKE_ESCAPE)
+    )
+
+
+def _req_id_autocomplete(db: Session) -> Query:
+    return (
+        db.query(CFTSRequirementDB.req_id)
+        .filter(CFTSRequirementDB.req_id.like(prefix_pattern("CFTS016"), escape=LIKE_ESCAPE))
+        .order_by(CFTSRequirementDB.req_id)
+        .limit(100)
+    )
+
+
+def _cfts_changed_only(db: Session) -> Query:
+    return db.query(CFTSRequirementDB).filter(
+        CFTSRequirementDB.description_changed,
+        CFTSRequirementDB.cfts_id.like(prefix_pattern("CFTS016"), escape=LIKE_ESCAPE),
+    )
+
+
+def _sys2_cfts_prefix(db: Session) -> Query:
+    return db.query(SYS2RequirementDB).filter(
+        func.upper(SYS2RequirementDB.cfts_id).like(
+            prefix_pattern("cfts016", upper=True), escape=LIKE_ESCAPE
+        )
+    )
+
+
+def _sys2_melco_prefix(db: Session) -> Query:
+    melco_upper = func.upper(SYS2RequirementDB.melco_id)
+    return db.query(SYS2RequirementDB).filter(
+        or_(
+            *[
+                melco_upper.like(prefix_pattern(prefix, upper=True), escape=LIKE_ESCAPE)
+                for prefix in ("#pscfts016-1", "pscfts016-1")
+            ]
+        )
+    )
+
+
+def _full_text(model):
+    def build(db: Session) -> Query:
+        ts_query = func.websearch_to_tsquery("english", "door lock")
+        return db.query(model.id).filter(model.search_vector.bool_op("@@")(ts_query))
+    return build
+
+
+def _cjk_substring(model):
+    def build(db: Session) -> Query:
+        return db.query(model.id).filter(model.cjk_ngrams.contains(query_ngrams("ロック")))
+    return build
+
+
+def _subtree(model):
+    def build(db: Session) -> Query:
+        return db.query(model.id).filter(
+            model.melco_path.like(prefix_pattern(melco_path("PSCFTS016-1")), escape=LIKE_ESCAPE)
+        )
+    return build
+
+
+def _cfts_exact(db: Session) -> Query:
+    # get_cfts_requirements_by_cfts_id for a full CFTS ID
+    return db.query(CFTSRequirementDB).filter(CFTSRequirementDB.cfts_id == "CFTS016")
+
+
+def _req_id_lookup(db: Session) -> Query:
+    # get_requirement_by_req_id
+    return db.query(CFTSRequirementDB).filter(CFTSRequirementDB.req_id == "CFTS016-10").limit(1)
+
+
+def _cfts_distinct_autocomplete(db: Session) -> Query:
+    # /cfts/autocomplete/cfts-ids without the in-memory index
+    return db.query(CFTSRequirementDB.cfts_id, CFTSRequirementDB.cfts_name).distinct().order_by(
+        CFTSRequirementDB.cfts_id
+    )
+
+
+def _cfts_name_lookup(db: Session) -> Query:
+    # _build_cfts_lookup
+    return db.query(CFTSRequirementDB.cfts_id, CFTSRequirementDB.cfts_name).filter(
+        CFTSRequirementDB.cfts_id.in_(["CFTS016", "CFTS017"])
+    ).distinct()
+
+
+def _sys2_variant_lookup(db: Session) -> Query:
+    # _records_for_variants (by-melco detail and batch)
+    variants = melco_variant_pool(["PSCFTS016-1-2", "PSCFTS016-1-3"])
+    return db.query(SYS2RequirementDB).filter(
+        SYS2RequirementDB.melco_id.in_(variants)
+    ).order_by(SYS2RequirementDB.id.asc())
+
+
+def _sys2_availability(db: Session) -> Query:
+    # _availability_lookup without the in-memory set
+    variants = melco_variant_pool([f"PSCFTS016-1-{index}" for index in range(50)])
+    return db.query(SYS2RequirementDB.melco_id).filter(SYS2RequirementDB.melco_id.in_(variants)).distinct()
+
+
+def _sys2_by_cfts(db: Session) -> Query:
+    # prewarm of one CFTS group
+    return db.query(SYS2RequirementDB).filter(SYS2RequirementDB.cfts_id == "CFTS016")
+
+
+def _feature_lookup(db: Session) -> Query:
+    # _records_for_features (by-feature-id and batch)
+    return db.query(TestCaseDB).filter(
+        TestCaseDB.feature_id.in_(["PSCFTS016-1-2", "PSCFTS016-1-3"])
+    ).order_by(TestCaseDB.id.asc())
+
+
+def _testcase_stats(db: Session) -> Query:
+    # /testcases/stats filtered by feature prefix
+    count = func.sum(TestCaseRollupDB.test_count).label("count")
+    return (
+        db.query(TestCaseRollupDB.test_result, count)
+        .filter(TestCaseRollupDB.feature_id.like(prefix_pattern("PSCFTS016-1"), escape=LIKE_ESCAPE))
+        .group_by(TestCaseRollupDB.test_result)
+        .order_by(count.desc())
+    )
+
+
+def _testcase_stats_by_cfts(db: Session) -> Query:
+    count = func.sum(TestCaseRollupDB.test_count).label("count")
+    return (
+        db.query(TestCaseRollupDB.test_result, count)
+        .filter(TestCaseRollupDB.cfts_id == "CFTS016")
+        .group_by(TestCaseRollupDB.test_result)
+    )
+
+
+def _graph_edges(db: Session) -> Query:
+    # Edges among the nodes of a graph response
+    node_ids = [f"PSCFTS016-1-{index}" for index in range(20)]
+    return db.query(
+        SYS2RequirementLinkDB.source_melco_id, SYS2RequirementLinkDB.target_melco_id
+    ).filter(
+        SYS2RequirementLinkDB.source_melco_id.in_(node_ids),
+        SYS2RequirementLinkDB.target_melco_id.in_(node_ids),
+    ).distinct()
+
+
+def _graph_walk(db: Session) -> Select:
+    # Recursive neighborhood walk of the graph endpoint
+    return neighborhood_query("PSCFTS016-1-1", depth=2, limit=200)
+
+
+def _coverage_lookup(db: Session) -> Query:
+    return db.query(CFTSCoverageDB).filter(CFTSCoverageDB.cfts_id == "CFTS016")
+
+
+def _latest_generation(db: Session) -> Query:
+    return db.query(DatasetGenerationDB.generation).order_by(DatasetGenerationDB.generation.desc()).limit(1)
+
+
+def _generation_window(db: Session) -> Query:
+    return db.query(DatasetRowVersionDB.row_key).filter(
+        DatasetRowVersionDB.entity == "cfts",
+        DatasetRowVersionDB.valid_from > 3,
+        DatasetRowVersionDB.valid_from <= 5,
+    )
+
+
+# (check name, query builder, index that must appear in the plan)
+_CFTS_ID_INDEXES = (
+    "ix_cfts_requirements_cfts_id", "ix_cfts_requirements_cfts_id_pattern", "ix_cfts_requirements_cfts_id_name",
+)
+_LINK_INDEXES = ("ix_sys2_requirement_links_source_melco_id", "ix_sys2_requirement_links_target_melco_id")
+
+# Expected index: a name, or a tuple of names that are equally fine (the
+# text_pattern_ops indexes also serve plain equality)
+PLAN_CHECKS: List[Tuple[str, Callable[[Session], Union[Query, Select]], Union[str, Tuple[str, ...]]]] = [
+    ("CFTS prefix search", _cfts_prefix, "ix_cfts_requirements_cfts_id_pattern"),
+    ("CFTS changed-only search", _cfts_changed_only, "ix_cfts_requirements_cfts_id_changed"),
+    ("Req.ID autocomplete", _req_id_autocomplete, "ix_cfts_requirements_req_id_pattern"),
+    ("SYS.2 CFTS prefix search", _sys2_cfts_prefix, "ix_sys2_requirements_cfts_id_upper_pattern"),
+    ("SYS.2 Melco prefix search", _sys2_melco_prefix, "ix_sys2_requirements_melco_id_upper_pattern"),
+    ("CFTS full-text search", _full_text(CFTSRequirementDB), "ix_cfts_requirements_search_vector"),
+    ("SYS.2 full-text search", _full_text(SYS2RequirementDB), "ix_sys2_requirements_search_vector"),
+    ("TestCase full-text search", _full_text(TestCaseDB), "ix_testcases_search_vector"),
+    ("SYS.2 Japanese substring search", _cjk_substring(SYS2RequirementDB), "ix_sys2_requirements_cjk_ngrams"),
+    ("TestCase Japanese substring search", _cjk_substring(TestCaseDB), "ix_testcases_cjk_ngrams"),
+    ("SYS.2 Melco subtree", _subtree(SYS2RequirementDB), "ix_sys2_requirements_melco_path_pattern"),
+    ("TestCase Melco subtree", _subtree(TestCaseDB), "ix_testcases_melco_path_pattern"),
+    ("Dataset generation diff window", _generation_window, "ix_dataset_row_versions_entity_valid_from"),
+    ("CFTS exact lookup", _cfts_exact, _CFTS_ID_INDEXES),
+    ("Req.ID lookup", _req_id_lookup, ("ix_cfts_requirements_req_id", "ix_cfts_requirements_req_id_pattern")),
+    ("CFTS DISTINCT autocomplete", _cfts_distinct_autocomplete, "ix_cfts_requirements_cfts_id_name"),
+    ("CFTS name lookup", _cfts_name_lookup, _CFTS_ID_INDEXES),
+    ("SYS.2 variant IN lookup", _sys2_variant_lookup, "ix_sys2_requirements_melco_id"),
+    ("SYS.2 availability", _sys2_availability, "ix_sys2_requirements_melco_id"),
+    ("SYS.2 by CFTS", _sys2_by_cfts, "ix_sys2_requirements_cfts_id"),
+    ("TestCase feature_id lookup", _feature_lookup, "ix_testcases_feature_id"),
+    ("TestCase stats by feature prefix", _testcase_stats, "ix_testcase_rollups_feature_id_pattern"),
+    ("TestCase stats by CFTS", _testcase_stats_by_cfts, "ix_testcase_rollups_cfts_id"),
+    ("Requirement graph edges", _graph_edges, _LINK_INDEXES),
+    ("Requirement graph walk", _graph_walk, _LINK_INDEXES),
+    ("CFTS coverage lookup", _coverage_lookup, "cfts_coverage_pkey"),
+    ("Latest dataset generation", _latest_generation, "dataset_generations_pkey"),
+]
+
+
+def _walk_plan(node: Dict) -> List[Dict]:
+    """Flatten an EXPLAIN (FORMAT JSON) plan tree."""
+    nodes = [node]
+    for child in node.get("Plans", []):
+        nodes.extend(_walk_plan(child))
+    return nodes
+
+
+def explain(db: Session, query: Union[Query, Select]) -> Dict:
+    """Return the top-level plan node for a query."""
+    statement = query.statement if isinstance(query, Query) else query
+    # render_postcompile expands IN lists into one bound parameter per value
+    compiled = statement.compile(dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True})
+    raw = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return plan[0]["Plan"]
+
+
+def plan_summary(db: Session, query: Union[Query, Select]) -> Tuple[set, List[str], float]:
+    """(indexes used, relations read by Seq Scan, total cost) of a query's plan."""
+    plan = explain(db, query)
+    nodes = _walk_plan(plan)
+    used_indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+    seq_scans = [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"]
+    return used_indexes, seq_scans, plan["Total Cost"]
+
+
+def force_index_scans(db: Session) -> None:
+    """
+    Make the planner prefer an index whenever one is usable; a remaining
+    Seq Scan then means the index cannot serve the predicate at all.
+    """
+    db.execute(text("SET enable_seqscan = off"))
+
+
+def _small_tables(db: Session) -> set:
+    """Tables whose planner row estimate is below SMALL_TABLE_ROWS."""
+    rows = db.execute(text(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= 0 AND reltuples < :limit"
+    ), {"limit": SMALL_TABLE_ROWS})
+    return {relname for relname, in rows}
+
+
+def _seed_records(rows: int, rng: random.Random) -> Dict[str, List[Dict]]:
+    """Synthetic rows spread over 200 CFTS IDs; the probed terms stay selective."""
+    vocabulary = [f"w{index}" for index in range(5000)]
+
+    def text_for(rare: str) -> str:
+        words = rng.choices(vocabulary, k=rng.randint(10, 40))
+        if rng.random() < 0.005:
+            words.append(rare)
+        return " ".join(words)
+
+    records: Dict[str, List[Dict]] = {"cfts": [], "sys2": [], "testcases": []}
+    for index in range(rows):
+        cfts_id = f"CFTS{index % 200 + 1:03d}"
+        melco_id = f"PS{cfts_id}-{index % 7 + 1}-{index}"
+        records["cfts"].append({
+            "cfts_id": cfts_id, "cfts_name": f"Feature {cfts_id}", "req_id": f"{cfts_id}-{index}",
+            "source_id": f"SRC-{index}", "description": text_for("door lock"),
+            "sr24_description": text_for("door"), "melco_id": f"{melco_id}\n#{melco_id}-1",
+        })
+        records["sys2"].append({
+            "melco_id": melco_id, "cfts_id": cfts_id, "requirement_en": text_for("door lock"),
+            "verification_criteria": text_for("ロック"),
+            "related_requirement_ids": f"PS{cfts_id}-1-{rng.randrange(rows)}",
+        })
+        for case in range(2):
+            records["testcases"].append({
+                "feature_id": melco_id, "title": f"Test {index}-{case}", "criteria_jp": text_for("ロック"),
+                "test_result": rng.choice(["OK", "NG", ""]), "tester": rng.choice(["a", "b", "c"]),
+            })
+    return records
+
+
+def seed(rows: int) -> None:
+    """Insert a sizable synthetic dataset through the bulk ingest writers, then VACUUM ANALYZE."""
+    create_tables()
+    db = SessionLocal()
+    try:
+        for table, records in _seed_records(rows, random.Random(0)).items():
+            snapshot_rows, related = {}, {}
+            for start in range(0, len(records), SEED_BATCH_ROWS):
+                _, _, written = INGEST_WRITERS[table](db, records[start:start + SEED_BATCH_ROWS])
+                for row in written:
+                    row_key, entry = snapshot_entry(table, row)
+                    snapshot_rows[row_key] = entry
+                    if table == "sys2":
+                        related[row["melco_id"]] = related_ids(row)
+            finish_ingest(db, table, snapshot_rows, related, "check_query_plans")
+            print(f"Seeded {len(records)} {table} rows")
+    finally:
+        db.close()
+
+    # Fresh statistics and visibility map, so plans match a settled production database
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def run_checks(planner_defaults: bool = False, baseline: Optional[Dict[str, float]] = None,
+               max_cost_increase: float = 0.5) -> Tuple[bool, Dict[str, float]]:
+    """Run every plan check and print the result. Returns (all passed, total cost per check)."""
+    db = SessionLocal()
+    all_passed = True
+    costs: Dict[str, float] = {}
+    try:
+        small_tables = _small_tables(db) if planner_defaults else set()
+        if not planner_defaults:
+            force_index_scans(db)
+
+        for name, build_query, expected_index in PLAN_CHECKS:
+            used_indexes, seq_scans, cost = plan_summary(db, build_query(db))
+            costs[name] = cost
+
+            cost_limit = None
+            if baseline and name in baseline:
+                cost_limit = baseline[name] * (1 + max_cost_increase)
+            too_costly = cost_limit is not None and cost > cost_limit
+
+            expected = {expected_index} if isinstance(expected_index, str) else set(expected_index)
+            small_table_plan = bool(seq_scans) and set(seq_scans) <= small_tables
+            if small_table_plan:
+                passed = not too_costly
+            else:
+                passed = bool(expected & used_indexes) and not seq_scans and not too_costly
+            all_passed = all_passed and passed
+            print(f"[{'PASS' if passed else 'FAIL'}] {name}")
+            print(f"  indexes: {', '.join(sorted(used_indexes)) or '-'}")
+            print(f"  cost: {cost:.2f}" + (f" (limit {cost_limit:.2f})" if cost_limit is not None else ""))
+            if seq_scans:
+                print(f"  seq scans: {', '.join(seq_scans)}" + (" (small tables)" if small_table_plan else ""))
+    finally:
+        db.rollback()
+        db.close()
+
+    return all_passed, costs
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="EXPLAIN-based query plan regression checks")
+    parser.add_argument("--seed-rows", type=int, default=0,
+                        help="Insert this many synthetic requirements first (dedicated database only)")
+    parser.add_argument("--planner-defaults", action="store_true",
+                        help="Keep enable_seqscan on, i.e. check the plans the planner really picks "
+                             "(needs a realistically sized, analyzed dataset)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="FILE",
+                        help=f"Save plan costs as baseline (default file: {DEFAULT_BASELINE})")
+    parser.add_argument("--baseline", metavar="FILE", help="Fail when a plan costs more than the baseline allows")
+    parser.add_argument("--max-cost-increase", type=float, default=0.5,
+                        help="Allowed relative cost increase over the baseline (default: 0.5)")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"Query plan checks require PostgreSQL (current: {engine.dialect.name})")
+        sys.exit(1)
+
+    if args.seed_rows:
+        seed(args.seed_rows)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["costs"]
+
+    passed, costs = run_checks(args.planner_defaults, baseline, args.max_cost_increase)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"planner_defaults": args.planner_defaults, "costs": costs}, f, indent=2)
+        print(f"\nBaseline saved to: {args.save_baseline}")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Trigram suggestions, including non-ASCII (Japanese) names."""
+from app.utils.fuzzy import FuzzyEntry, TrigramIndex, fold_for_matching, trigrams
+
+
+def test_fold_drops_separators_and_case():
+    assert fold_for_matching("Anti Theft") == fold_for_matching("anti-theft") == "antitheft"
+    assert fold_for_matching("ＣＦＴＳ０１６") == fold_for_matching("CFTS016")
+
+
+def test_fold_keeps_japanese_letters():
+    assert fold_for_matching("盗難防止・警報") == "盗難防止警報"
+    assert trigrams("ドアロック")
+
+
+def test_japanese_cfts_name_suggestion():
+    index = TrigramIndex([
+        FuzzyEntry("ドアロック制御", "cfts_name", "CFTS016"),
+        FuzzyEntry("盗難防止警報", "cfts_name", "CFTS020"),
+        FuzzyEntry("Anti-Theft", "cfts_name", "CFTS021"),
+    ])
+    assert len(index) == 3
+
+    matches = index.search("ドアロック", threshold=0.3)
+    assert matches and matches[0].entry.cfts_id == "CFTS016"
+
+    exact = index.search("盗難防止 警報")
+    assert exact[0].entry.cfts_id == "CFTS020"
+    assert exact[0].score == 1.0
@@ -0,0 +1,27 @@
+"""Upload file name rules for import jobs."""
+import pytest
+
+from app.utils.import_jobs import validate_upload_names
+
+
+@pytest.mark.parametrize("kind, filenames", [
+    ("sys2", ["status.json"]),
+    ("testcase", [".owner.lock"]),
+    ("sys2", ["~$R1L_SYS.2.xlsx"]),
+    ("sys2", [".R1L_SYS.2.xlsx"]),
+    ("testcase", ["R1L_TestCase.csv"]),
+    ("cfts", ["Foo.xlsx"]),
+    ("cfts", ["CFTS001_A.XLSX"]),
+    ("cfts", ["CFTS001_A.xlsx", "upload/CFTS001_A.xlsx"]),
+    ("sys2", [""]),
+])
+def test_rejected_names(kind, filenames):
+    with pytest.raises(ValueError):
+        validate_upload_names(kind, filenames)
+
+
+def test_accepted_names_are_base_names():
+    assert validate_upload_names("cfts", ["upload/CFTS001_A.xlsx", "SYS1_CFTS002_B.xlsx"]) == [
+        "CFTS001_A.xlsx", "SYS1_CFTS002_B.xlsx",
+    ]
+    assert validate_upload_names("testcase", ["my R1L_TestCase.xlsx"]) == ["my R1L_TestCase.xlsx"]
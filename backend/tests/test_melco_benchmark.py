@@ -0,0 +1,82 @@
+"""Benchmarks for the Melco ID helpers; each also checks the batch form against the scalar one."""
+import random
+
+import pandas as pd
+import pytest
+
+from app.utils.melco import (
+    generate_melco_variants,
+    melco_variant_pool,
+    normalize_melco_id,
+    normalize_melco_ids,
+    normalize_melco_series,
+)
+
+EDGE_CASES = [
+    None,
+    "",
+    "   ",
+    "#",
+    "###",
+    " # ",
+    "#PSCFTS001-1-2-3",
+    "##PSCFTS001-1-2-3",
+    "PSCFTS001-1-2-3#",
+    "  ##PSCFTS001-1-2-3##  ",
+    "PSCFTS001-1-2-3\n",
+    "\tPSCFTS001-1-2-3\r\n",
+    "PSCFTS001-1\nPSCFTS002-1",
+    "#PSCFTS001-1\n#PSCFTS002-1#",
+    "PS#CFTS001",
+]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Workbook-like IDs: hashes, padding, line breaks, blanks and repeats."""
+    rng = random.Random(42)
+    base = [f"PSCFTS{rng.randint(1, 200):03d}-{rng.randint(1, 9)}-{rng.randint(1, 40)}" for _ in range(2000)]
+    decorations = ["{}", "#{}", "##{}", " {} ", "{}#", "\n{}\n", " ##{}## "]
+    ids = [rng.choice(decorations).format(rng.choice(base)) for _ in range(20000)]
+    return ids + EDGE_CASES
+
+
+@pytest.mark.parametrize("melco_id, expected", [
+    (None, ""),
+    ("", ""),
+    ("   ", ""),
+    ("###", ""),
+    ("  ##PSCFTS001-1-2-3##  ", "PSCFTS001-1-2-3"),
+    ("\tPSCFTS001-1-2-3\r\n", "PSCFTS001-1-2-3"),
+    ("#PSCFTS001-1\n#PSCFTS002-1#", "PSCFTS001-1\n#PSCFTS002-1"),
+    ("PS#CFTS001", "PS#CFTS001"),
+])
+def test_normalize_melco_id_edge_cases(melco_id, expected):
+    assert normalize_melco_id(melco_id) == expected
+
+
+def test_normalize_melco_id(benchmark, corpus):
+    result = benchmark(lambda: [normalize_melco_id(melco_id) for melco_id in corpus])
+    assert result[-len(EDGE_CASES):] == [normalize_melco_id(melco_id) for melco_id in EDGE_CASES]
+
+
+def test_normalize_melco_ids_matches_scalar(benchmark, corpus):
+    result = benchmark(normalize_melco_ids, corpus)
+    expected = list(dict.fromkeys(
+        normalize_melco_id(melco_id) for melco_id in corpus if normalize_melco_id(melco_id)
+    ))
+    assert result == expected
+
+
+def test_normalize_melco_series_matches_scalar(benchmark, corpus):
+    series = pd.Series(corpus, dtype=object)
+    result = benchmark(normalize_melco_series, series)
+    assert result.tolist() == [normalize_melco_id(melco_id) for melco_id in corpus]
+
+
+def test_melco_variant_pool_matches_scalar(benchmark, corpus):
+    result = benchmark(melco_variant_pool, corpus)
+    expected = set()
+    for melco_id in corpus:
+        expected |= generate_melco_variants(melco_id)
+    assert result == expected
@@ -0,0 +1,44 @@
+"""
+EXPLAIN checks from check_query_plans.py as tests (PostgreSQL only).
+
+Skipped unless DATABASE_URL points at a database; the schema is created when
+missing and the tables are VACUUM ANALYZEd, data is not modified.
+"""
+import os
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db.database import SessionLocal, engine, ensure_schema  # noqa: E402
+from check_query_plans import PLAN_CHECKS, force_index_scans, plan_summary  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def db():
+    ensure_schema()
+    # Index-only scans are costed from the visibility map; settle it like a production database
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+    session = SessionLocal()
+    force_index_scans(session)
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.mark.parametrize(
+    "build_query, expected_index",
+    [(build_query, expected_index) for _, build_query, expected_index in PLAN_CHECKS],
+    ids=[name for name, _, _ in PLAN_CHECKS],
+)
+def test_query_uses_index(db, build_query, expected_index):
+    used_indexes, seq_scans, _ = plan_summary(db, build_query(db))
+    expected = {expected_index} if isinstance(expected_index, str) else set(expected_index)
+    assert not seq_scans, f"Seq Scan on {', '.join(seq_scans)}"
+    assert expected & used_indexes, f"expected {sorted(expected)}, plan used {sorted(used_indexes) or '-'}"
@@ -0,0 +1,34 @@
+"""LIKE escaping for the index-friendly prefix filters."""
+import pytest
+
+from app.utils.search import escape_like, prefix_pattern
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("CFTS016", "CFTS016"),
+    ("100%", "100\\%"),
+    ("REQ_01", "REQ\\_01"),
+    ("a\\b", "a\\\\b"),
+    ("\\%_", "\\\\\\%\\_"),
+    ("", ""),
+])
+def test_escape_like(value, expected):
+    assert escape_like(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("CFTS016", "CFTS016%"),
+    ("CFTS_01%", "CFTS\\_01\\%%"),
+    ("a\\", "a\\\\%"),
+    ("", "%"),
+])
+def test_prefix_pattern(value, expected):
+    pattern = prefix_pattern(value)
+    assert pattern == expected
+    # Exactly one unescaped wildcard, at the end
+    assert pattern.endswith("%")
+    assert pattern[:-1] == escape_like(value)
+
+
+def test_prefix_pattern_upper():
+    assert prefix_pattern("pscfts016_a", upper=True) == "PSCFTS016\\_A%"
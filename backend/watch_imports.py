@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Watch the data folder and import new or changed workbooks automatically.
+
+Detects CFTS*.xlsx (and SYS1_CFTS*), R1L_SYS.2.xlsx and R1L_TestCase.xlsx,
+waits until a file has stopped changing (debounce) and imports only that file
+through the existing batch importers. Uses watchdog (inotify) when installed
+and falls back to polling, which is also needed on bind mounts that do not
+deliver inotify events (Docker Desktop / WSL).
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.utils.import_jobs import detect_import_kind, report_failed
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger("watch_imports")
+
+STATE_FILE_NAME = ".rtm_watch_state.json"
+# Import kinds whose importer replaces or upserts rows, so a re-import is safe
+WATCHED_KINDS = ("cfts", "sys2", "testcase")
+
+
+def watched_kind(filename: str) -> Optional[str]:
+    kind = detect_import_kind(filename)
+    return kind if kind in WATCHED_KINDS else None
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """(size, mtime_ns), or None when the file is gone."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_digest(path: Path) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def is_complete_workbook(path: Path) -> bool:
+    """An .xlsx still being copied is a truncated zip; .xls has no cheap check."""
+    if path.suffix.lower() != ".xlsx":
+        return True
+    try:
+        with zipfile.ZipFile(path) as workbook:
+            return "[Content_Types].xml" in workbook.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+class ImportWatcher:
+    """Collects changed workbooks and imports each once it has settled."""
+
+    def __init__(self, folder: Path, debounce: float, state_file: Path):
+        self.folder = folder
+        self.debounce = debounce
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        # path -> (signature at last change, time of last change)
+        self._pending: Dict[Path, Tuple[Optional[Tuple[int, int]], float]] = {}
+        self._seen: Dict[Path, Tuple[int, int]] = {}
+        self.has_state = state_file.exists()
+        self._imported = self._load_state()
+
+    def _load_state(self) -> Dict[str, str]:
+        """Content digests of the last imported version of each workbook."""
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self) -> None:
+        tmp_path = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._imported, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_file)
+
+    def candidates(self):
+        for path in self.folder.rglob("*"):
+            if path.is_file() and watched_kind(path.name):
+                yield path
+
+    def touch(self, path: Path) -> None:
+        """Record a change; the import waits until the file is quiet for `debounce` seconds."""
+        if not watched_kind(path.name):
+            return
+        with self._lock:
+            self._pending[path] = (file_signature(path), time.monotonic())
+
+    def scan(self) -> None:
+        """Polling fallback (and startup catch-up): compare size/mtime with the last scan."""
+        for path in self.candidates():
+            signature = file_signature(path)
+            if signature and self._seen.get(path) != signature:
+                self._seen[path] = signature
+                self.touch(path)
+
+    def record_baseline(self) -> None:
+        """First start: treat the workbooks already in the folder as imported, without importing them."""
+        for path in self.candidates():
+            signature = file_signature(path)
+            if signature and is_complete_workbook(path):
+                self._seen[path] = signature
+                self._imported[str(path.relative_to(self.folder))] = file_digest(path)
+        self._save_state()
+        self.has_state = True
+        logger.info(f"No state file; recorded {len(self._imported)} existing workbooks as baseline")
+
+    def process_due(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                path for path, (_, changed_at) in self._pending.items()
+                if now - changed_at >= self.debounce
+            ]
+
+        for path in due:
+            with self._lock:
+                signature, _ = self._pending.pop(path)
+            current = file_signature(path)
+            if current is None:
+                continue
+            if current != signature or not is_complete_workbook(path):
+                # Still being written: wait for another quiet period
+                with self._lock:
+                    self._pending[path] = (current, time.monotonic())
+                continue
+            self.import_file(path)
+
+    def import_file(self, path: Path) -> None:
+        digest = file_digest(path)
+        key = str(path.relative_to(self.folder))
+        if self._imported.get(key) == digest:
+            logger.info(f"Unchanged, skipped: {key}")
+            return
+
+        kind = watched_kind(path.name)
+        logger.info(f"Importing {key} ({kind})")
+        started = time.perf_counter()
+        report = run_importer(kind, path)
+        elapsed = time.perf_counter() - started
+
+        if report_failed(kind, report):
+            logger.warning(f"Import of {key} failed after {elapsed:.1f}s: {report['errors']}")
+            return
+
+        self._imported[key] = digest
+        self._save_state()
+        logger.info(
+            f"Imported {key} in {elapsed:.1f}s "
+            f"(dataset version {report.get('dataset_version')}, changes {report.get('changes')})"
+        )
+
+
+def run_importer(kind: str, path: Path) -> Dict:
+    """Import a single workbook with the matching batch importer."""
+    if kind == "cfts":
+        from batch_import_cfts_new import CFTSImporter
+        return CFTSImporter(str(path.parent)).process_files([path])
+    if kind == "sys2":
+        from batch_import_sys2 import SYS2Importer
+        return SYS2Importer(str(path)).process_file()
+    from batch_import_testcase import TestCaseImporter
+    return TestCaseImporter(str(path)).process_file()
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: ImportWatcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_moved(self, event):
+        # Office and most copy tools write a temp file and rename it into place
+        if not event.is_directory:
+            self.watcher.touch(Path(event.dest_path))
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Auto-import workbooks dropped into a folder")
+    parser.add_argument("folder", help="Folder to watch, e.g. /data")
+    parser.add_argument("--debounce", type=float, default=float(os.getenv("WATCH_DEBOUNCE_SECONDS", "5")),
+                        help="Seconds a file must stay unchanged before it is imported")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("WATCH_POLL_SECONDS", "2")),
+                        help="Polling interval in seconds")
+    parser.add_argument("--polling", action="store_true",
+                        default=os.getenv("WATCH_POLLING", "").lower() in ("1", "true", "yes"),
+                        help="Force polling even when watchdog is installed")
+    parser.add_argument("--state-file", help=f"Imported-file state (default: <folder>/{STATE_FILE_NAME})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    folder = Path(args.folder).resolve()
+    if not folder.is_dir():
+        print(f"Error: {args.folder} is not a valid directory")
+        sys.exit(1)
+
+    watcher = ImportWatcher(
+        folder,
+        debounce=args.debounce,
+        state_file=Path(args.state_file) if args.state_file else folder / STATE_FILE_NAME,
+    )
+
+    if watcher.has_state:
+        # Catch up on files added or changed while the watcher was not running
+        watcher.scan()
+    else:
+        # Without a state file there is no record of what was imported before
+        watcher.record_baseline()
+
+    observer = None
+    if Observer is not None and not args.polling:
+        observer = Observer()
+        observer.schedule(_EventHandler(watcher), str(folder), recursive=True)
+        observer.start()
+        logger.info(f"Watching {folder} with watchdog (debounce {args.debounce}s)")
+    else:
+        logger.info(f"Watching {folder} by polling every {args.interval}s (debounce {args.debounce}s)")
+
+    try:
+        while True:
+            time.sleep(1 if observer else args.interval)
+            if observer is None:
+                watcher.scan()
+            watcher.process_due()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+
+if __name__ == "__main__":
+    main()